@@ -0,0 +1,182 @@
+# benchmarks/run.py
+# Benchmarks del pipeline sobre configuraciones sintéticas (src/synthetic.py):
+# carga del YAML, expansión, planificación, tabla de resultados y render del Gantt.
+# Mide tiempo (mejor de N repeticiones) y memoria pico (tracemalloc, en una pasada
+# aparte para no distorsionar los tiempos) y compara con benchmarks/baseline.json.
+#
+#   python -m benchmarks.run                     # todos los tamaños, compara con la baseline
+#   python -m benchmarks.run --size small        # solo un tamaño
+#   python -m benchmarks.run --update-baseline   # regraba la baseline con esta máquina
+#
+# Devuelve código 1 si alguna etapa supera la baseline por encima del umbral.
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from src.export import schedule_frame
+from src.models import Person
+from src.process_manager import build_processes, build_task_table, load_config
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+from src.visualization import plot_gantt, plot_gantt_lanes
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# tamaños: parámetros de synthetic_config
+SIZES = {
+    "small": dict(clients=50, templates=8, tasks_per_template=5, depth=2, seed=1),
+    "medium": dict(clients=1000, templates=12, tasks_per_template=5, depth=3, seed=2),
+    "large": dict(clients=5000, templates=16, tasks_per_template=6, depth=4, seed=3),
+}
+PEOPLE = 4
+SERVERS = {"S1": 0.0, "S2": 0.0}
+# el Gantt de una fila por tarea solo se mide hasta este número de tareas
+ROWS_RENDER_LIMIT = 5000
+
+# umbrales de regresión: ratio sobre la baseline
+TIME_THRESHOLD = 1.5
+MEMORY_THRESHOLD = 1.3
+# por debajo de estos valores las diferencias son ruido
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 1.0
+
+
+def _scheduler(config):
+    return Scheduler([Person(f"P{i+1}") for i in range(PEOPLE)], SERVERS, start_day=config["start_day"])
+
+
+def stages(size, directory):
+    """
+    Etapas de un tamaño: lista de (nombre, preparar, ejecutar). preparar() devuelve
+    el argumento de ejecutar (no se mide); cada ejecución parte de datos nuevos.
+    El YAML del config se escribe en `directory`.
+    """
+    config = synthetic_config(**SIZES[size])
+    path = os.path.join(directory, f"{size}.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+
+    def scheduled_table():
+        table = build_task_table(config)
+        _scheduler(config).schedule_table(table)
+        return table
+
+    result = [
+        ("yaml_load", lambda: path, load_config),
+        ("build_processes", lambda: config, build_processes),
+        ("build_task_table", lambda: config, build_task_table),
+        ("schedule_table", lambda: build_task_table(config),
+         lambda table: _scheduler(config).schedule_table(table)),
+        ("schedule_processes", lambda: build_processes(config)[0],
+         lambda processes: _scheduler(config).schedule(processes)),
+        ("results_table", scheduled_table,
+         lambda table: schedule_frame(table, config["start_day"], display=True)),
+        ("render_lanes", scheduled_table,
+         lambda table: plot_gantt_lanes(table, config["start_day"]).to_json()),
+    ]
+    if len(build_task_table(config)) <= ROWS_RENDER_LIMIT:
+        result.append(("render_rows", lambda: scheduled_table().scheduled(),
+                       lambda tasks: plot_gantt(tasks, config["start_day"]).to_json()))
+    return result
+
+
+def measure(prepare, execute, repeat):
+    """(mejor tiempo en segundos, memoria pico en MB) de execute(prepare())."""
+    best = float("inf")
+    for _ in range(repeat):
+        arg = prepare()
+        gc.collect()
+        start = time.perf_counter()
+        execute(arg)
+        best = min(best, time.perf_counter() - start)
+
+    arg = prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        execute(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / (1024 * 1024)
+
+
+def run(sizes, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+        for size in sizes:
+            for name, prepare, execute in stages(size, directory):
+                seconds, peak_mb = measure(prepare, execute, repeat)
+                key = f"{size}/{name}"
+                results[key] = {"seconds": round(seconds, 4), "peak_mb": round(peak_mb, 2)}
+                print(f"{key:32} {seconds:9.4f} s {peak_mb:10.2f} MB", flush=True)
+    return results
+
+
+def compare(results, baseline, time_threshold, memory_threshold):
+    """Lista de regresiones (texto) respecto a la baseline."""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if current["seconds"] > max(base["seconds"], MIN_SECONDS) * time_threshold:
+            regressions.append(f"{key}: tiempo {current['seconds']:.4f} s vs {base['seconds']:.4f} s")
+        if current["peak_mb"] > max(base["peak_mb"], MIN_PEAK_MB) * memory_threshold:
+            regressions.append(f"{key}: memoria {current['peak_mb']:.2f} MB vs {base['peak_mb']:.2f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline de planificación")
+    parser.add_argument("--size", choices=list(SIZES), action="append",
+                        help="tamaño a ejecutar (repetible; por defecto todos)")
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por etapa (se toma la mejor)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="fichero JSON de la baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="guarda estos resultados como baseline")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    parser.add_argument("--out", help="guarda los resultados de esta ejecución en JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.size or list(SIZES), args.repeat)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "results": baseline}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline actualizada: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Sin baseline: ejecuta con --update-baseline para crearla")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.time_threshold, args.memory_threshold)
+    for line in regressions:
+        print(f"REGRESIÓN {line}")
+    if not regressions:
+        print("Sin regresiones respecto a la baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,19 @@
 # main.py
-from src.process_manager import load_config, build_processes
+import argparse
+from src.cache import ScheduleCache, scheduled_key
 from src.scheduler import Scheduler
 from src.visualization import plot_gantt
+from src.export import export_schedule
 from src.models import Person
+from src.store import ConfigStore, config_path, is_store
+from src.work_calendar import calendar_from_config
 from datetime import datetime
 
-def main():
-    config = load_config("config.yaml")
-    processes, global_last_map = build_processes(config)
+def main(export_path=None, quiet=False):
+    # config parseado, tareas compiladas y plan en caché (content-addressed en .cache/)
+    cache = ScheduleCache()
+    path = config_path()  # config.yaml o un almacén SQLite (SCHEDULER_CONFIG)
+    config = cache.load_config(path)
 
     # Crear personas (pool)
     people = [Person("Ana"), Person("Luis")]
@@ -16,16 +22,39 @@ def main():
     servers = {"S1": 0.0, "S2": 0.0}
 
     # start_day: datetime
-    start_day = datetime.fromisoformat(config.get("start_day"))
+    start_day = config.get("start_day")
+    if isinstance(start_day, str):
+        start_day = datetime.fromisoformat(start_day)
 
-    sched = Scheduler(people=people, servers=servers, start_day=start_day)
-    scheduled_tasks = sched.schedule(processes)
+    # Calendario laboral opcional (sección calendar): duraciones en horas de trabajo
+    work_calendar = calendar_from_config(config, start_day)
+    sched = Scheduler(people=people, servers=servers, start_day=start_day, work_calendar=work_calendar)
+    # clave de la ejecución en el almacén: antes de programar (cambia los recursos)
+    run_key = scheduled_key(config, sched)
 
-    # Mostrar plan por consola (orden)
-    for t in scheduled_tasks:
-        s = start_day + timedelta(hours=t.start_time)
-        e = start_day + timedelta(hours=t.end_time)
-        print(f"{t.client:10} | {t.name:40} | {t.task_type:9} | {t.assigned_to:10} | {s} -> {e} | prio={t.priority}")
+    # Mostrar plan por consola (orden) a medida que se programa cada tarea
+    scheduled_tasks = []
+    for t in cache.iter_scheduled(config, sched):
+        if not quiet:
+            s = start_day + timedelta(hours=t.start_time)
+            e = start_day + timedelta(hours=t.end_time)
+            print(f"{t.client:10} | {t.name:40} | {t.task_type:9} | {t.assigned_to:10} | {s} -> {e} | prio={t.priority}")
+        scheduled_tasks.append(t)
+
+    # Exportar el plan completo (CSV, Parquet o Arrow según la extensión)
+    if export_path:
+        fmt = export_schedule(scheduled_tasks, start_day, export_path)
+        print(f"Plan exportado ({fmt}): {export_path}")
+
+    # Con un almacén SQLite el plan queda guardado para consultarlo sin recalcular
+    # (una ejecución por config + recursos: si ya está guardada no se repite)
+    if is_store(path):
+        with ConfigStore(path) as store:
+            run_id = store.latest_run(run_key)
+            if run_id is None:
+                run_id = store.save_run(scheduled_tasks, start_day, config_hash=run_key, engine=sched.engine,
+                                        people=[p.name for p in people], servers=servers)
+        print(f"Plan guardado en {path} (ejecución {run_id})")
 
     # Plot Gantt
     plot_gantt(scheduled_tasks, start_day)
@@ -33,4 +62,9 @@ def main():
 
 if __name__ == "__main__":
     from datetime import timedelta
-    main()
+    parser = argparse.ArgumentParser(description="Planificación de tareas")
+    parser.add_argument("--export", metavar="FICHERO",
+                        help="exporta el plan a .csv, .parquet o .arrow")
+    parser.add_argument("--quiet", action="store_true", help="no imprime el plan por consola")
+    args = parser.parse_args()
+    main(export_path=args.export, quiet=args.quiet)
@@ -1,22 +1,46 @@
 # pages/1_visualizacion.py
+import io
+import time
+import uuid
 import streamlit as st
-import yaml
 from datetime import datetime, timedelta
-from src.process_manager import build_processes
+from src.cache import ScheduleCache, scheduled_key
 from src.scheduler import Scheduler
-from src.visualization import plot_gantt
+from src.visualization import LANES_THRESHOLD, GanttLOD, gantt_columns, plot_gantt, plot_gantt_lanes
 from src.models import Person
+from src.export import schedule_columns, schedule_frame, write_csv
+from src.instrumentation import Instrumentation, streamlit_panel
+from src.runner import CANCELLED, DONE, FAILED, Runner
+from src.store import ConfigStore, config_path, is_store
+from src.work_calendar import calendar_from_config
 
-CONFIG_FILE = "config.yaml"
+CONFIG_FILE = config_path()  # config.yaml o un almacén SQLite (SCHEDULER_CONFIG)
+REFRESH_SECONDS = 1.0  # cada cuánto se refresca la vista parcial durante el cálculo
+PREVIEW_ROWS = 200     # filas de la tabla parcial (las últimas programadas)
 
-def load_config():
-    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+# Caché en disco: config parseado, tareas compiladas y resultados del scheduler
+cache = ScheduleCache()
 
 st.set_page_config(page_title="Visualización Gantt", layout="wide")
 st.title("📈 Visualización del Gantt")
 
-config = load_config()
+
+@st.cache_resource
+def get_runner():
+    # cálculos en segundo plano, compartidos por todas las sesiones (src/runner.py)
+    return Runner()
+
+
+runner = get_runner()
+session = st.session_state
+session.setdefault("gantt_owner", uuid.uuid4().hex)
+
+# Instrumentación opcional de esta ejecución de la página (carga, scheduler, Plotly)
+instrument = st.sidebar.checkbox("⏱️ Instrumentar", value=False)
+instr = Instrumentation(track_allocations=st.sidebar.checkbox("Medir memoria", value=False)) \
+    if instrument else None
+
+config = cache.load_config(CONFIG_FILE, instr)
 
 # Fecha de inicio
 raw_start = config.get("start_day")
@@ -24,34 +48,134 @@ if isinstance(raw_start, str):
     start_date = datetime.fromisoformat(raw_start)
 else:
     start_date = raw_start
+# Calendario laboral opcional (sección calendar del config); forma parte de run_key
+work_calendar = calendar_from_config(config, start_date)
+
+
+def export_csv(table, start_date):
+    buffer = io.StringIO()
+    write_csv(schedule_columns(table, start_date), buffer)
+    return buffer.getvalue()
+
+
+# Pool de personas y servidores
+PEOPLE = ["Ana", "Luis"]
+SERVERS = {"S1": 0.0, "S2": 0.0}
+
+
+def make_scheduler(instrumentation=None):
+    return Scheduler([Person(name) for name in PEOPLE], SERVERS, start_day=start_date,
+                     instrumentation=instrumentation, work_calendar=work_calendar)
+
+
+def schedule_job(config, previous, instrumentation):
+    """
+    Cálculo del Gantt para el Runner (se ejecuta en otro hilo). Las tareas se
+    publican según se programan (progreso y Gantt parcial) y el cálculo se puede
+    cancelar entre dos tareas. Con un cálculo previo en la sesión solo se reprograma
+    desde el primer punto afectado por los cambios (o completo si cambió la
+    estructura): las filas reutilizadas se publican primero. Usa la caché en disco.
+    Con un almacén SQLite el plan se guarda además como una ejecución (src/store.py).
+    """
+    def job(run):
+        sched = make_scheduler(instrumentation)
+        compiled = cache.compiled(config, instrumentation)
+        rows = cache.iter_scheduled(config, sched, previous=previous, compiled=compiled)
+        done = list(run.track(rows, len(compiled)))
+        table = done[-1].table if done else cache.scheduled(config, sched)
+        if is_store(CONFIG_FILE):
+            with ConfigStore(CONFIG_FILE) as store:
+                if store.latest_run(run.key) is None:
+                    store.save_run(table, start_date, config_hash=run.key, engine=sched.engine,
+                                   people=PEOPLE, servers=SERVERS)
+        return table
+    return job
+
+
+def submit():
+    # un cálculo por clave (config + recursos): repetir la petición se une al que
+    # ya está en marcha, y pedir otra clave cancela el anterior de esta sesión
+    session["gantt_run"] = run_key
+    session["gantt_run_instr"] = instr
+    runner.submit(run_key, schedule_job(config, session.get("gantt_previous"), instr),
+                  owner=session["gantt_owner"])
+
+
+run_key = scheduled_key(config, make_scheduler())
 
 # Botón para recalcular Gantt
 if st.button("🚀 Calcular Gantt"):
-    # Construir procesos
-    processes, global_last_map = build_processes(config)
+    submit()
 
-    # Crear pool de personas y servidores
-    people = [Person("Ana"), Person("Luis")]
-    servers = {"S1": 0.0, "S2": 0.0}
+# Cálculo en curso: si la config ha cambiado desde que se pidió, se sustituye
+run = runner.get(session["gantt_run"]) if "gantt_run" in session else None
+if run is not None and run.active and run.key != run_key:
+    submit()
+    run = runner.get(run_key)
 
-    # Ejecutar scheduler
-    sched = Scheduler(people, servers, start_day=start_date)
-    tasks = sched.schedule(processes)
+if run is not None and run.active:
+    fraction = run.fraction
+    text = (f"{run.done}/{run.total} tareas programadas ({run.elapsed:.0f} s)" if fraction is not None
+            else f"Programando tareas... ({run.elapsed:.0f} s)")
+    st.progress(fraction or 0.0, text=text)
+    if st.button("⏹️ Cancelar"):
+        runner.release(session["gantt_owner"])
+        session.pop("gantt_run", None)
+        st.rerun()
+    done = run.snapshot()
+    if done:
+        # vista parcial: Gantt y últimas filas programadas hasta ahora
+        st.plotly_chart(plot_gantt_lanes(done, start_date), use_container_width=True)
+        st.dataframe(schedule_frame(done[-PREVIEW_ROWS:], start_date, display=True))
+    time.sleep(REFRESH_SECONDS)
+    st.rerun()
+elif run is not None:
+    # terminado: se recoge el resultado una vez y la sesión deja de esperarlo
+    if run.state == DONE:
+        table = run.result
+        session["gantt_previous"] = table
+        session["gantt_lod"] = GanttLOD(gantt_columns(table))
+        session["gantt_instr"] = session.get("gantt_run_instr")
+    elif run.state == FAILED:
+        st.error(f"Error al programar: {run.error}")
+    elif run.state == CANCELLED:
+        st.info("Cálculo cancelado.")
+    runner.release(session["gantt_owner"])
+    session.pop("gantt_run", None)
+    session.pop("gantt_run_instr", None)
 
-    # Mostrar Gantt
+# El resultado queda en la sesión para poder mover la ventana temporal sin recalcular
+if "gantt_previous" in session:
+    table = session["gantt_previous"]
+    tasks = table.scheduled()
+
+    # Mostrar Gantt: una fila por tarea en planes pequeños; en planes grandes un
+    # carril por recurso (WebGL) con solo la ventana visible y las barras que no
+    # se verían a ese zoom agrupadas por recurso
     st.subheader("📈 Gantt")
-    plot_gantt(tasks, start_date)
+    lod = session["gantt_lod"]
+    span_start = start_date + timedelta(hours=lod.span[0])
+    span_end = start_date + timedelta(hours=max(lod.span[1], lod.span[0] + 1))
+    window_dates = st.slider(
+        "Ventana temporal", min_value=span_start, max_value=span_end,
+        value=(span_start, span_end), step=timedelta(hours=1), format="YYYY-MM-DD HH:mm"
+    )
+    t0, t1 = ((d - start_date).total_seconds() / 3600 for d in window_dates)
+    if len(tasks) > LANES_THRESHOLD:
+        fig = plot_gantt_lanes(None, start_date, columns=lod.view(t0, t1), x_range=(t0, t1),
+                               instrumentation=instr)
+    else:
+        fig = plot_gantt([t for t in tasks if t.end_time >= t0 and t.start_time <= t1], start_date,
+                         instrumentation=instr)
+    st.plotly_chart(fig, use_container_width=True)
 
     # Tabla de resultados
     st.subheader("📋 Tabla de tareas")
-    data = []
-    for t in tasks:
-        data.append({
-            "Cliente": t.client,
-            "Tarea": t.name,
-            "Asignado a": getattr(t, "assigned_to", None),
-            "Inicio": start_date + timedelta(hours=t.start_time),
-            "Fin": start_date + timedelta(hours=t.end_time),
-            "Prioridad": t.priority
-        })
-    st.dataframe(data)
+    st.dataframe(schedule_frame(table, start_date, display=True))
+    st.download_button("⬇️ Descargar CSV", export_csv(table, start_date),
+                       file_name="planificacion.csv", mime="text/csv")
+
+if instr is not None:
+    streamlit_panel(instr)
+if session.get("gantt_instr") is not None:
+    streamlit_panel(session["gantt_instr"], title="⏱️ Instrumentación (cálculo)")
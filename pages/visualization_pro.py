@@ -1,12 +1,105 @@
 import streamlit as st
-import yaml
 from datetime import datetime, timedelta
-from src.process_manager import build_processes
+from src.cache import ScheduleCache, file_hash
 from src.scheduler import Scheduler
-from src.visualization import plot_gantt  # función que devuelve figura Plotly
+from src.visualization import (  # funciones que devuelven figura Plotly
+    LANES_THRESHOLD, GanttLOD, gantt_columns, plot_gantt, plot_gantt_lanes
+)
+from src.analysis import critical_path
 from src.models import Person
+from src.export import schedule_frame
+from src.instrumentation import Instrumentation, streamlit_panel
+from src.process_manager import build_task_table, load_config as read_config
+from src.store import config_path
+from src.work_calendar import calendar_from_config
+
+CONFIG_FILE = config_path()  # config.yaml o un almacén SQLite (SCHEDULER_CONFIG)
+
+# -------------------------
+# Etapas cacheadas
+# -------------------------
+# Cada etapa se memoiza con una clave hasheable: config_key es el sha256 del fichero
+# de configuración y el resto son tuplas de recursos. Los argumentos con "_" no se
+# hashean (van siempre acompañados de su clave). Los nombres de las personas no
+# entran en la planificación: solo se usan al pintar (relabel), así que escribir
+# en los inputs del sidebar no vuelve a ejecutar el scheduler.
+
+@st.cache_resource
+def get_cache():
+    return ScheduleCache()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_config(config_key):
+    return get_cache().load_config(CONFIG_FILE)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def compiled_table(config_key, _config):
+    return get_cache().compiled(_config)
+
+
+@st.cache_resource(show_spinner="Calculando planificación...", max_entries=16)
+def scheduled_table(config_key, num_people, servers, start_date, engine, _config):
+    # personas anónimas: la asignación solo depende de su número y disponibilidad
+    people = [Person(f"Persona_{i+1}") for i in range(num_people)]
+    # el calendario laboral (si hay) sale del config: config_key ya lo cubre
+    sched = Scheduler(people, dict(servers), start_day=start_date, engine=engine,
+                      work_calendar=calendar_from_config(_config, start_date))
+    return sched.schedule_table(compiled_table(config_key, _config).copy())
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def critical_names(config_key, _config):
+    return critical_path(compiled_table(config_key, _config)).critical_names()
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def gantt_lod(config_key, num_people, servers, start_date, engine, people_names, show_critical, _config):
+    table = scheduled_table(config_key, num_people, servers, start_date, engine, _config).relabeled(people_names)
+    critical = critical_names(config_key, _config) if show_critical else None
+    return GanttLOD(gantt_columns(table, critical))
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def gantt_figure(config_key, num_people, servers, start_date, engine, people_names, show_critical, view, window,
+                 _config):
+    # window: (inicio, fin) en horas; solo se envía al navegador lo que cae dentro
+    if view == "Por recurso":
+        lod = gantt_lod(config_key, num_people, servers, start_date, engine, people_names, show_critical, _config)
+        return plot_gantt_lanes(None, start_date, columns=lod.view(*window), x_range=window)
+    table = scheduled_table(config_key, num_people, servers, start_date, engine, _config).relabeled(people_names)
+    critical = critical_names(config_key, _config) if show_critical else None
+    t0, t1 = window
+    tasks = [t for t in table.scheduled() if t.end_time >= t0 and t.start_time <= t1]
+    return plot_gantt(tasks, start_date, critical=critical)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def task_rows(config_key, num_people, servers, start_date, engine, people_names, _config):
+    table = scheduled_table(config_key, num_people, servers, start_date, engine, _config).relabeled(people_names)
+    return schedule_frame(table, start_date, display=True)
+
+
+def profile_pipeline(num_people, servers, start_date, engine, people_names, view, track_allocations):
+    # las etapas de arriba están memoizadas y no reflejan el coste real: se repite
+    # el pipeline completo, sin cachés, con la instrumentación activada
+    instr = Instrumentation(track_allocations=track_allocations)
+    with instr.phase("pipeline"):
+        cfg = read_config(CONFIG_FILE, instr)
+        table = build_task_table(cfg, instr)
+        people = [Person(f"Persona_{i+1}") for i in range(num_people)]
+        Scheduler(people, dict(servers), start_day=start_date, engine=engine, instrumentation=instr,
+                  work_calendar=calendar_from_config(cfg, start_date)).schedule_table(table)
+        with instr.phase("critical_path"):
+            critical = critical_path(table).critical_names()
+        table = table.relabeled(people_names)
+        if view == "Por recurso":
+            plot_gantt_lanes(table, start_date, critical=critical, instrumentation=instr)
+        else:
+            plot_gantt(table.scheduled(), start_date, critical=critical, instrumentation=instr)
+    return instr
 
-CONFIG_FILE = "config.yaml"
 
 # -------------------------
 # Configuración de página
@@ -26,17 +119,18 @@ people_names = []
 for i in range(num_people):
     name = st.sidebar.text_input(f"Nombre persona {i+1}", value=f"Persona_{i+1}")
     people_names.append(name)
+people_names = tuple(people_names)
 
-people = [Person(name) for name in people_names]
+show_critical = st.sidebar.checkbox("Resaltar camino crítico", value=True)
+view_choice = st.sidebar.radio("Vista del Gantt", ["Automática", "Por tarea", "Por recurso"])
+# backfill: calendario de huecos por recurso; las tareas aprovechan los huecos anteriores
+engine = "backfill" if st.sidebar.checkbox("Rellenar huecos (backfill)", value=False) else "heap"
 
 # -------------------------
 # Cargar configuración YAML
 # -------------------------
-def load_config():
-    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
-
-config = load_config()
+config_key = file_hash(CONFIG_FILE)
+config = load_config(config_key)
 
 raw_start = config.get("start_day")
 if isinstance(raw_start, str):
@@ -44,34 +138,44 @@ if isinstance(raw_start, str):
 else:
     start_date = raw_start
 
-# -------------------------
-# Construir procesos y scheduler
-# -------------------------
-processes, global_last_map = build_processes(config)
-
-servers = {"S1": 0.0, "S2": 0.0}  # dos servidores
-sched = Scheduler(people, servers, start_day=start_date)
-tasks = sched.schedule(processes)
+servers = (("S1", 0.0), ("S2", 0.0))  # dos servidores
 
 # -------------------------
 # Mostrar Gantt
 # -------------------------
-fig = plot_gantt(tasks, start_date)
+# en automático, los planes grandes se pintan por recurso (WebGL) en lugar de una fila por tarea
+view = view_choice
+if view == "Automática":
+    view = "Por recurso" if len(compiled_table(config_key, config)) > LANES_THRESHOLD else "Por tarea"
+
+# ventana temporal visible: al moverla solo se vuelve a consultar el índice de intervalos
+lod = gantt_lod(config_key, num_people, servers, start_date, engine, people_names, show_critical, config)
+span_start = start_date + timedelta(hours=lod.span[0])
+span_end = start_date + timedelta(hours=max(lod.span[1], lod.span[0] + 1))
+window_dates = st.slider(
+    "Ventana temporal", min_value=span_start, max_value=span_end,
+    value=(span_start, span_end), step=timedelta(hours=1), format="YYYY-MM-DD HH:mm"
+)
+window = tuple((d - start_date).total_seconds() / 3600 for d in window_dates)
+fig = gantt_figure(config_key, num_people, servers, start_date, engine, people_names, show_critical, view, window,
+                   config)
 st.plotly_chart(fig, use_container_width=True)
 
 # -------------------------
 # Tabla de resultados
 # -------------------------
 st.subheader("📋 Tabla de tareas")
-data = []
-for t in tasks:
-    data.append({
-        "Cliente": t.client,
-        "Tarea": t.name,
-        "Asignado a": getattr(t, "assigned_to", None),
-        "Inicio": start_date + timedelta(hours=t.start_time),
-        "Fin": start_date + timedelta(hours=t.end_time),
-        "Prioridad": t.priority
-    })
-
-st.dataframe(data)
+st.dataframe(task_rows(config_key, num_people, servers, start_date, engine, people_names, config))
+
+# -------------------------
+# Instrumentación
+# -------------------------
+st.sidebar.header("Rendimiento")
+track_allocations = st.sidebar.checkbox("Medir memoria", value=False)
+if st.sidebar.button("⏱️ Perfilar pipeline"):
+    with st.spinner("Ejecutando el pipeline instrumentado..."):
+        st.session_state["pro_instrumentation"] = profile_pipeline(
+            num_people, servers, start_date, engine, people_names, view, track_allocations
+        )
+if "pro_instrumentation" in st.session_state:
+    streamlit_panel(st.session_state["pro_instrumentation"], title="⏱️ Instrumentación (sin caché)")
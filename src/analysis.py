@@ -0,0 +1,253 @@
+# analysis.py
+import numpy as np
+from src.models import TaskTable
+
+# holgura por debajo de la cual una tarea se considera crítica (horas)
+CRITICAL_EPS = 1e-9
+# ciclos que se detallan en el mensaje de DependencyCycleError
+CYCLES_IN_MESSAGE = 5
+
+
+class DependencyCycleError(RuntimeError):
+    """
+    Dependencias circulares. cycles: un ciclo concreto por componente fuertemente
+    conexa, como lista de nombres (cada uno depende del siguiente y el último del
+    primero); components: todos los miembros de cada componente.
+    """
+
+    def __init__(self, cycles, components=None):
+        self.cycles = cycles
+        self.components = components if components is not None else cycles
+        shown = "; ".join(" -> ".join(c + c[:1]) for c in cycles[:CYCLES_IN_MESSAGE])
+        more = f" (y {len(cycles) - CYCLES_IN_MESSAGE} más)" if len(cycles) > CYCLES_IN_MESSAGE else ""
+        super().__init__(f"Ciclo de dependencias: {shown}{more}")
+
+
+class CriticalPath:
+    """
+    Resultado del análisis CPM (sin restricciones de recursos) sobre una TaskTable.
+    Arrays por fila de la tabla, en horas desde start_day:
+      es/ef: earliest start / earliest finish (forward pass, respeta start_after)
+      ls/lf: latest start / latest finish sin retrasar el fin del proyecto
+      slack: ls - es; critical: slack <= CRITICAL_EPS
+    levels: lista de arrays de filas por nivel topológico.
+    """
+
+    def __init__(self, table, levels, es, ef, ls, lf):
+        self.table = table
+        self.levels = levels
+        self.es = es
+        self.ef = ef
+        self.ls = ls
+        self.lf = lf
+        self.slack = ls - es
+        self.critical = self.slack <= CRITICAL_EPS
+        self.makespan = float(ef.max()) if len(ef) else 0.0
+
+    def critical_names(self):
+        """Nombres de las tareas críticas (para resaltarlas en el Gantt)."""
+        return {self.table.names[i] for i in np.flatnonzero(self.critical).tolist()}
+
+    def __repr__(self):
+        return (f"CriticalPath(tasks={len(self.es)}, levels={len(self.levels)}, "
+                f"makespan={self.makespan}, critical={int(self.critical.sum())})")
+
+
+def _gather(indptr, indices, nodes):
+    """
+    Aristas CSR de un conjunto de nodos: devuelve (owner, neighbour) con una entrada
+    por arista, owner repetido tantas veces como vecinos tenga.
+    """
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    owners = np.repeat(nodes, counts)
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    return owners, indices[offsets]
+
+
+def find_cycles(indptr, indices, nodes=None):
+    """
+    Componentes fuertemente conexas con algún ciclo (Tarjan iterativo, O(V + E)) del
+    grafo CSR indptr/indices (listas: las aristas de i son indices[indptr[i]:indptr[i+1]]).
+    nodes limita la búsqueda a esos nodos (p. ej. los que Kahn no pudo ordenar).
+    Devuelve [(ciclo, miembros)]: ciclo es un recorrido concreto dentro de la
+    componente y miembros todos sus nodos, ambos como listas de índices.
+    """
+    n = len(indptr) - 1
+    if nodes is None:
+        nodes = range(n)
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    result = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, indptr[root])]
+        while work:
+            v, k = work[-1]
+            if k < indptr[v + 1]:
+                work[-1] = (v, k + 1)
+                w = indices[k]
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, indptr[w]))
+                elif w in on_stack and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] != index[v]:
+                continue
+            members = []
+            while True:
+                w = stack.pop()
+                on_stack.discard(w)
+                members.append(w)
+                if w == v:
+                    break
+            if len(members) > 1 or v in indices[indptr[v]:indptr[v + 1]]:
+                result.append((_cycle_in(indptr, indices, set(members), v), members[::-1]))
+    return result
+
+
+def _cycle_in(indptr, indices, members, start):
+    # recorrido dentro de la componente desde start hasta repetir un nodo: como todo
+    # nodo de la componente tiene una arista hacia ella, siempre se cierra un ciclo
+    path = []
+    position = {}
+    v = start
+    while v not in position:
+        position[v] = len(path)
+        path.append(v)
+        v = next(w for w in indices[indptr[v]:indptr[v + 1]] if w in members)
+    return path[position[v]:]
+
+
+def _unsorted(table):
+    """Filas que Kahn no puede ordenar (en ciclos o detrás de uno); vacío si no hay ciclos."""
+    succ_indptr, succ_indices = table.dependents()
+    indeg = np.diff(table.dep_indptr)
+    frontier = np.flatnonzero(indeg == 0)
+    while frontier.size:
+        _, targets = _gather(succ_indptr, succ_indices, frontier)
+        np.subtract.at(indeg, targets, 1)
+        targets = np.unique(targets)
+        frontier = targets[indeg[targets] == 0]
+    return np.flatnonzero(indeg > 0)
+
+
+def cycle_error(table, rows=None):
+    """DependencyCycleError con los ciclos de la tabla (rows: filas sin ordenar, si se conocen)."""
+    if rows is None:
+        rows = _unsorted(table)
+    found = find_cycles(table.dep_indptr.tolist(), table.dep_indices.tolist(), rows.tolist())
+    names = table.names
+    return DependencyCycleError([[names[i] for i in cycle] for cycle, _ in found],
+                                [[names[i] for i in members] for _, members in found])
+
+
+def check_acyclic(table):
+    """
+    Comprueba en tiempo lineal (Kahn vectorizado; Tarjan solo sobre lo que no se pudo
+    ordenar) que la tabla no tiene dependencias circulares. Lanza
+    DependencyCycleError con los ciclos. El resultado se recuerda mientras la tabla
+    conserve el mismo array de dependencias.
+    table también puede ser una lista de Task (se usa Tarjan directamente).
+    """
+    if not isinstance(table, TaskTable):
+        tasks = list(table)
+        position = {t: i for i, t in enumerate(tasks)}
+        indptr = [0]
+        indices = []
+        for t in tasks:
+            # las dependencias fuera de la lista no pueden cerrar un ciclo
+            indices.extend(position[d] for d in t.dependencies if d in position)
+            indptr.append(len(indices))
+        found = find_cycles(indptr, indices)
+        if found:
+            raise DependencyCycleError([[tasks[i].name for i in cycle] for cycle, _ in found],
+                                       [[tasks[i].name for i in members] for _, members in found])
+        return
+    if getattr(table, "_acyclic_deps", None) is table.dep_indices:
+        return
+    rows = _unsorted(table)
+    if rows.size:
+        raise cycle_error(table, rows)
+    mark_acyclic(table)
+
+
+def mark_acyclic(table):
+    """
+    Marca la tabla como ya comprobada, para quien lo garantiza por construcción
+    (build_task_table verifica cada plantilla al compilarla).
+    """
+    table._acyclic_deps = table.dep_indices
+
+
+def topological_levels(table):
+    """
+    Kahn por niveles: el nivel 0 son las tareas sin dependencias y el nivel k las que
+    dependen de alguna tarea del nivel k-1 y de ninguna posterior. Cada nivel se
+    procesa con operaciones vectorizadas sobre el CSR de dependientes.
+    """
+    n = len(table)
+    succ_indptr, succ_indices = table.dependents()
+    indeg = np.diff(table.dep_indptr)
+    frontier = np.flatnonzero(indeg == 0)
+    levels = []
+    visited = 0
+    while frontier.size:
+        levels.append(frontier)
+        visited += frontier.size
+        _, targets = _gather(succ_indptr, succ_indices, frontier)
+        np.subtract.at(indeg, targets, 1)
+        targets = np.unique(targets)
+        frontier = targets[indeg[targets] == 0]
+    if visited < n:
+        raise cycle_error(table, np.flatnonzero(indeg > 0))
+    return levels
+
+
+def critical_path(tasks):
+    """
+    Forward/backward pass CPM por niveles topológicos.
+    tasks: lista de Process (salida de build_processes) o una TaskTable.
+    """
+    table = tasks if isinstance(tasks, TaskTable) else TaskTable.from_processes(tasks)
+    levels = topological_levels(table)
+
+    duration = table.duration.copy()
+    duration[table.type_mask("milestone")] = 0.0
+
+    # forward pass: ES = max(start_after, EF de las dependencias)
+    es = table.start_after.copy()
+    ef = np.empty_like(es)
+    succ_indptr, succ_indices = table.dependents()
+    for nodes in levels:
+        ef[nodes] = es[nodes] + duration[nodes]
+        owners, targets = _gather(succ_indptr, succ_indices, nodes)
+        np.maximum.at(es, targets, ef[owners])
+
+    # backward pass: LF = min(LS de los dependientes), o el fin del proyecto
+    makespan = ef.max() if len(ef) else 0.0
+    lf = np.full_like(es, makespan)
+    ls = np.empty_like(es)
+    for nodes in reversed(levels):
+        ls[nodes] = lf[nodes] - duration[nodes]
+        owners, deps = _gather(table.dep_indptr, table.dep_indices, nodes)
+        np.minimum.at(lf, deps, ls[owners])
+
+    return CriticalPath(table, levels, es, ef, ls, lf)
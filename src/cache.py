@@ -0,0 +1,281 @@
+# cache.py
+import hashlib
+import json
+import os
+import tempfile
+from datetime import date, datetime
+
+import yaml
+
+from src.instrumentation import NULL
+from src.models import load_table, save_table
+from src.process_manager import build_task_table, load_config
+from src.store import config_revision, is_store
+
+CACHE_DIR = ".cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+# versión de las entradas: forma parte de todas las claves de config_hash, así que
+# al subirla las entradas antiguas dejan de encontrarse. Hay que subirla con cada
+# cambio que altere los resultados (expansión de plantillas, reglas o desempates
+# de los motores, calendarios) o el formato de las tablas guardadas (save_table).
+CACHE_VERSION = 1
+
+
+def _canonical(value):
+    # JSON estable: claves ordenadas, fechas en ISO
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Valor no serializable en la configuración: {value!r}")
+
+
+def _tagged(value):
+    # fechas del config en JSON sin perder el tipo (yaml.safe_load da datetime y date)
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Valor no serializable en la configuración: {value!r}")
+
+
+def _untagged(obj):
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def _dump_config(config):
+    """Config parseado -> JSON (bytes) para la caché; las fechas conservan su tipo."""
+    return json.dumps(config, default=_tagged, ensure_ascii=False).encode("utf-8")
+
+
+def _parse_config(blob):
+    """Inversa de _dump_config."""
+    return json.loads(blob.decode("utf-8"), object_hook=_untagged)
+
+
+def config_hash(config, people=None, servers=None, start_day=None, engine=None, calendars=None,
+                work_calendar=None):
+    """
+    Hash canónico (sha256) de la configuración y, opcionalmente, de los recursos
+    con los que se programa: personas (nombre y disponibilidad), servidores y start_day.
+    engine y calendars solo se incluyen si cambian el resultado (motor backfill);
+    work_calendar (WorkCalendar) si se programa en horas de trabajo.
+    Incluye CACHE_VERSION: el mismo config da otra clave con otra versión del código.
+    """
+    payload = {"version": CACHE_VERSION, "config": config}
+    if people is not None:
+        payload["people"] = [[p.name, p.available_from] for p in people]
+    if servers is not None:
+        payload["servers"] = sorted(servers.items())
+    if start_day is not None:
+        payload["start_day"] = start_day
+    if engine is not None:
+        payload["engine"] = engine
+    if calendars:
+        payload["calendars"] = calendars
+    if work_calendar is not None:
+        payload["work_calendar"] = work_calendar.spec()
+    blob = json.dumps(payload, sort_keys=True, default=_canonical, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def scheduled_key(config, scheduler):
+    """
+    Clave del plan de `config` con los recursos, el motor y los calendarios de
+    `scheduler` (antes de programar: programar cambia la disponibilidad de los
+    recursos). greedy y heap dan el mismo resultado y comparten clave.
+    """
+    backfill = scheduler.engine == "backfill"
+    return config_hash(config, scheduler.people, scheduler.servers, scheduler.start_day,
+                       engine="backfill" if backfill else None,
+                       calendars=scheduler.calendars if backfill else None,
+                       work_calendar=scheduler.work_calendar)
+
+
+def file_hash(path):
+    """
+    sha256 del contenido de un fichero (clave de caché del config sin parsearlo).
+    En un almacén SQLite, de su revisión de config: guardar planes no la cambia.
+    """
+    if is_store(path):
+        return hashlib.sha256(f"store:{config_revision(path)}".encode()).hexdigest()
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ScheduleCache:
+    """
+    Caché en disco direccionada por contenido, compartida entre procesos y reinicios.
+    Guarda configs parseados (JSON, por hash del fichero), tablas compiladas (por hash de
+    la config) y tablas programadas (por hash de config + recursos + start_day).
+    Las tablas se guardan en .npz (ver models.save_table); las entradas se expulsan
+    por LRU (mtime, que se actualiza en cada acierto) al superar max_bytes.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Entradas genéricas
+    # ------------------------------------------------------------------
+    def _path(self, kind, key, ext):
+        return os.path.join(self.directory, f"{kind}-{key}.{ext}")
+
+    def _hit(self, path):
+        if not os.path.exists(path):
+            return False
+        try:
+            os.utime(path)  # LRU: marcar como usada
+        except OSError:
+            return False
+        return True
+
+    def _write(self, path, write):
+        # escritura atómica: fichero temporal en el mismo directorio + os.replace
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Borra las entradas menos usadas hasta quedar por debajo de max_bytes."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                os.remove(entry.path)
+
+    def get_table(self, kind, key):
+        path = self._path(kind, key, "npz")
+        if not self._hit(path):
+            return None
+        try:
+            return load_table(path)
+        except (OSError, ValueError, KeyError):
+            # entrada corrupta o de un formato anterior: se recalcula
+            return None
+
+    def put_table(self, kind, key, table):
+        self._write(self._path(kind, key, "npz"), lambda f: save_table(table, f))
+
+    # ------------------------------------------------------------------
+    # Etapas del pipeline
+    # ------------------------------------------------------------------
+    def load_config(self, path, instrumentation=None):
+        """
+        yaml.safe_load con caché por hash del contenido del fichero. Un almacén
+        SQLite (src/store.py) se lee con ConfigStore, con la misma caché. El config
+        se guarda en JSON (nunca pickle: la caché es un directorio compartido) y
+        cualquier entrada ilegible se descarta y se vuelve a parsear.
+        """
+        instr = instrumentation or NULL
+        if is_store(path):
+            raw, key = None, file_hash(path)
+        else:
+            with open(path, "rb") as f:
+                raw = f.read()
+            key = hashlib.sha256(raw).hexdigest()
+        cached = self._path("config", key, "json")
+        if self._hit(cached):
+            try:
+                with instr.phase("config_cache_load"), open(cached, "rb") as f:
+                    config = _parse_config(f.read())
+                instr.count("cache.config_hit")
+                return config
+            except Exception:
+                # entrada corrupta, truncada o de otro formato: se vuelve a parsear
+                pass
+        instr.count("cache.config_miss")
+        if is_store(path):
+            config = load_config(path, instrumentation)
+        else:
+            with instr.phase("yaml_load", path=str(path)):
+                config = yaml.safe_load(raw.decode("utf-8"))
+        try:
+            blob = _dump_config(config)
+        except (TypeError, ValueError):
+            return config   # tipos que JSON no representa: sin caché
+        if _parse_config(blob) == config:   # p. ej. claves no str: JSON las cambiaría
+            self._write(cached, lambda f: f.write(blob))
+        return config
+
+    def compiled(self, config, instrumentation=None):
+        """TaskTable sin programar de la config (build_task_table)."""
+        instr = instrumentation or NULL
+        key = config_hash(config)
+        table = self.get_table("compiled", key)
+        if table is None:
+            instr.count("cache.compiled_miss")
+            table = build_task_table(config, instrumentation)
+            self.put_table("compiled", key, table)
+        else:
+            instr.count("cache.compiled_hit")
+        return table
+
+    def scheduled(self, config, scheduler, previous=None):
+        """
+        TaskTable programada con los recursos de `scheduler`. En un acierto no se
+        ejecuta el scheduler (sus personas y servidores no se actualizan). En un fallo,
+        si se pasa `previous` (tabla programada anterior) se usa Scheduler.reschedule.
+        """
+        key = scheduled_key(config, scheduler)
+        table = self.get_table("scheduled", key)
+        instr = scheduler.instrumentation
+        instr.count("cache.scheduled_hit" if table is not None else "cache.scheduled_miss")
+        if table is None:
+            table = self.compiled(config, instr)
+            if previous is not None:
+                scheduler.reschedule(previous, table)
+            else:
+                scheduler.schedule_table(table)
+            self.put_table("scheduled", key, table)
+        return table
+
+    def iter_scheduled(self, config, scheduler, previous=None, compiled=None):
+        """
+        Como scheduled(), pero produce las filas (TaskView) según se programan.
+        En un acierto las produce de la tabla guardada; en un fallo usa
+        Scheduler.iter_schedule (o iter_reschedule si se pasa `previous`) y guarda
+        la tabla al terminar. `compiled`: tabla de self.compiled(config) si ya se
+        tiene (no se vuelve a cargar; en un fallo se programa sobre ella).
+        """
+        key = scheduled_key(config, scheduler)
+        table = self.get_table("scheduled", key)
+        instr = scheduler.instrumentation
+        instr.count("cache.scheduled_hit" if table is not None else "cache.scheduled_miss")
+        if table is not None:
+            yield from table.scheduled()
+            return
+        table = compiled if compiled is not None else self.compiled(config, instr)
+        if previous is not None:
+            yield from scheduler.iter_reschedule(previous, table)
+        else:
+            yield from scheduler.iter_schedule(table)
+        self.put_table("scheduled", key, table)
@@ -0,0 +1,379 @@
+# config_editor.py
+# Editor de config.yaml para las páginas de Streamlit (pages/2_configurator.py y
+# pages/configuration_page.py). Con miles de tareas no se puede pintar un
+# expander por tarea en cada rerun: la config se edita sobre un borrador en la
+# sesión, cada lista se filtra (búsqueda, tipo) y se pagina, y solo se crean los
+# widgets de la página visible. Guardar calcula un diff estructural contra la
+# config cargada y solo escribe (de forma atómica) si hay cambios. Con un almacén
+# SQLite (src/store.py) en lugar de YAML solo se reescriben las partes cambiadas.
+import copy
+import os
+import tempfile
+from datetime import date, datetime
+
+import yaml
+
+from src.cache import file_hash
+from src.store import ConfigStore, is_store
+
+TASK_TYPES = ["manual", "automated"]
+PAGE_SIZE = 20
+DEFAULT_DURATION = 1
+DEFAULT_PRIORITY = 999
+# valor ausente en config_diff (clave que no existe o posición fuera de la lista)
+MISSING = "<ausente>"
+
+
+# --------------------
+# Fichero
+# --------------------
+def read_config(path):
+    if is_store(path):
+        with ConfigStore(path) as store:
+            return store.load_config()
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def write_config(path, config):
+    """Escritura atómica: fichero temporal en el mismo directorio + os.replace."""
+    if is_store(path):
+        with ConfigStore(path) as store:
+            store.save_config(config)
+        return
+    config = dict(config)
+    if isinstance(config.get("start_day"), (datetime, date)):
+        config["start_day"] = config["start_day"].isoformat()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yaml.dump(config, f, sort_keys=False, allow_unicode=True)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def config_diff(old, new, path=""):
+    """
+    Diferencias estructurales entre dos configs: lista de (ruta, antes, después),
+    p.ej. ("process_templates.tipo1[2].duration", 3, 4.5). Los dicts se comparan
+    por clave y las listas por posición; lo que falta en un lado vale MISSING.
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in list(old) + [k for k in new if k not in old]:
+            sub = f"{path}.{key}" if path else str(key)
+            changes.extend(config_diff(old.get(key, MISSING), new.get(key, MISSING), sub))
+        return changes
+    if isinstance(old, list) and isinstance(new, list):
+        changes = []
+        for i in range(max(len(old), len(new))):
+            changes.extend(config_diff(old[i] if i < len(old) else MISSING,
+                                       new[i] if i < len(new) else MISSING, f"{path}[{i}]"))
+        return changes
+    return [(path, old, new)]
+
+
+def save_config(path, base, config, base_hash=None):
+    """
+    Guarda `config` si difiere de `base` (la config tal como se cargó). Devuelve la
+    lista de cambios (vacía: no se escribe nada). Si se da base_hash y el fichero
+    ha cambiado desde que se cargó, lanza RuntimeError en lugar de pisarlo.
+    En un almacén SQLite se aplican solo los cambios (ConfigStore.update).
+    """
+    changes = config_diff(base, config)
+    if not changes:
+        return changes
+    if base_hash is not None and file_hash(path) != base_hash:
+        raise RuntimeError(f"{path} ha cambiado desde que se cargó; recarga antes de guardar")
+    if is_store(path):
+        with ConfigStore(path) as store:
+            store.update(base, config)
+    else:
+        write_config(path, config)
+    return changes
+
+
+# --------------------
+# Índices y filtros
+# --------------------
+class DependencyIndex:
+    """
+    Nombres a los que puede apuntar una dependencia (tareas globales, plantillas,
+    tareas de plantilla y milestones), sin repetidos y en ese orden. options es la
+    lista para los multiselect; la pertenencia se consulta en un dict (O(1)).
+    """
+
+    def __init__(self, config):
+        kinds = {}
+        for g in config.get("global_tasks") or []:
+            kinds.setdefault(g["name"], "global")
+        for pname, tasks in (config.get("process_templates") or {}).items():
+            kinds.setdefault(pname, "template")
+            for t in tasks or []:
+                kinds.setdefault(t["name"], "task")
+        for m in config.get("milestones") or []:
+            kinds.setdefault(m["name"], "milestone")
+        self.kinds = kinds
+        self.options = list(kinds)
+
+    def __contains__(self, name):
+        return name in self.kinds
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def valid(self, names):
+        """Las dependencias que existen (las demás no se pueden mostrar en el multiselect)."""
+        return [d for d in names if d in self.kinds]
+
+
+def filter_tasks(tasks, query="", task_type=None):
+    """Posiciones de las tareas cuyo nombre o servidor contiene query y, si se da, de ese tipo."""
+    query = query.strip().lower()
+    return [i for i, t in enumerate(tasks)
+            if (not task_type or t.get("type", "manual") == task_type)
+            and (not query or query in str(t.get("name", "")).lower()
+                 or query in str(t.get("server") or "").lower())]
+
+
+def page_slice(items, page, page_size=PAGE_SIZE):
+    """(elementos de la página `page` (desde 1), número de páginas)."""
+    pages = max(1, -(-len(items) // page_size))
+    page = min(max(1, page), pages)
+    return items[(page - 1) * page_size:page * page_size], pages
+
+
+def apply_task_edit(task, values, defaults):
+    """
+    Copia en `task` solo los campos cuyo valor cambió respecto al actual (o a su
+    valor por defecto si falta), así las tareas que no se tocan quedan idénticas y
+    no aparecen en el diff. "" o None borran un campo opcional.
+    Devuelve True si cambió algo.
+    """
+    changed = False
+    for field, value in values.items():
+        current = task.get(field, defaults.get(field))
+        if value == current or (value in ("", None) and current in ("", None)):
+            continue
+        if value in ("", None):
+            task.pop(field, None)
+        else:
+            task[field] = value
+        changed = True
+    return changed
+
+
+# --------------------
+# Streamlit
+# --------------------
+def load_draft(path):
+    """
+    Borrador de la config en la sesión. Se recarga del fichero si este cambia y el
+    borrador no tiene cambios; si los tiene, se avisa y se ofrece descartarlos.
+    """
+    import streamlit as st
+
+    session = st.session_state
+    # valores de widgets pedidos en el rerun anterior (no se pueden cambiar una vez creados)
+    session.update(session.pop("editor_pending", {}))
+    current_hash = file_hash(path)
+    if "editor_draft" not in session:
+        _reset_draft(path, current_hash)
+    elif session["editor_base_hash"] != current_hash:
+        if session["editor_draft"] == session["editor_base"]:
+            _reset_draft(path, current_hash)
+        else:
+            st.warning(f"{path} ha cambiado en disco desde que empezaste a editar.")
+            if st.button("↩️ Recargar (descartar cambios)"):
+                _reset_draft(path, current_hash)
+                st.rerun()
+    return session["editor_draft"]
+
+
+def _reset_draft(path, digest):
+    import streamlit as st
+
+    base = read_config(path)
+    st.session_state["editor_base"] = base
+    st.session_state["editor_base_hash"] = digest
+    st.session_state["editor_draft"] = copy.deepcopy(base)
+    _bump_revision()
+
+
+def _set_later(**values):
+    # estado de widgets ya creados en este rerun: se aplica al principio del siguiente
+    import streamlit as st
+
+    st.session_state.setdefault("editor_pending", {}).update(values)
+
+
+def _bump_revision():
+    # las claves de los widgets llevan la revisión: al añadir, borrar o renombrar,
+    # los widgets se crean de nuevo con los valores del borrador
+    import streamlit as st
+
+    st.session_state["editor_rev"] = st.session_state.get("editor_rev", 0) + 1
+
+
+def edit_start_day(config):
+    import streamlit as st
+
+    raw_start = config.get("start_day")
+    if isinstance(raw_start, str):
+        start = datetime.fromisoformat(raw_start)
+    elif isinstance(raw_start, datetime):
+        start = raw_start
+    elif isinstance(raw_start, date):
+        start = datetime.combine(raw_start, datetime.min.time())
+    else:
+        start = datetime.today()
+    picked = st.date_input("📅 Start day", value=start.date(), key=f"start_day_{st.session_state['editor_rev']}")
+    if picked != start.date() or raw_start is None:
+        # se conserva la hora de inicio
+        config["start_day"] = datetime.combine(picked, start.time()).isoformat()
+
+
+def _task_widgets(task, key, index):
+    import streamlit as st
+
+    if "template" in task:
+        st.caption(f"Ejecuta la plantilla `{task['template']}`")
+    name = st.text_input("Nombre", task.get("name", ""), key=f"{key}_name")
+    duration = st.number_input("Duración (h)", min_value=0.0, step=1.0,
+                               value=float(task.get("duration", DEFAULT_DURATION)), key=f"{key}_dur")
+    ttype = task.get("type", "manual")
+    types = TASK_TYPES if ttype in TASK_TYPES else TASK_TYPES + [ttype]
+    ttype = st.selectbox("Tipo", types, index=types.index(ttype), key=f"{key}_type")
+    server = st.text_input("Servidor (opcional)", task.get("server") or "", key=f"{key}_server")
+    priority = st.number_input("Prioridad", min_value=1, step=1,
+                               value=int(task.get("priority", DEFAULT_PRIORITY)), key=f"{key}_prio")
+    shown = index.valid(task.get("dependencies") or [])
+    deps = st.multiselect("Dependencias", options=index.options, default=shown, key=f"{key}_deps")
+    values = {"name": name or task.get("name"), "duration": duration, "type": ttype, "server": server or None,
+              "priority": priority}
+    if deps != shown:
+        values["dependencies"] = deps
+    apply_task_edit(task, values, {"duration": DEFAULT_DURATION, "type": "manual",
+                                   "priority": DEFAULT_PRIORITY})
+
+
+def task_list_editor(tasks, key, index, label="Tarea", new_name="new_task"):
+    """
+    Lista de tareas filtrable y paginada: búsqueda, tipo y página; solo se pintan
+    las tareas de la página visible. Modifica `tasks` en su sitio.
+    """
+    import streamlit as st
+
+    session = st.session_state
+    rev = session["editor_rev"]
+    col1, col2, col3 = st.columns([3, 1, 1])
+    query = col1.text_input("🔎 Buscar", key=f"{key}_query", placeholder="nombre o servidor")
+    task_type = col2.selectbox("Tipo", ["(todos)"] + TASK_TYPES, key=f"{key}_filter")
+    visible = filter_tasks(tasks, query, None if task_type == "(todos)" else task_type)
+    pages = max(1, -(-len(visible) // PAGE_SIZE))
+    if session.get(f"{key}_page", 1) > pages:
+        session[f"{key}_page"] = pages
+    page = col3.number_input("Página", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    shown, _ = page_slice(visible, page)
+    st.caption(f"{len(visible)} de {len(tasks)} tareas · página {page}/{pages}")
+
+    for i in shown:
+        task = tasks[i]
+        with st.expander(f"➡️ {label} {task.get('name', '')}", expanded=False):
+            _task_widgets(task, f"{key}_{rev}_{i}", index)
+            if st.button("🗑 Eliminar", key=f"{key}_{rev}_{i}_del"):
+                del tasks[i]
+                _bump_revision()
+                st.rerun()
+
+    if st.button(f"➕ Añadir {label.lower()}", key=f"{key}_add"):
+        tasks.append({"name": f"{new_name}_{len(tasks) + 1}", "duration": DEFAULT_DURATION,
+                      "type": "manual", "priority": DEFAULT_PRIORITY, "dependencies": []})
+        _set_later(**{f"{key}_query": "", f"{key}_filter": "(todos)",
+                      f"{key}_page": -(-len(tasks) // PAGE_SIZE)})
+        _bump_revision()
+        st.rerun()
+
+
+def edit_global_tasks(config, index):
+    import streamlit as st
+
+    st.header("🌍 Global Tasks")
+    tasks = config.setdefault("global_tasks", [])
+    task_list_editor(tasks, "gt", index, label="Global Task", new_name="global_task")
+
+
+def edit_templates(config, index):
+    """Una plantilla cada vez (elegida entre las que coinciden con la búsqueda)."""
+    import streamlit as st
+
+    st.header("📦 Process Templates")
+    session = st.session_state
+    templates = config.setdefault("process_templates", {})
+    col1, col2 = st.columns([1, 2])
+    query = col1.text_input("🔎 Buscar plantilla", key="tpl_query").strip().lower()
+    names = [p for p in templates if query in p.lower()]
+    if not names:
+        st.info("Ninguna plantilla coincide con la búsqueda.")
+    else:
+        if session.get("tpl_selected") not in names:
+            session["tpl_selected"] = names[0]
+        pname = col2.selectbox(f"Plantilla ({len(names)} de {len(templates)})", names, key="tpl_selected")
+        rev = session["editor_rev"]
+        new_pname = st.text_input("Nombre plantilla", pname, key=f"tpl_{rev}_{pname}_name").strip()
+        if new_pname and new_pname != pname and new_pname not in templates:
+            # renombrar conservando el orden de las plantillas
+            renamed = {(new_pname if p == pname else p): tasks for p, tasks in templates.items()}
+            templates.clear()
+            templates.update(renamed)
+            _set_later(tpl_selected=new_pname)
+            _bump_revision()
+            st.rerun()
+        elif new_pname != pname and new_pname in templates:
+            st.error(f"Ya existe una plantilla '{new_pname}'")
+        tasks = templates[pname]
+        if tasks is None:
+            tasks = templates[pname] = []
+        task_list_editor(tasks, f"tpl_{pname}", index)
+        if st.button("🗑 Eliminar template", key=f"tpl_{rev}_{pname}_del"):
+            del templates[pname]
+            _bump_revision()
+            st.rerun()
+
+    if st.button("➕ Añadir template nuevo"):
+        k = len(templates) + 1
+        while f"template_{k}" in templates:
+            k += 1
+        templates[f"template_{k}"] = []
+        _set_later(tpl_query="", tpl_selected=f"template_{k}")
+        _bump_revision()
+        st.rerun()
+
+
+def save_section(path, config):
+    """Botón de guardar con el resumen de cambios pendientes."""
+    import streamlit as st
+
+    session = st.session_state
+    base = session["editor_base"]
+    dirty = config != base
+    if dirty:
+        changes = config_diff(base, config)
+        with st.expander(f"📝 Cambios sin guardar ({len(changes)})", expanded=False):
+            st.dataframe([{"Ruta": p, "Antes": str(a), "Después": str(b)} for p, a, b in changes[:500]])
+    if st.button("💾 Guardar cambios", disabled=not dirty):
+        try:
+            changes = save_config(path, base, config, base_hash=session["editor_base_hash"])
+        except RuntimeError as e:
+            st.error(str(e))
+            return
+        _reset_draft(path, file_hash(path))
+        st.success(f"Config guardada correctamente ({len(changes)} cambios).")
+    elif not dirty:
+        st.caption("Sin cambios pendientes.")
@@ -0,0 +1,214 @@
+# export.py
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.models import TaskTable, TaskView
+
+# extensión -> formato
+EXPORT_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+    ".feather": "arrow",
+}
+
+# etiquetas de las columnas en las tablas de las páginas
+DISPLAY_COLUMNS = {
+    "client": "Cliente",
+    "name": "Tarea",
+    "assigned_to": "Asignado a",
+    "start": "Inicio",
+    "end": "Fin",
+    "priority": "Prioridad",
+}
+
+
+def to_datetimes(start_day, hours):
+    """Horas desde start_day (array) -> datetime64[us] sin aritmética por tarea."""
+    micros = np.rint(np.asarray(hours, dtype=np.float64) * 3.6e9).astype("timedelta64[us]")
+    return np.datetime64(start_day, "us") + micros
+
+
+def _symbols(values, codes):
+    # códigos internos (-1 = None) -> Categorical sin decodificar fila a fila;
+    # las categorías deben ser únicas, así que los símbolos repetidos se fusionan
+    categories = {}
+    remap = [categories.setdefault(v, len(categories)) if v is not None else -1 for v in values]
+    remap = np.array(remap + [-1], dtype=np.int64)
+    return pd.Categorical.from_codes(remap[np.asarray(codes)], categories=list(categories))
+
+
+def schedule_columns(tasks, start_day):
+    """
+    Columnas del plan programado, en orden de programación (dict nombre -> array):
+      client, name, task_type, assigned_to (Categorical), start, end (datetime64),
+      start_hours, end_hours, duration, priority
+    tasks: TaskTable programada, lista de TaskView de una tabla (table.scheduled())
+           o lista de Task ya programados.
+    """
+    if isinstance(tasks, TaskTable):
+        table, rows = tasks, tasks.order
+        if rows is None:
+            raise ValueError("La tabla no está programada (order es None)")
+    elif tasks and isinstance(tasks[0], TaskView) and all(t.table is tasks[0].table for t in tasks):
+        table = tasks[0].table
+        rows = np.fromiter((t.index for t in tasks), dtype=np.int64, count=len(tasks))
+    else:
+        table = None
+
+    if table is not None:
+        start_hours = table.start_time[rows]
+        end_hours = table.end_time[rows]
+        columns = {
+            "client": _symbols(table.clients, table.client_code[rows]),
+            "name": table.names.array(rows),
+            "task_type": _symbols(table.types, table.type_code[rows]),
+            "assigned_to": _symbols(table.resources, table.assigned[rows]),
+            "duration": table.duration[rows],
+            "priority": table.priority[rows],
+        }
+    else:
+        start_hours = np.array([t.start_time for t in tasks], dtype=np.float64)
+        end_hours = np.array([t.end_time for t in tasks], dtype=np.float64)
+        columns = {
+            "client": pd.Categorical([t.client for t in tasks]),
+            "name": np.array([t.name for t in tasks], dtype=object),
+            "task_type": pd.Categorical([t.task_type for t in tasks]),
+            "assigned_to": pd.Categorical([getattr(t, "assigned_to", None) for t in tasks]),
+            "duration": np.array([t.duration for t in tasks], dtype=np.float64),
+            "priority": np.array([t.priority for t in tasks]),
+        }
+
+    ordered = {
+        "client": columns["client"],
+        "name": columns["name"],
+        "task_type": columns["task_type"],
+        "assigned_to": columns["assigned_to"],
+        "start": to_datetimes(start_day, start_hours),
+        "end": to_datetimes(start_day, end_hours),
+        "start_hours": start_hours,
+        "end_hours": end_hours,
+        "duration": columns["duration"],
+        "priority": columns["priority"],
+    }
+    return ordered
+
+
+def schedule_frame(tasks, start_day, display=False):
+    """DataFrame del plan; display=True deja solo las columnas de las páginas, con sus etiquetas."""
+    columns = schedule_columns(tasks, start_day)
+    if display:
+        return pd.DataFrame({label: columns[key] for key, label in DISPLAY_COLUMNS.items()})
+    return pd.DataFrame(columns)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow es necesario para exportar a Parquet/Arrow (pip install pyarrow)")
+    return pyarrow
+
+
+def to_arrow(columns):
+    """pyarrow.Table de las columnas; los textos repetidos van como diccionario."""
+    pa = _pyarrow()
+    arrays = {}
+    for key, values in columns.items():
+        if isinstance(values, pd.Categorical):
+            arrays[key] = pa.DictionaryArray.from_arrays(
+                pa.array(values.codes, mask=values.codes < 0),
+                pa.array(np.asarray(values.categories, dtype=object), type=pa.string())
+            )
+        elif key == "name":
+            arrays[key] = pa.array(values, type=pa.string())
+        else:
+            arrays[key] = pa.array(values)
+    return pa.table(arrays)
+
+
+def _csv_dates(columns):
+    # datetime64 -> texto ISO "2025-09-25T09:00:00" en bloque (NaT queda vacío), el
+    # mismo con y sin pyarrow
+    out = {}
+    for key, values in columns.items():
+        if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+            text = np.datetime_as_string(values, unit="s").astype(object)
+            text[np.isnat(values)] = None
+            values = text
+        out[key] = values
+    return out
+
+
+def _integral_floats(columns):
+    # pyarrow escribe 3.0 como "3" y pandas como "3.0": las columnas float con todos
+    # los valores enteros se pasan a int64, así quien lea el CSV infiere los mismos
+    # tipos con y sin pyarrow
+    out = dict(columns)
+    for key, values in columns.items():
+        if (isinstance(values, np.ndarray) and values.dtype.kind == "f"
+                and np.isfinite(values).all() and (values == np.trunc(values)).all()):
+            out[key] = values.astype(np.int64)
+    return out
+
+
+def write_csv(columns, file):
+    """
+    CSV en bloque; file: ruta o fichero de texto. Con y sin pyarrow las fechas van
+    en ISO con precisión de segundos y los textos (no los números) entre comillas.
+    """
+    columns = _csv_dates(columns)
+    try:
+        pa = _pyarrow()
+    except ImportError:
+        pd.DataFrame(_integral_floats(columns)).to_csv(file, index=False, quoting=csv.QUOTE_NONNUMERIC)
+        return
+    import pyarrow.csv
+    table = to_arrow(columns)
+    # los diccionarios se escriben como texto plano
+    table = pa.table({
+        name: (col.cast(pa.string()) if pa.types.is_dictionary(col.type) else col)
+        for name, col in zip(table.column_names, table.columns)
+    })
+    if isinstance(file, (str, os.PathLike)):
+        pyarrow.csv.write_csv(table, file)
+    else:
+        sink = pa.BufferOutputStream()
+        pyarrow.csv.write_csv(table, sink)
+        file.write(sink.getvalue().to_pybytes().decode("utf-8"))
+
+
+def write_parquet(columns, path):
+    _pyarrow()
+    import pyarrow.parquet
+    pyarrow.parquet.write_table(to_arrow(columns), path)
+
+
+def write_arrow(columns, path):
+    """Arrow IPC (formato fichero, legible también como Feather v2)."""
+    pa = _pyarrow()
+    table = to_arrow(columns)
+    with pa.OSFile(os.fspath(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def export_schedule(tasks, start_day, path, fmt=None):
+    """
+    Exporta el plan programado a CSV, Parquet o Arrow IPC. El formato se deduce de
+    la extensión si no se indica (ver EXPORT_FORMATS). Devuelve el formato usado.
+    """
+    if fmt is None:
+        ext = os.path.splitext(os.fspath(path))[1].lower()
+        if ext not in EXPORT_FORMATS:
+            raise ValueError(f"Extensión '{ext}' no soportada (opciones: {', '.join(EXPORT_FORMATS)})")
+        fmt = EXPORT_FORMATS[ext]
+    writers = {"csv": write_csv, "parquet": write_parquet, "arrow": write_arrow}
+    if fmt not in writers:
+        raise ValueError(f"Formato '{fmt}' no soportado (opciones: {', '.join(writers)})")
+    writers[fmt](schedule_columns(tasks, start_day), path)
+    return fmt
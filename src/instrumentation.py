@@ -0,0 +1,239 @@
+# instrumentation.py
+# Instrumentación opcional del pipeline (carga del YAML, expansión, scheduler,
+# Plotly). Las etapas reciben un objeto `instrumentation`; si no se pasa se usa
+# NULL, que no hace nada, así que el coste cuando está desactivada es una llamada
+# vacía por fase (los bucles calientes comprueban `enabled` una sola vez).
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class NullInstrumentation:
+    """Instrumentación desactivada: mismas llamadas, sin efecto."""
+    enabled = False
+
+    def phase(self, name, **args):
+        return _NULL_PHASE
+
+    def count(self, name, n=1):
+        pass
+
+    def observe(self, name, value):
+        pass
+
+
+NULL = NullInstrumentation()
+
+
+class _Phase:
+    __slots__ = ("owner", "name", "args", "record", "wall", "cpu", "mem")
+
+    def __init__(self, owner, name, args):
+        self.owner = owner
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.record = self.owner._open(self)
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        self.owner._close(self, wall, cpu)
+        return False
+
+
+class Instrumentation:
+    """
+    Registro de fases (tiempo de pared y CPU, anidadas), contadores y estadísticas
+    de valores observados (n, media, mínimo, máximo). Con track_allocations=True
+    cada fase guarda además la memoria neta asignada y el pico (tracemalloc, que
+    ralentiza la ejecución).
+
+        instr = Instrumentation()
+        with instr.phase("schedule", tasks=n):
+            ...
+        instr.count("scheduler.steps")
+        instr.observe("scheduler.ready", size)
+        instr.to_json("profile.json"); instr.to_chrome_trace("trace.json")
+    """
+    enabled = True
+
+    def __init__(self, track_allocations=False):
+        self.track_allocations = track_allocations
+        self.phases = []      # dicts en orden de apertura
+        self.counters = {}
+        self.stats = {}       # nombre -> [n, suma, mínimo, máximo]
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+    def phase(self, name, **args):
+        """Context manager que mide una fase; args se guardan con ella."""
+        return _Phase(self, name, args)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        s = self.stats.get(name)
+        if s is None:
+            self.stats[name] = [1, value, value, value]
+        else:
+            s[0] += 1
+            s[1] += value
+            if value < s[2]:
+                s[2] = value
+            if value > s[3]:
+                s[3] = value
+
+    def _open(self, phase):
+        record = {
+            "name": phase.name,
+            "args": phase.args,
+            "depth": len(self._stack),
+            "start": time.perf_counter() - self._origin,
+            "thread": threading.get_ident(),
+        }
+        self.phases.append(record)
+        if self.track_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # el pico de la fase padre incluye lo visto hasta ahora
+                parent = self._stack[-1]
+                parent.mem[1] = max(parent.mem[1], peak)
+            tracemalloc.reset_peak()
+            phase.mem = [current, current]
+        self._stack.append(phase)
+        return record
+
+    def _close(self, phase, wall, cpu):
+        record = phase.record
+        record["wall"] = wall
+        record["cpu"] = cpu
+        self._stack.pop()
+        if self.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, phase.mem[1])
+            record["alloc_bytes"] = current - phase.mem[0]
+            record["peak_bytes"] = peak - phase.mem[0]
+            if self._stack:
+                parent = self._stack[-1]
+                parent.mem[1] = max(parent.mem[1], peak)
+            elif self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    # ------------------------------------------------------------------
+    # Exportación
+    # ------------------------------------------------------------------
+    def summary(self):
+        """Totales por nombre de fase: llamadas, tiempo de pared y de CPU (s)."""
+        totals = {}
+        for p in self.phases:
+            if "wall" not in p:
+                continue
+            t = totals.setdefault(p["name"], {"calls": 0, "wall": 0.0, "cpu": 0.0})
+            t["calls"] += 1
+            t["wall"] += p["wall"]
+            t["cpu"] += p["cpu"]
+            if "peak_bytes" in p:
+                t["peak_bytes"] = max(t.get("peak_bytes", 0), p["peak_bytes"])
+        return totals
+
+    def to_dict(self):
+        return {
+            "phases": self.phases,
+            "summary": self.summary(),
+            "counters": dict(self.counters),
+            "stats": {
+                name: {"n": n, "mean": total / n, "min": lo, "max": hi}
+                for name, (n, total, lo, hi) in self.stats.items()
+            },
+        }
+
+    def to_json(self, path=None):
+        """JSON del registro; si se da path se escribe en el fichero."""
+        text = json.dumps(self.to_dict(), indent=2, default=str)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def chrome_trace(self):
+        """Eventos en formato Chrome trace (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = []
+        for p in self.phases:
+            if "wall" not in p:
+                continue
+            args = dict(p["args"])
+            args["cpu_ms"] = round(p["cpu"] * 1e3, 3)
+            for key in ("alloc_bytes", "peak_bytes"):
+                if key in p:
+                    args[key] = p[key]
+            events.append({
+                "name": p["name"], "ph": "X", "pid": pid, "tid": p["thread"],
+                "ts": p["start"] * 1e6, "dur": p["wall"] * 1e6, "args": args,
+            })
+        end = max((e["ts"] + e["dur"] for e in events), default=0.0)
+        for name, value in self.counters.items():
+            events.append({"name": name, "ph": "C", "pid": pid, "ts": end, "args": {"value": value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_chrome_trace(self, path=None):
+        text = json.dumps(self.chrome_trace(), default=str)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+
+def streamlit_panel(instrumentation, title="⏱️ Instrumentación"):
+    """Panel plegable con fases, contadores y descargas (JSON y Chrome trace)."""
+    import streamlit as st
+
+    with st.expander(title, expanded=False):
+        summary = instrumentation.summary()
+        st.dataframe([
+            {"Fase": name, "Llamadas": t["calls"], "Pared (s)": round(t["wall"], 4),
+             "CPU (s)": round(t["cpu"], 4),
+             **({"Pico (MB)": round(t["peak_bytes"] / 2**20, 2)} if "peak_bytes" in t else {})}
+            for name, t in summary.items()
+        ])
+        data = instrumentation.to_dict()
+        if data["counters"] or data["stats"]:
+            st.dataframe(
+                [{"Métrica": k, "Valor": str(v)} for k, v in data["counters"].items()]
+                + [{"Métrica": k, "Valor": f"n={s['n']} media={s['mean']:.2f} min={s['min']} max={s['max']}"}
+                   for k, s in data["stats"].items()]
+            )
+        col1, col2 = st.columns(2)
+        col1.download_button("Descargar JSON", instrumentation.to_json(),
+                             file_name="instrumentacion.json", mime="application/json")
+        col2.download_button("Descargar Chrome trace", instrumentation.to_chrome_trace(),
+                             file_name="trace.json", mime="application/json")
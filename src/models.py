@@ -1,4 +1,8 @@
 # models.py
+import copy
+import json
+import numpy as np
+
 class Task:
     def __init__(self, name, duration, task_type, client=None, server=None,
                  dependencies=None, start_after=0, priority=999):
@@ -47,3 +51,456 @@ class Person:
 
     def __repr__(self):
         return f"Person({self.name}, avail={self.available_from})"
+
+
+class TaskView:
+    """
+    Vista ligera de una fila de TaskTable con la misma interfaz que Task
+    (name, duration, task_type, client, server, dependencies, start_after,
+    priority, assigned_to, start_time, end_time). No copia datos: lee y escribe
+    directamente en las columnas de la tabla.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def name(self):
+        return self.table.names[self.index]
+
+    @property
+    def duration(self):
+        return self.table.duration[self.index].item()
+
+    @duration.setter
+    def duration(self, value):
+        self.table.duration[self.index] = value
+
+    @property
+    def task_type(self):
+        return self.table.types[self.table.type_code[self.index]]
+
+    @property
+    def client(self):
+        return self.table.clients[self.table.client_code[self.index]]
+
+    @property
+    def server(self):
+        code = self.table.server_code[self.index]
+        return self.table.servers[code] if code >= 0 else None
+
+    @property
+    def dependencies(self):
+        return [self.table[j] for j in self.table.dependencies_of(self.index)]
+
+    @property
+    def start_after(self):
+        return self.table.start_after[self.index].item()
+
+    @start_after.setter
+    def start_after(self, value):
+        self.table.start_after[self.index] = value
+
+    @property
+    def priority(self):
+        return self.table.priority[self.index].item()
+
+    @priority.setter
+    def priority(self, value):
+        self.table.priority[self.index] = value
+
+    @property
+    def assigned_to(self):
+        code = self.table.assigned[self.index]
+        return self.table.resources[code] if code >= 0 else None
+
+    @assigned_to.setter
+    def assigned_to(self, value):
+        self.table.assigned[self.index] = self.table.resource_code(value)
+
+    @property
+    def start_time(self):
+        value = self.table.start_time[self.index]
+        return None if value != value else value.item()
+
+    @start_time.setter
+    def start_time(self, value):
+        self.table.start_time[self.index] = np.nan if value is None else value
+
+    @property
+    def end_time(self):
+        value = self.table.end_time[self.index]
+        return None if value != value else value.item()
+
+    @end_time.setter
+    def end_time(self, value):
+        self.table.end_time[self.index] = np.nan if value is None else value
+
+    def __eq__(self, other):
+        return isinstance(other, TaskView) and other.table is self.table and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.table), self.index))
+
+    def __repr__(self):
+        return f"Task({self.client}:{self.name}, type={self.task_type}, prio={self.priority})"
+
+
+def intern_codes(values, symbols, none_code=None):
+    """
+    Devuelve el código de cada valor en `symbols` (lista), añadiendo los nuevos al final.
+    Si none_code no es None, los valores None no se internan y reciben ese código.
+    """
+    index = {s: i for i, s in enumerate(symbols)}
+    codes = []
+    for v in values:
+        if v is None and none_code is not None:
+            codes.append(none_code)
+            continue
+        code = index.get(v)
+        if code is None:
+            code = len(symbols)
+            index[v] = code
+            symbols.append(v)
+        codes.append(code)
+    return codes
+
+
+class TaskNames:
+    """
+    Nombres completos de las filas de una TaskTable ("Cliente::plantilla::tarea")
+    sin guardar un str por fila: cada fila tiene tres códigos (ámbito, plantilla y
+    tarea) en listas internadas scopes, templates y tasks (-1 = sin esa parte), y el
+    texto se compone al pedirlo (names[i], array() para exportar o mostrar).
+    Se usa como una secuencia de solo lectura de str.
+    """
+    __slots__ = ("scope_code", "template_code", "task_code", "scopes", "templates", "tasks")
+
+    def __init__(self, scope_code, template_code, task_code, scopes, templates, tasks):
+        self.scope_code = np.asarray(scope_code, dtype=np.int32)
+        self.template_code = np.asarray(template_code, dtype=np.int32)
+        self.task_code = np.asarray(task_code, dtype=np.int32)
+        self.scopes = scopes
+        self.templates = templates
+        self.tasks = tasks
+
+    @classmethod
+    def from_list(cls, names):
+        """Nombres arbitrarios: cada uno se interna entero como tarea."""
+        tasks = []
+        codes = intern_codes(names, tasks)
+        none = np.full(len(codes), -1, dtype=np.int32)
+        return cls(none, none.copy(), codes, [], [], tasks)
+
+    def __len__(self):
+        return len(self.task_code)
+
+    def __getitem__(self, i):
+        scope = self.scope_code[i]
+        template = self.template_code[i]
+        parts = [self.tasks[self.task_code[i]]]
+        if template >= 0:
+            parts.insert(0, self.templates[template])
+        if scope >= 0:
+            parts.insert(0, self.scopes[scope])
+        return "::".join(parts)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __eq__(self, other):
+        if isinstance(other, TaskNames):
+            if (self.scopes == other.scopes and self.templates == other.templates
+                    and self.tasks == other.tasks):
+                return (np.array_equal(self.scope_code, other.scope_code)
+                        and np.array_equal(self.template_code, other.template_code)
+                        and np.array_equal(self.task_code, other.task_code))
+            other = other.tolist()
+        return isinstance(other, list) and self.tolist() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TaskNames(rows={len(self)}, tasks={len(self.tasks)})"
+
+    def array(self, rows=None):
+        """Array de objetos con los nombres de `rows` (todas si None), compuestos en bloque."""
+        scope, template, task = self.scope_code, self.template_code, self.task_code
+        if rows is not None:
+            scope, template, task = scope[rows], template[rows], task[rows]
+        if not len(task):
+            return np.empty(0, dtype=object)
+        # un prefijo por combinación (ámbito, plantilla) distinta, no por fila; la
+        # suma de arrays de objetos concatena los str sin bucle en Python
+        width = len(self.templates) + 1
+        pairs, inverse = np.unique((scope.astype(np.int64) + 1) * width + template + 1, return_inverse=True)
+        prefixes = np.empty(len(pairs), dtype=object)
+        for k, pair in enumerate(pairs.tolist()):
+            s, t = divmod(pair, width)
+            parts = ([self.scopes[s - 1]] if s else []) + ([self.templates[t - 1]] if t else [])
+            prefixes[k] = "".join(p + "::" for p in parts)
+        tasks = np.empty(len(self.tasks), dtype=object)
+        tasks[:] = self.tasks
+        return prefixes[inverse.ravel()] + tasks[task]
+
+    def tolist(self):
+        return self.array().tolist()
+
+    def take(self, rows):
+        """Nombres de las filas `rows` (mismas listas de símbolos)."""
+        return TaskNames(self.scope_code[rows], self.template_code[rows], self.task_code[rows],
+                         self.scopes, self.templates, self.tasks)
+
+    def copy(self):
+        return TaskNames(self.scope_code.copy(), self.template_code.copy(), self.task_code.copy(),
+                         list(self.scopes), list(self.templates), list(self.tasks))
+
+
+class TaskTable:
+    """
+    Almacenamiento columnar (structure-of-arrays) de un conjunto de tareas.
+
+    names: nombres completos de las filas (TaskNames; también acepta una lista de str).
+    Columnas NumPy, una fila por tarea:
+      duration, start_after, priority: datos de entrada
+      start_time, end_time: calculados por el scheduler (NaN si sin programar)
+      type_code, client_code, server_code, assigned: códigos en las listas
+        internadas types, clients, servers y resources (-1 = ninguno)
+    Dependencias en formato CSR: las dependencias de la tarea i son
+    dep_indices[dep_indptr[i]:dep_indptr[i+1]] (índices de fila).
+    order: filas en el orden en que las programó el scheduler (o None).
+    resource_start: disponibilidad inicial (personas, servidores) con la que se programó.
+    """
+
+    def __init__(self, names, duration, start_after, priority, type_code, client_code, server_code,
+                 dep_indptr, dep_indices, types, clients, servers):
+        n = len(names)
+        self.names = names if isinstance(names, TaskNames) else TaskNames.from_list(names)
+        self.duration = np.asarray(duration, dtype=np.float64)
+        self.start_after = np.asarray(start_after, dtype=np.float64)
+        self.priority = np.asarray(priority)
+        if self.priority.dtype.kind not in "iuf":
+            self.priority = self.priority.astype(np.float64)
+        self.type_code = np.asarray(type_code, dtype=np.int32)
+        self.client_code = np.asarray(client_code, dtype=np.int32)
+        self.server_code = np.asarray(server_code, dtype=np.int32)
+        self.dep_indptr = np.asarray(dep_indptr, dtype=np.int64)
+        self.dep_indices = np.asarray(dep_indices, dtype=np.int64)
+        self.types = types
+        self.clients = clients
+        self.servers = servers
+
+        self.start_time = np.full(n, np.nan)
+        self.end_time = np.full(n, np.nan)
+        self.assigned = np.full(n, -1, dtype=np.int32)
+        self.resources = []
+        self.order = None
+        self.resource_start = None
+        self._dependents = None
+        self._acyclic_deps = None   # dep_indices ya comprobado sin ciclos (src/analysis.py)
+
+    @classmethod
+    def from_processes(cls, processes):
+        """Convierte una lista de Process (salida de build_processes) en una tabla."""
+        tasks = []
+        index = {}
+        for p in processes:
+            for t in p.tasks:
+                if id(t) not in index:
+                    index[id(t)] = len(tasks)
+                    tasks.append(t)
+
+        dep_indptr = [0]
+        dep_indices = []
+        for t in tasks:
+            for d in t.dependencies:
+                j = index.get(id(d))
+                if j is None:
+                    raise ValueError(f"Dependencia {d!r} de {t!r} no pertenece a los procesos")
+                dep_indices.append(j)
+            dep_indptr.append(len(dep_indices))
+
+        types, clients, servers = [], [], []
+        table = cls(
+            names=[t.name for t in tasks],
+            duration=[t.duration for t in tasks],
+            start_after=[t.start_after or 0.0 for t in tasks],
+            priority=[getattr(t, "priority", 999) for t in tasks],
+            type_code=intern_codes((t.task_type for t in tasks), types),
+            client_code=intern_codes((t.client for t in tasks), clients),
+            server_code=intern_codes((t.server for t in tasks), servers, none_code=-1),
+            dep_indptr=dep_indptr,
+            dep_indices=dep_indices,
+            types=types,
+            clients=clients,
+            servers=servers,
+        )
+        for i, t in enumerate(tasks):
+            if t.start_time is not None:
+                table.start_time[i] = t.start_time
+                table.end_time[i] = t.end_time
+            if t.assigned_to is not None:
+                table.assigned[i] = table.resource_code(t.assigned_to)
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return TaskView(self, i % len(self))
+
+    def __iter__(self):
+        return (TaskView(self, i) for i in range(len(self)))
+
+    def __repr__(self):
+        return f"TaskTable(tasks={len(self)}, deps={len(self.dep_indices)})"
+
+    def dependencies_of(self, i):
+        return self.dep_indices[self.dep_indptr[i]:self.dep_indptr[i + 1]].tolist()
+
+    def dependents(self):
+        """CSR inverso (indptr, indices): tareas que dependen de cada fila. Se cachea."""
+        if self._dependents is None:
+            n = len(self)
+            owners = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.dep_indptr))
+            by_dep = np.argsort(self.dep_indices, kind="stable")
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.dep_indices, minlength=n), out=indptr[1:])
+            self._dependents = (indptr, owners[by_dep])
+        return self._dependents
+
+    def type_mask(self, task_type):
+        """Máscara booleana de las filas de un tipo ("manual", "automated", ...)."""
+        if task_type not in self.types:
+            return np.zeros(len(self), dtype=bool)
+        return self.type_code == self.types.index(task_type)
+
+    def resource_code(self, name):
+        if name is None:
+            return -1
+        try:
+            return self.resources.index(name)
+        except ValueError:
+            self.resources.append(name)
+            return len(self.resources) - 1
+
+    def copy(self):
+        """Copia independiente (columnas y listas de símbolos incluidas)."""
+        table = copy.copy(self)
+        for f in ("duration", "start_after", "priority", "type_code", "client_code", "server_code",
+                  "dep_indptr", "dep_indices", "start_time", "end_time", "assigned"):
+            setattr(table, f, getattr(self, f).copy())
+        table.names = self.names.copy()
+        for f in ("types", "clients", "servers", "resources"):
+            setattr(table, f, list(getattr(self, f)))
+        if self.order is not None:
+            table.order = self.order.copy()
+        table._dependents = None
+        if self._acyclic_deps is self.dep_indices:
+            table._acyclic_deps = table.dep_indices
+        return table
+
+    def subset(self, rows):
+        """
+        Tabla nueva con las filas `rows` (en orden creciente) y sin programar. Las
+        dependencias hacia filas que no están en `rows` se descartan: quien extrae
+        el subconjunto debe haberlas resuelto antes (ver src/partition.py).
+        Las listas de símbolos se copian enteras, así los códigos no cambian.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        n = len(self)
+        position = np.full(n, -1, dtype=np.int64)
+        position[rows] = np.arange(len(rows))
+        counts = np.diff(self.dep_indptr)
+        owners = np.repeat(np.arange(n, dtype=np.int64), counts)
+        keep = (position[owners] >= 0) & (position[self.dep_indices] >= 0)
+        dep_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(position[owners[keep]], minlength=len(rows)), out=dep_indptr[1:])
+        table = TaskTable(
+            names=self.names.take(rows),
+            duration=self.duration[rows], start_after=self.start_after[rows],
+            priority=self.priority[rows], type_code=self.type_code[rows],
+            client_code=self.client_code[rows], server_code=self.server_code[rows],
+            dep_indptr=dep_indptr, dep_indices=position[self.dep_indices[keep]],
+            types=list(self.types), clients=list(self.clients), servers=list(self.servers),
+        )
+        if self._acyclic_deps is self.dep_indices:
+            table._acyclic_deps = table.dep_indices  # un subgrafo de un DAG no tiene ciclos
+        return table
+
+    def relabeled(self, people_names):
+        """
+        Vista de la tabla programada con otros nombres para las personas (las primeras
+        entradas de resources). Comparte las columnas: renombrar no reprograma.
+        """
+        table = copy.copy(self)
+        table.resources = list(people_names) + self.resources[len(people_names):]
+        return table
+
+    def scheduled(self):
+        """Vistas de las tareas en el orden en que se programaron."""
+        if self.order is None:
+            return []
+        return [TaskView(self, i) for i in self.order.tolist()]
+
+
+
+# --------------------------------------------------------------------------
+# Serialización binaria (np.savez): columnas tal cual y listas de símbolos en JSON
+# --------------------------------------------------------------------------
+_ARRAY_FIELDS = ("duration", "start_after", "priority", "type_code", "client_code", "server_code",
+                 "dep_indptr", "dep_indices", "start_time", "end_time", "assigned")
+_LIST_FIELDS = ("types", "clients", "servers", "resources")
+# TaskNames: códigos por fila y listas de símbolos
+_NAME_ARRAYS = ("scope_code", "template_code", "task_code")
+_NAME_LISTS = ("scopes", "templates", "tasks")
+
+
+def _encode_json(value):
+    return np.frombuffer(json.dumps(value, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+
+def _decode_json(array):
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def save_table(table, file):
+    """Guarda una TaskTable (programada o no) en formato .npz. file: ruta o fichero binario."""
+    arrays = {f: getattr(table, f) for f in _ARRAY_FIELDS}
+    for f in _LIST_FIELDS:
+        arrays[f] = _encode_json(getattr(table, f))
+    for f in _NAME_ARRAYS:
+        arrays[f"names_{f}"] = getattr(table.names, f)
+    for f in _NAME_LISTS:
+        arrays[f"names_{f}"] = _encode_json(getattr(table.names, f))
+    arrays["meta"] = _encode_json({"resource_start": table.resource_start})
+    if table.order is not None:
+        arrays["order"] = table.order
+    np.savez(file, **arrays)
+
+
+def load_table(file):
+    """Carga una TaskTable guardada con save_table."""
+    with np.load(file, allow_pickle=False) as data:
+        lists = {f: _decode_json(data[f]) for f in _LIST_FIELDS}
+        names = TaskNames(*(data[f"names_{f}"] for f in _NAME_ARRAYS),
+                          *(_decode_json(data[f"names_{f}"]) for f in _NAME_LISTS))
+        table = TaskTable(
+            names=names, duration=data["duration"], start_after=data["start_after"],
+            priority=data["priority"], type_code=data["type_code"], client_code=data["client_code"],
+            server_code=data["server_code"], dep_indptr=data["dep_indptr"], dep_indices=data["dep_indices"],
+            types=lists["types"], clients=lists["clients"], servers=lists["servers"],
+        )
+        table.start_time = data["start_time"]
+        table.end_time = data["end_time"]
+        table.assigned = data["assigned"]
+        table.resources = lists["resources"]
+        table.order = data["order"] if "order" in data else None
+        resource_start = _decode_json(data["meta"])["resource_start"]
+        if resource_start is not None:
+            table.resource_start = tuple(tuple(part) for part in resource_start)
+    return table
@@ -0,0 +1,386 @@
+# montecarlo.py
+# Simulación Monte Carlo de la incertidumbre en las duraciones. Cada tarea de
+# process_templates (o global_task simple) puede declarar una distribución:
+#
+#   - name: "procesar"
+#     duration: 5                       # valor nominal (moda / mediana)
+#     duration_dist: {type: triangular, min: 3, max: 9}   # mode = duration si no se da
+#     duration_dist: {type: pert, min: 3, max: 9}         # beta-PERT, mode = duration
+#     duration_dist: {type: lognormal, sigma: 0.3}        # mediana = duration
+#
+# Las muestras se generan por lotes con NumPy y cada lote se programa:
+#   - method="dispatch": con el motor por eventos completo (mismas reglas que
+#     Scheduler.schedule), repartiendo los lotes en un pool de procesos;
+#   - method="replay": vectorizado sobre las muestras, manteniendo el orden y la
+#     asignación de recursos del plan nominal (solo se propagan los tiempos).
+#
+#   python -m src.montecarlo config.yaml --samples 10000 --people 2
+import argparse
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.cache import ScheduleCache
+from src.export import to_datetimes
+from src.models import Person
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.sweep import parse_servers
+from src.work_calendar import calendar_from_config
+
+DISTRIBUTIONS = ("fixed", "triangular", "pert", "lognormal")
+METHODS = ("dispatch", "replay")
+DEFAULT_BATCH = 256
+
+
+# ------------------------------------------------------------------
+# Modelo de duraciones
+# ------------------------------------------------------------------
+class DurationModel:
+    """
+    Distribución de la duración de cada fila de una TaskTable, en columnas:
+    kind (índice en DISTRIBUTIONS), low / mode / high (triangular y PERT) y sigma
+    (lognormal, con mediana = mode). Las filas "fixed" usan la duración nominal.
+    """
+
+    def __init__(self, kind, low, mode, high, sigma):
+        self.kind = kind
+        self.low = low
+        self.mode = mode
+        self.high = high
+        self.sigma = sigma
+
+    @classmethod
+    def fixed(cls, table):
+        n = len(table)
+        duration = table.duration.astype(np.float64)
+        return cls(np.zeros(n, dtype=np.int8), duration.copy(), duration.copy(), duration.copy(), np.zeros(n))
+
+    def sample(self, rng, size):
+        """Matriz (size, n) de duraciones muestreadas."""
+        out = np.broadcast_to(self.mode, (size, len(self.mode))).copy()
+
+        rows = np.flatnonzero(self.kind == DISTRIBUTIONS.index("triangular"))
+        if rows.size:
+            # inversa de la CDF (admite low == high, a diferencia de rng.triangular)
+            a, c, b = self.low[rows], self.mode[rows], self.high[rows]
+            span = b - a
+            u = rng.random((size, rows.size))
+            split = np.divide(c - a, span, out=np.zeros_like(span), where=span > 0)
+            left = a + np.sqrt(u * span * (c - a))
+            right = b - np.sqrt((1 - u) * span * (b - c))
+            out[:, rows] = np.where(u < split, left, right)
+
+        rows = np.flatnonzero(self.kind == DISTRIBUTIONS.index("pert"))
+        if rows.size:
+            a, c, b = self.low[rows], self.mode[rows], self.high[rows]
+            span = b - a
+            safe = np.where(span > 0, span, 1.0)
+            alpha = 1 + 4 * (c - a) / safe
+            beta = 1 + 4 * (b - c) / safe
+            out[:, rows] = a + span * rng.beta(alpha, beta, size=(size, rows.size))
+
+        rows = np.flatnonzero(self.kind == DISTRIBUTIONS.index("lognormal"))
+        if rows.size:
+            z = rng.standard_normal((size, rows.size))
+            out[:, rows] = self.mode[rows] * np.exp(self.sigma[rows] * z)
+        return out
+
+
+def _parse_dist(spec, duration, where):
+    if not isinstance(spec, dict) or "type" not in spec:
+        raise ValueError(f"duration_dist inválido en {where}: se espera un dict con 'type'")
+    kind = spec["type"]
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Distribución '{kind}' no soportada en {where} (opciones: {', '.join(DISTRIBUTIONS)})")
+    mode = float(spec.get("mode", duration))
+    low = float(spec.get("min", mode))
+    high = float(spec.get("max", mode))
+    sigma = float(spec.get("sigma", 0.0))
+    if kind in ("triangular", "pert") and not low <= mode <= high:
+        raise ValueError(f"duration_dist en {where}: se requiere min <= mode <= max ({low}, {mode}, {high})")
+    if kind == "lognormal" and sigma < 0:
+        raise ValueError(f"duration_dist en {where}: sigma negativo ({sigma})")
+    if low < 0:
+        raise ValueError(f"duration_dist en {where}: duración mínima negativa ({low})")
+    return DISTRIBUTIONS.index(kind), low, mode, high, sigma
+
+
+def duration_model(config, table):
+    """
+    DurationModel de `table` (build_task_table(config)) a partir de los duration_dist
+    del config. Las filas de clientes se localizan por sus códigos de plantilla y
+    tarea (models.TaskNames), una vez por par distinto y no por fila; las globales
+    por nombre: "Global::<global>::<tarea>" y "Global::<global>".
+    """
+    model = DurationModel.fixed(table)
+    process_templates = config.get("process_templates", {}) or {}
+
+    # (plantilla, tarea) para clientes y nombre completo para globales -> definición
+    client_defs = {}
+    for template_name, template_tasks in process_templates.items():
+        for tdef in template_tasks:
+            if "duration_dist" in tdef:
+                client_defs[(template_name, tdef["name"])] = tdef
+    global_defs = {}
+    for gdef in config.get("global_tasks", []) or []:
+        if "template" in gdef and gdef["template"] in process_templates:
+            for tdef in process_templates[gdef["template"]]:
+                if "duration_dist" in tdef:
+                    global_defs[f"Global::{gdef.get('name', gdef['template'])}::{tdef['name']}"] = tdef
+        elif "duration_dist" in gdef:
+            global_defs[f"Global::{gdef['name']}"] = gdef
+    if not client_defs and not global_defs:
+        return model
+
+    names = table.names
+    is_global = table.client_code == (table.clients.index("Global") if "Global" in table.clients else -1)
+    candidates = ~table.type_mask("milestone")
+
+    def assign(rows, tdef):
+        (model.kind[rows], model.low[rows], model.mode[rows],
+         model.high[rows], model.sigma[rows]) = _parse_dist(tdef["duration_dist"], table.duration[rows[0]],
+                                                            names[rows[0]])
+
+    if client_defs:
+        rows = np.flatnonzero(candidates & ~is_global & (names.template_code >= 0))
+        width = len(names.tasks)
+        pairs = names.template_code[rows].astype(np.int64) * width + names.task_code[rows]
+        by_pair = np.argsort(pairs, kind="stable")
+        keys, starts = np.unique(pairs[by_pair], return_index=True)
+        for key, group in zip(keys.tolist(), np.split(by_pair, starts[1:])):
+            template, task = divmod(key, width)
+            tdef = client_defs.get((names.templates[template], names.tasks[task]))
+            if tdef is not None:
+                assign(rows[group], tdef)
+    for i in np.flatnonzero(candidates & is_global).tolist():
+        tdef = global_defs.get(names[i])
+        if tdef is not None:
+            assign(np.array([i]), tdef)
+    return model
+
+
+# ------------------------------------------------------------------
+# Simulación por lotes
+# ------------------------------------------------------------------
+class _Groups:
+    """Filas por grupo de salida (clientes, milestones y proyecto) para reducir fines por lote."""
+
+    def __init__(self, table):
+        order = np.argsort(table.client_code, kind="stable")
+        codes = table.client_code[order]
+        self.client_order = order
+        self.client_starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else codes
+        self.client_codes = codes[self.client_starts]
+        self.milestones = np.flatnonzero(table.type_mask("milestone"))
+
+    def labels(self, table):
+        # el proceso "Global" (tareas globales y milestones) no es un cliente
+        return ([("global" if table.clients[c] == "Global" else "cliente", table.clients[c])
+                 for c in self.client_codes.tolist()]
+                + [("milestone", table.names[i]) for i in self.milestones.tolist()]
+                + [("proyecto", "Proyecto")])
+
+    def reduce(self, end):
+        """end: (samples, n) -> (samples, grupos) con el fin de cada grupo."""
+        clients = np.maximum.reduceat(end[:, self.client_order], self.client_starts, axis=1) \
+            if len(self.client_starts) else end[:, :0]
+        return np.hstack([clients, end[:, self.milestones], end.max(axis=1, keepdims=True)])
+
+
+def _replay_batch(table, order, assigned, exclusive, durations, start_after=None, available=None):
+    """
+    Fines (samples, n) reprogramando en `order` con la asignación `assigned`: cada
+    tarea empieza al acabar sus dependencias y la tarea anterior de su recurso
+    (si es exclusivo), no antes de que el recurso esté disponible (`available`, por
+    código de recurso) y no antes de start_after (por defecto, el de la tabla).
+    Vectorizado sobre las muestras.
+    """
+    size = durations.shape[0]
+    end = np.empty_like(durations)
+    avail = {} if available is None else {code: value for code, value in enumerate(available.tolist())
+                                          if exclusive[code]}
+    indptr = table.dep_indptr.tolist()
+    indices = table.dep_indices
+    start_after = (table.start_after if start_after is None else start_after).tolist()
+    for i in order.tolist():
+        a, b = indptr[i], indptr[i + 1]
+        if b - a == 1:
+            start = np.maximum(end[:, indices[a]], start_after[i])
+        elif b > a:
+            start = np.maximum(end[:, indices[a:b]].max(axis=1), start_after[i])
+        else:
+            start = np.full(size, start_after[i])
+        code = assigned[i]
+        if exclusive[code]:
+            prev = avail.get(code)
+            if prev is not None:
+                start = np.maximum(start, prev)
+            avail[code] = end[:, i] = start + durations[:, i]
+        else:
+            end[:, i] = start + durations[:, i]
+    return end
+
+
+def _exclusive(table, n_people):
+    # recursos con capacidad 1: personas y servidores con nombre (no System/Milestone/Unknown)
+    exclusive = np.zeros(len(table.resources), dtype=bool)
+    exclusive[:n_people] = True
+    exclusive[n_people:n_people + len(table.servers)] = [bool(s) for s in table.servers]
+    return exclusive
+
+
+def _available(nominal, work_calendar):
+    # disponibilidad inicial por código de recurso con la que se programó el plan
+    # nominal (personas y servidores; el resto desde 0), en horas de trabajo si hay calendario
+    people, servers = nominal.resource_start
+    available = np.zeros(len(nominal.resources))
+    available[:len(people)] = people
+    available[len(people):len(people) + len(servers)] = servers
+    if work_calendar is not None:
+        available = work_calendar.to_work(available)
+    return available
+
+
+# estado de solo lectura de cada worker (ver _init_worker)
+_SHARED = {}
+
+
+def _init_worker(table, model, people, servers, start_day, nominal, work_calendar):
+    _SHARED.update(table=table, model=model, people=people, servers=servers,
+                   start_day=start_day, nominal=nominal, groups=_Groups(table),
+                   exclusive=_exclusive(nominal, len(people)), work_calendar=work_calendar,
+                   available=_available(nominal, work_calendar))
+
+
+def _run_batch(args):
+    seed, size, method = args
+    table = _SHARED["table"]
+    rng = np.random.default_rng(seed)
+    durations = _SHARED["model"].sample(rng, size)
+    durations[:, table.type_mask("milestone")] = 0.0
+
+    calendar = _SHARED["work_calendar"]
+    if method == "replay":
+        nominal = _SHARED["nominal"]
+        if calendar is None:
+            end = _replay_batch(table, nominal.order, nominal.assigned, _SHARED["exclusive"], durations,
+                                available=_SHARED["available"])
+        else:
+            # en horas de trabajo y después a reloj, con la misma regla que el
+            # scheduler: las tareas de duración cero acaban donde empiezan
+            end = _replay_batch(table, nominal.order, nominal.assigned, _SHARED["exclusive"], durations,
+                                calendar.to_work(table.start_after), _SHARED["available"])
+            end = np.where(durations == 0, calendar.to_wall(end), calendar.to_wall(end, end=True))
+    else:
+        end = np.empty_like(durations)
+        for s in range(size):
+            people = [Person(name) for name, _ in _SHARED["people"]]
+            for p, (_, avail) in zip(people, _SHARED["people"]):
+                p.available_from = avail
+            sched = Scheduler(people, _SHARED["servers"], start_day=_SHARED["start_day"],
+                              work_calendar=calendar)
+            run = copy.copy(table)
+            run.duration = durations[s]
+            end[s] = sched.schedule_table(run).end_time
+    return _SHARED["groups"].reduce(end)
+
+
+def simulate(config, people, servers, samples=1000, seed=None, method="dispatch",
+             batch_size=DEFAULT_BATCH, max_workers=None, start_day=None, percentiles=(50, 90),
+             work_calendar=None):
+    """
+    Simula `samples` planes con duraciones muestreadas y devuelve un DataFrame con
+    una fila por cliente, milestone y el proyecto completo: fin nominal y percentiles
+    del fin (P50, P90... como fechas, y en horas desde start_day). Las tareas
+    globales (proceso "Global") van en su propia fila, de tipo "global".
+
+    config: dict de configuración (los duration_dist se leen de ahí)
+    people: lista de Person; servers: dict {servidor: disponible_desde}
+    method: "dispatch" (motor completo por muestra, en paralelo) o "replay"
+            (vectorizado, orden y asignación del plan nominal)
+    work_calendar: calendario laboral (WorkCalendar); por defecto el de la sección
+            calendar del config. Las duraciones muestreadas son horas de trabajo.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método '{method}' no soportado (opciones: {', '.join(METHODS)})")
+    if samples < 1:
+        raise ValueError(f"Número de muestras inválido: {samples}")
+    table = build_task_table(config)
+    model = duration_model(config, table)
+    if start_day is None:
+        start_day = config.get("start_day")
+    if isinstance(start_day, str):
+        start_day = datetime.fromisoformat(start_day)
+    if work_calendar is None:
+        work_calendar = calendar_from_config(config, start_day)
+    if work_calendar is not None:
+        start_day = work_calendar.start_day
+
+    people_state = [(p.name, p.available_from) for p in people]
+    nominal = Scheduler([copy.copy(p) for p in people], servers, start_day=start_day,
+                        work_calendar=work_calendar).schedule_table(table.copy())
+    table.dependents()  # compartido con los workers
+    initargs = (table, model, people_state, dict(servers), start_day, nominal, work_calendar)
+
+    # semillas independientes y reproducibles por lote
+    sizes = [batch_size] * (samples // batch_size) + ([samples % batch_size] if samples % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(s, n, method) for s, n in zip(seeds, sizes)]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if method == "replay" or workers <= 1:
+        _init_worker(*initargs)
+        results = [_run_batch(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            results = list(pool.map(_run_batch, jobs))
+    finish = np.vstack(results)
+
+    groups = _Groups(table)
+    nominal_finish = groups.reduce(nominal.end_time[None, :])[0]
+    rows = []
+    for k, (kind, name) in enumerate(groups.labels(table)):
+        row = {"tipo": kind, "nombre": name, "nominal_h": nominal_finish[k]}
+        values = np.percentile(finish[:, k], percentiles)
+        for p, v in zip(percentiles, values.tolist()):
+            row[f"P{p:g}_h"] = v
+        rows.append(row)
+    result = pd.DataFrame(rows)
+    result["nominal"] = to_datetimes(start_day, result["nominal_h"].to_numpy())
+    for p in percentiles:
+        result[f"P{p:g}"] = to_datetimes(start_day, result[f"P{p:g}_h"].to_numpy())
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación Monte Carlo de duraciones")
+    parser.add_argument("config", nargs="?", default="config.yaml", help="fichero de configuración YAML")
+    parser.add_argument("--samples", type=int, default=1000, help="número de muestras")
+    parser.add_argument("--people", type=int, default=2, help="tamaño del pool de personas")
+    parser.add_argument("--servers", default="S1,S2", help="servidores: 'S1,S2' o 'S1=0,S2=8'")
+    parser.add_argument("--method", choices=METHODS, default="dispatch")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--out", help="guarda los resultados (.csv o .parquet)")
+    args = parser.parse_args(argv)
+
+    config = ScheduleCache().load_config(args.config)
+    people = [Person(f"Persona_{i+1}") for i in range(args.people)]
+    result = simulate(config, people, parse_servers(args.servers), samples=args.samples,
+                      seed=args.seed, method=args.method, max_workers=args.workers)
+    print(result.to_string(index=False))
+    if args.out:
+        if args.out.endswith(".parquet"):
+            result.to_parquet(args.out, index=False)
+        else:
+            result.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
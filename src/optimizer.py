@@ -0,0 +1,368 @@
+# optimizer.py
+# Optimización del makespan con presupuesto de tiempo. Parte del plan del
+# scheduler (motor heap, misma regla que greedy) y lo mejora con búsqueda local
+# sobre el orden de colocación de las tareas: cada orden se decodifica con el
+# motor backfill (Scheduler.schedule_table(..., keys=...)), que coloca cada tarea
+# en el primer hueco libre de su recurso. Cada solución se compacta con una
+# justificación hacia atrás y hacia delante (forward-backward improvement): se
+# programa el problema invertido colocando primero las tareas que acaban más
+# tarde, y se vuelve a programar hacia delante en el orden resultante. Varios
+# reinicios independientes se reparten en un pool de procesos.
+#
+#   python -m src.optimizer config.yaml --people 3 --budget 30 --restarts 4
+import argparse
+import copy
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import critical_path
+from src.cache import ScheduleCache
+from src.export import export_schedule
+from src.models import Person, TaskTable
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.sweep import parse_servers
+
+# tamaño máximo del bloque de tareas consecutivas que se baraja en un movimiento
+MAX_WINDOW = 12
+# ruido (en posiciones) del orden inicial de los reinicios distintos del primero
+RESTART_NOISE = 8.0
+# pasadas máximas de justificación por solución (se para antes si no mejora)
+JUSTIFY_PASSES = 4
+# tolerancia al comparar makespans
+EPS = 1e-9
+
+
+class OptimizationResult:
+    """
+    Mejor plan encontrado. table es la TaskTable programada (como schedule_table);
+    lower_bound, una cota inferior del makespan (si se alcanza, el plan es óptimo);
+    restarts, un DataFrame con una fila por reinicio (semilla, makespan,
+    iteraciones y movimientos aceptados).
+    """
+
+    def __init__(self, table, makespan, initial_makespan, lower_bound, restarts, elapsed):
+        self.table = table
+        self.makespan = makespan
+        self.initial_makespan = initial_makespan
+        self.lower_bound = lower_bound
+        self.restarts = restarts
+        self.elapsed = elapsed
+
+    @property
+    def improvement(self):
+        """Horas de makespan ganadas respecto al plan inicial."""
+        return self.initial_makespan - self.makespan
+
+    @property
+    def improvement_pct(self):
+        return 100.0 * self.improvement / self.initial_makespan if self.initial_makespan else 0.0
+
+    def __repr__(self):
+        return (f"OptimizationResult(makespan={self.makespan:g}, initial={self.initial_makespan:g}, "
+                f"improvement={self.improvement_pct:.1f}%)")
+
+
+def _makespan(table):
+    return float(table.end_time.max()) if len(table) else 0.0
+
+
+def lower_bound(table, people, servers):
+    """
+    Cota inferior del makespan: el camino crítico sin recursos y, para cada servidor
+    y para el pool de personas, el primer inicio posible + su carga (repartida entre
+    las personas) + la cola mínima que queda tras sus tareas.
+    """
+    if not len(table):
+        return 0.0
+    cpm = critical_path(table)
+    tail = cpm.makespan - cpm.lf
+    duration = table.duration
+    bound = cpm.makespan
+    manual = table.type_mask("manual")
+    if manual.any() and people:
+        head = max(cpm.es[manual].min(), min(p.available_from for p in people))
+        bound = max(bound, head + duration[manual].sum() / len(people) + tail[manual].min())
+    automated = table.type_mask("automated")
+    for s, name in enumerate(table.servers):
+        mask = automated & (table.server_code == s)
+        if name and mask.any():
+            head = max(cpm.es[mask].min(), servers.get(name, 0.0))
+            bound = max(bound, head + duration[mask].sum() + tail[mask].min())
+    return float(bound)
+
+
+def _order_keys(order):
+    """Claves que reproducen `order` al decodificar: la posición de cada fila."""
+    keys = np.empty(len(order), dtype=np.float64)
+    keys[order] = np.arange(len(order))
+    return keys
+
+
+# ------------------------------------------------------------------
+# Búsqueda local (en los procesos del pool)
+# ------------------------------------------------------------------
+# estado de solo lectura de cada proceso, como en sweep y montecarlo
+_SHARED = {}
+
+
+def _init_worker(table, people, servers, start_day, calendars):
+    _SHARED.update(table=table, reversed=_reversed(table), people=people, servers=servers,
+                   start_day=start_day, calendars=calendars)
+
+
+def _reversed(table):
+    """Misma tabla con las dependencias invertidas y sin start_after (para justificar)."""
+    result = copy.copy(table)
+    result.dep_indptr, result.dep_indices = table.dependents()
+    result._dependents = (table.dep_indptr, table.dep_indices)
+    result.start_after = np.zeros(len(table))
+    return result
+
+
+def _decode(keys, backward=False):
+    if backward:
+        # el problema invertido ignora disponibilidades iniciales y calendarios: solo
+        # se usa para obtener un orden, que luego se programa hacia delante
+        people = [Person(name) for name, _ in _SHARED["people"]]
+        sched = Scheduler(people, {name: 0.0 for name in _SHARED["servers"]}, engine="backfill")
+        table = _SHARED["reversed"]
+    else:
+        people = [Person(name) for name, _ in _SHARED["people"]]
+        for p, (_, avail) in zip(people, _SHARED["people"]):
+            p.available_from = avail
+        sched = Scheduler(people, _SHARED["servers"], start_day=_SHARED["start_day"],
+                          engine="backfill", calendars=_SHARED["calendars"])
+        table = _SHARED["table"]
+    # copia superficial: el motor deja los resultados en atributos nuevos
+    return sched.schedule_table(copy.copy(table), keys=keys.tolist())
+
+
+def _justify(result, deadline):
+    """Aplica justificaciones atrás/adelante mientras mejoren el coste (y quede tiempo)."""
+    cost = _cost(result)
+    for _ in range(JUSTIFY_PASSES):
+        if time.perf_counter() >= deadline:
+            break
+        backward = _decode(-result.end_time, backward=True)
+        candidate = _decode(-backward.end_time)
+        candidate_cost = _cost(candidate)
+        if not candidate_cost < cost:
+            break
+        result, cost = candidate, candidate_cost
+    return result, cost
+
+
+def _critical_chain(table):
+    """
+    Cadena que fija el makespan, desde la última tarea hacia atrás: lista de
+    (fila, bloqueo), donde bloqueo es la tarea que ocupaba el recurso cuando la
+    fila ya podía empezar, o None si la fila esperaba a una dependencia.
+    """
+    n = len(table)
+    if not n:
+        return []
+    start = table.start_time.tolist()
+    end = table.end_time.tolist()
+    assigned = table.assigned.tolist()
+    start_after = table.start_after.tolist()
+    indptr = table.dep_indptr.tolist()
+    indices = table.dep_indices.tolist()
+    finishing = {}
+    for i in range(n):
+        finishing.setdefault((assigned[i], end[i]), i)
+
+    chain = []
+    i = int(np.argmax(table.end_time))
+    while len(chain) < n:
+        deps = indices[indptr[i]:indptr[i + 1]]
+        binding = max(deps, key=end.__getitem__) if deps else None
+        ready = max(end[binding] if binding is not None else 0.0, start_after[i])
+        if start[i] - ready > EPS:
+            j = finishing.get((assigned[i], start[i]))
+            if j is None or j == i:
+                break
+            chain.append((i, j))
+            i = j
+        elif binding is not None and end[binding] >= start_after[i]:
+            chain.append((i, None))
+            i = binding
+        else:
+            chain.append((i, None))
+            break
+    return chain
+
+
+def _neighbour(rng, keys, order, chain):
+    """
+    Nuevas claves a partir de las actuales: una tarea crítica que espera a su
+    recurso pasa por delante de la que lo ocupaba (o de alguna anterior), o se
+    baraja un bloque de tareas consecutivas del orden.
+    """
+    keys = keys.copy()
+    waiting = [(i, j) for i, j in chain if j is not None]
+    if waiting and rng.random() < 0.6:
+        i, j = rng.choice(waiting)
+        target = max(0, int(keys[j]) - rng.randrange(MAX_WINDOW) * (rng.random() < 0.3))
+        keys[i] = keys[order[target]] - 0.5
+        return keys
+    n = len(order)
+    size = rng.randint(2, min(MAX_WINDOW, n))
+    first = rng.randrange(0, n - size + 1)
+    block = order[first:first + size]
+    shuffled = keys[block]
+    rng.shuffle(shuffled)
+    keys[block] = shuffled
+    return keys
+
+
+def _cost(table):
+    # makespan y, para desempatar en las mesetas, la suma de los fines de cada recurso
+    end = table.end_time
+    if not len(end):
+        return 0.0, 0.0
+    last = np.zeros(len(table.resources))
+    np.maximum.at(last, table.assigned, end)
+    return float(end.max()), float(last.sum())
+
+
+def _search(args):
+    seed, budget, keys, noise, bound = args
+    deadline = time.perf_counter() + budget
+    rng = random.Random(seed)
+    if noise:
+        keys = keys + np.array([rng.gauss(0.0, noise) for _ in range(len(keys))])
+    current, current_cost = _justify(_decode(keys), deadline)
+    order = current.order
+    keys = _order_keys(order)
+    best_cost, best_keys = current_cost, keys
+    chain = _critical_chain(current)
+    iterations = accepted = 0
+
+    # al alcanzar la cota inferior el plan es óptimo: no hay nada más que buscar
+    while time.perf_counter() < deadline and len(order) > 1 and best_cost[0] > bound + EPS:
+        candidate, cost = _justify(_decode(_neighbour(rng, keys, order, chain)), deadline)
+        iterations += 1
+        # se aceptan también los empates: permiten moverse por mesetas
+        if cost <= current_cost:
+            accepted += 1
+            order = candidate.order
+            keys = _order_keys(order)
+            current_cost = cost
+            chain = _critical_chain(candidate)
+            if cost < best_cost:
+                best_cost, best_keys = cost, keys
+    return {"seed": seed, "makespan": best_cost[0], "iterations": iterations,
+            "accepted": accepted, "keys": best_keys}
+
+
+# ------------------------------------------------------------------
+# API
+# ------------------------------------------------------------------
+def optimize(config, people, servers, budget=10.0, restarts=None, max_workers=None, seed=0,
+             start_day=None, calendars=None):
+    """
+    Busca un plan con menor makespan que el del scheduler en `budget` segundos.
+
+    config: dict de configuración o TaskTable ya compilada.
+    people: lista de Person; servers: dict {servidor: disponible_desde}.
+    restarts: búsquedas independientes (por defecto, una por proceso); el primer
+              reinicio parte del orden del plan inicial y el resto de ese orden con
+              ruido. max_workers=None usa todos los núcleos; 1, este proceso.
+    calendars: intervalos bloqueados por recurso (ver Scheduler).
+    Un config con calendario laboral (sección calendar) da ValueError.
+    Devuelve un OptimizationResult; su tabla nunca es peor que el plan inicial.
+    """
+    started = time.perf_counter()
+    if isinstance(config, TaskTable):
+        table = config
+    else:
+        if config.get("calendar"):
+            # el pase hacia atrás invierte el eje de tiempo y las cotas van en horas de reloj
+            raise ValueError("El optimizador no admite calendario laboral (sección calendar del config)")
+        table = build_task_table(config)
+        if start_day is None:
+            start_day = config.get("start_day")
+    if isinstance(start_day, str):
+        start_day = datetime.fromisoformat(start_day)
+    if budget < 0:
+        raise ValueError(f"Presupuesto de tiempo inválido: {budget}")
+
+    people_state = [(p.name, p.available_from) for p in people]
+    servers = dict(servers)
+    initial = Scheduler([copy.copy(p) for p in people], servers, start_day=start_day,
+                        calendars=calendars, engine="backfill" if calendars else "heap"
+                        ).schedule_table(copy.copy(table))
+    initial_makespan = _makespan(initial)
+    bound = lower_bound(table, people, servers)
+    table.dependents()  # CSR inverso calculado una vez y compartido con los workers
+    initargs = (table, people_state, servers, start_day, calendars)
+
+    workers = max(1, max_workers or os.cpu_count() or 1)
+    if restarts is None:
+        restarts = workers
+    if restarts < 1:
+        raise ValueError(f"Número de reinicios inválido: {restarts}")
+    workers = min(workers, restarts)
+    # los reinicios que no caben en el pool se ejecutan en rondas sucesivas
+    rounds = math.ceil(restarts / workers)
+    remaining = max(0.0, budget - (time.perf_counter() - started))
+    keys = _order_keys(initial.order)
+    jobs = [(seed + r, remaining / rounds, keys, RESTART_NOISE if r else 0.0, bound)
+            for r in range(restarts)]
+
+    if workers <= 1:
+        _init_worker(*initargs)
+        runs = [_search(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            runs = list(pool.map(_search, jobs))
+
+    best = min(runs, key=lambda r: r["makespan"])
+    if best["makespan"] < initial_makespan - EPS:
+        _init_worker(*initargs)
+        result = _decode(best["keys"])
+    else:
+        result = initial
+    summary = pd.DataFrame([{k: v for k, v in r.items() if k != "keys"} for r in runs])
+    return OptimizationResult(result, _makespan(result), initial_makespan, bound, summary,
+                              time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimización del makespan con presupuesto de tiempo")
+    parser.add_argument("config", nargs="?", default="config.yaml", help="fichero de configuración YAML")
+    parser.add_argument("--people", type=int, default=2, help="tamaño del pool de personas")
+    parser.add_argument("--servers", default="S1,S2", help="servidores: 'S1,S2' o 'S1=0,S2=8'")
+    parser.add_argument("--budget", type=float, default=10.0, help="segundos de búsqueda")
+    parser.add_argument("--restarts", type=int, default=None, help="reinicios (por defecto, uno por proceso)")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--export", metavar="PATH", help="guarda el mejor plan (.csv, .parquet o .arrow)")
+    args = parser.parse_args(argv)
+
+    config = ScheduleCache().load_config(args.config)
+    people = [Person(f"Persona_{i+1}") for i in range(args.people)]
+    result = optimize(config, people, parse_servers(args.servers), budget=args.budget,
+                      restarts=args.restarts, max_workers=args.workers, seed=args.seed)
+    print(result.restarts.to_string(index=False))
+    print(f"Makespan: {result.initial_makespan:g} h -> {result.makespan:g} h "
+          f"(-{result.improvement:g} h, {result.improvement_pct:.1f}%) en {result.elapsed:.1f} s; "
+          f"cota inferior {result.lower_bound:g} h")
+    if args.export:
+        start_day = config.get("start_day")
+        if isinstance(start_day, str):
+            start_day = datetime.fromisoformat(start_day)
+        export_schedule(result.table, start_day, args.export)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# partition.py
+# Programación en paralelo de componentes independientes del grafo de tareas.
+# Dos tareas están acopladas si una depende de la otra o si usan el mismo servidor;
+# las componentes conexas de esa relación no se influyen entre sí y se programan
+# por separado en un pool de procesos. Después se fusionan en una sola TaskTable
+# con los mismos códigos de recurso que Scheduler.schedule_table.
+#
+# Dos casos especiales:
+#  - Tareas fijas: milestones y automáticas sin servidor cuyas dependencias también
+#    son fijas. Su horario no depende de ningún recurso (es el del CPM), así que
+#    no acoplan a sus dependientes: cada grupo lleva una copia de las que necesita.
+#  - El pool de personas lo comparten todas las tareas manuales. Con
+#    people_policy="shared" (por defecto) las componentes con tareas manuales se
+#    programan juntas y el resultado es el mismo que el del scheduler en serie.
+#    Con "split" cada grupo de componentes recibe su propio equipo (reparto de las
+#    personas proporcional al trabajo manual): es otro plan, con equipos dedicados,
+#    pero escala con los núcleos aunque todos los clientes tengan tareas manuales.
+#
+#   python -m src.partition config.yaml --people 8 --policy split --workers 4
+import argparse
+import heapq
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from src.analysis import _gather, critical_path
+from src.cache import ScheduleCache
+from src.models import Person
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.sweep import parse_servers
+from src.work_calendar import calendar_from_config
+
+PEOPLE_POLICIES = ("shared", "split")
+# grupos por proceso al repartir las componentes sin tareas manuales (equilibrio de carga)
+GROUPS_PER_WORKER = 4
+
+
+class Partition:
+    """
+    Grupo de filas que se programa en un mismo Scheduler, con las personas `people`
+    (índices). fixed: filas fijas de las que depende, que se copian en el grupo.
+    """
+
+    def __init__(self, rows, people, fixed=None):
+        self.rows = rows
+        self.people = people
+        self.fixed = np.zeros(0, dtype=np.int64) if fixed is None else fixed
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"Partition(tasks={len(self.rows)}, people={len(self.people)})"
+
+
+def _resource_free(table):
+    # filas que no ocupan ningún recurso con capacidad (cola 1 del motor)
+    named_server = np.array([bool(name) for name in table.servers] + [False], dtype=bool)
+    on_server = table.type_mask("automated") & named_server[table.server_code]
+    return ~table.type_mask("manual") & ~on_server
+
+
+def pinned_rows(table, cpm=None):
+    """
+    Máscara de las tareas fijas: sin recurso y con todas sus dependencias fijas.
+    Cualquier motor las programa en su inicio más temprano del CPM (cpm.es).
+    """
+    cpm = cpm or critical_path(table)
+    free = _resource_free(table)
+    pinned = np.zeros(len(table), dtype=bool)
+    for nodes in cpm.levels:
+        # las dependencias de un nivel están en niveles anteriores, ya resueltos
+        pinned[nodes] = free[nodes]
+        owners, deps = _gather(table.dep_indptr, table.dep_indices, nodes)
+        pinned[owners[~pinned[deps]]] = False
+    return pinned
+
+
+def _connected(n, u, v):
+    """
+    Union-find vectorizado: une los pares (u[k], v[k]) colgando cada raíz de la
+    menor de las dos y comprimiendo caminos hasta que todos los pares comparten
+    raíz. Devuelve la raíz (la fila mínima) de la componente de cada nodo.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    while True:
+        ru, rv = parent[u], parent[v]
+        differ = ru != rv
+        if not differ.any():
+            return parent
+        ru, rv = ru[differ], rv[differ]
+        np.minimum.at(parent, np.maximum(ru, rv), np.minimum(ru, rv))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        u, v = u[differ], v[differ]
+
+
+def independent_components(table, pinned=None):
+    """
+    Etiqueta de componente de cada fila (0..k-1, por su primera fila; -1 en las
+    filas fijas) y número de componentes. Las aristas son las dependencias entre
+    filas no fijas y el uso compartido de un servidor.
+    """
+    n = len(table)
+    if pinned is None:
+        pinned = pinned_rows(table)
+    owners = np.repeat(np.arange(n, dtype=np.int64), np.diff(table.dep_indptr))
+    deps = table.dep_indices
+    linked = ~pinned[owners] & ~pinned[deps]
+    u, v = [owners[linked]], [deps[linked]]
+
+    # las filas de un mismo servidor, encadenadas
+    on_server = ~_resource_free(table) & ~table.type_mask("manual")
+    rows = np.flatnonzero(on_server)
+    rows = rows[np.argsort(table.server_code[rows], kind="stable")]
+    same = table.server_code[rows[1:]] == table.server_code[rows[:-1]]
+    u.append(rows[1:][same])
+    v.append(rows[:-1][same])
+
+    root = _connected(n, np.concatenate(u), np.concatenate(v))
+    labels = np.full(n, -1, dtype=np.int64)
+    roots, labels[~pinned] = np.unique(root[~pinned], return_inverse=True)
+    return labels, len(roots)
+
+
+def _fixed_ancestors(table, rows, pinned):
+    # filas fijas de las que dependen `rows`, directa o indirectamente
+    found = np.zeros(len(table), dtype=bool)
+    frontier = rows
+    while frontier.size:
+        _, deps = _gather(table.dep_indptr, table.dep_indices, frontier)
+        deps = np.unique(deps[pinned[deps] & ~found[deps]])
+        found[deps] = True
+        frontier = deps
+    return np.flatnonzero(found)
+
+
+def _pack(weights, bins):
+    # LPT: de mayor a menor peso, cada elemento al contenedor menos cargado
+    load = [(0.0, b) for b in range(bins)]
+    packed = [[] for _ in range(bins)]
+    for i in sorted(range(len(weights)), key=lambda i: (-weights[i], i)):
+        total, b = heapq.heappop(load)
+        packed[b].append(i)
+        heapq.heappush(load, (total + weights[i], b))
+    return [sorted(items) for items in packed if items]
+
+
+def _team_sizes(workloads, num_people):
+    # reparto proporcional (restos mayores) con al menos una persona por equipo
+    total = sum(workloads) or 1.0
+    spare = num_people - len(workloads)
+    exact = [spare * w / total for w in workloads]
+    sizes = [1 + int(e) for e in exact]
+    by_remainder = sorted(range(len(workloads)), key=lambda t: (-(exact[t] - int(exact[t])), t))
+    for t in by_remainder[:num_people - sum(sizes)]:
+        sizes[t] += 1
+    return sizes
+
+
+def plan_partitions(table, num_people, people_policy="shared", jobs=1, pinned=None):
+    """
+    Grupos a programar por separado (lista de Partition) y máscara de filas fijas.
+    Las componentes sin tareas manuales se reparten en hasta jobs * GROUPS_PER_WORKER
+    grupos equilibrados por número de tareas; las que usan personas forman un solo
+    grupo con todo el pool ("shared") o tantos equipos como personas o componentes
+    haya, lo que sea menor ("split").
+    """
+    if people_policy not in PEOPLE_POLICIES:
+        raise ValueError(f"Política de personas '{people_policy}' no soportada "
+                         f"(opciones: {', '.join(PEOPLE_POLICIES)})")
+    if pinned is None:
+        pinned = pinned_rows(table)
+    labels, count = independent_components(table, pinned)
+    manual = table.type_mask("manual")
+    sizes = np.bincount(labels[~pinned], minlength=count)
+    workload = np.bincount(labels[manual], weights=table.duration[manual], minlength=count)
+    uses_people = np.bincount(labels[manual], minlength=count) > 0
+
+    rows_by_label = np.split(np.argsort(labels[~pinned], kind="stable"), np.cumsum(sizes)[:-1])
+    free_rows = np.flatnonzero(~pinned)
+    members = [free_rows[r] for r in rows_by_label]
+
+    def merge(labels_group):
+        return np.sort(np.concatenate([members[c] for c in labels_group]))
+
+    partitions = []
+    coupled = np.flatnonzero(uses_people).tolist()
+    if coupled and (people_policy == "shared" or num_people <= 1):
+        partitions.append(Partition(merge(coupled), list(range(num_people))))
+    elif coupled:
+        teams = _pack(workload[coupled].tolist(), min(num_people, len(coupled)))
+        team_sizes = _team_sizes([float(workload[[coupled[i] for i in team]].sum()) for team in teams],
+                                 num_people)
+        first = 0
+        for team, size in zip(teams, team_sizes):
+            partitions.append(Partition(merge([coupled[i] for i in team]),
+                                        list(range(first, first + size))))
+            first += size
+
+    independent = np.flatnonzero(~uses_people).tolist()
+    if independent:
+        bins = max(1, jobs * GROUPS_PER_WORKER)
+        for group in _pack(sizes[independent].tolist(), bins):
+            partitions.append(Partition(merge([independent[i] for i in group]), []))
+    for p in partitions:
+        p.fixed = _fixed_ancestors(table, p.rows, pinned)
+    return partitions, pinned
+
+
+# ------------------------------------------------------------------
+# Trabajo por grupo (en los procesos del pool)
+# ------------------------------------------------------------------
+# estado de solo lectura de cada proceso (ver src/sweep.py)
+_SHARED = {}
+
+
+def _init_worker(table, pinned, people_state, servers, start_day, engine, calendars):
+    _SHARED.update(table=table, pinned=pinned, people_state=people_state, servers=servers,
+                   start_day=start_day, engine=engine, calendars=calendars,
+                   dependents_count=np.bincount(table.dep_indices, minlength=len(table)))
+
+
+def _schedule_partition(partition):
+    """Programa un grupo; devuelve (inicio, fin, recurso en códigos globales, orden en filas globales)."""
+    table = _SHARED["table"]
+    people = []
+    for name, avail in (_SHARED["people_state"][p] for p in partition.people):
+        person = Person(name)
+        person.available_from = avail
+        people.append(person)
+    rows = np.union1d(partition.rows, partition.fixed)
+    sub = table.subset(rows)
+    # el desempate del motor usa priority - dependientes: las filas fijas compartidas
+    # conservan el recuento de la tabla completa
+    sub.priority = (sub.priority - _SHARED["dependents_count"][rows]
+                    + np.bincount(sub.dep_indices, minlength=len(rows)))
+    Scheduler(people, _SHARED["servers"], start_day=_SHARED["start_day"], engine=_SHARED["engine"],
+              calendars=_SHARED["calendars"]).schedule_table(sub)
+
+    # códigos del grupo -> globales: sus personas por índice; el resto, desplazado
+    n_local = len(people)
+    offset = len(_SHARED["people_state"]) - n_local
+    codes = np.array(partition.people + list(range(n_local + offset, len(sub.resources) + offset)),
+                     dtype=np.int32)
+    own = ~_SHARED["pinned"][rows]
+    order = rows[sub.order]
+    return (sub.start_time[own], sub.end_time[own], codes[sub.assigned[own]],
+            order[~_SHARED["pinned"][order]])
+
+
+def schedule_partitioned(scheduler, table, people_policy="shared", max_workers=None):
+    """
+    Como scheduler.schedule_table(table), pero programando cada grupo independiente
+    (plan_partitions) en un pool de procesos (max_workers=None: todos los núcleos;
+    1: en este proceso) y fusionando los resultados en `table`.
+    Con people_policy="shared" el plan es el del motor en serie (salvo el orden
+    relativo de tareas de grupos distintos que empiezan a la vez); con "split"
+    cada equipo solo atiende sus componentes. order es la mezcla por inicio del
+    orden de cada grupo: respeta dependencias y el orden de cada recurso.
+    Actualiza la disponibilidad de personas y servidores del scheduler.
+    """
+    if scheduler.work_calendar is not None:
+        # las filas fijadas toman sus tiempos del CPM, que va en horas de reloj
+        raise ValueError("La programación por particiones no admite calendario laboral")
+    instr = scheduler.instrumentation
+    people = scheduler.people
+    n = len(table)
+    workers = max(1, max_workers or os.cpu_count() or 1)
+    with instr.phase("schedule_partitioned", tasks=n, policy=people_policy):
+        with instr.phase("partition"):
+            cpm = critical_path(table)
+            pinned = pinned_rows(table, cpm)
+            partitions, _ = plan_partitions(table, len(people), people_policy, workers, pinned)
+        instr.count("partition.groups", len(partitions))
+        instr.count("partition.pinned", int(pinned.sum()))
+
+        people_state = [(p.name, p.available_from) for p in people]
+        servers = dict(scheduler.servers)
+        initargs = (table, pinned, people_state, servers, scheduler.start_day, scheduler.engine,
+                    scheduler.calendars)
+        # los grupos grandes primero, para que el último en terminar sea pequeño
+        jobs = sorted(partitions, key=len, reverse=True)
+        workers = min(workers, len(jobs))
+        with instr.phase("run", groups=len(jobs), workers=workers):
+            if workers <= 1:
+                _init_worker(*initargs)
+                results = [_schedule_partition(p) for p in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=initargs) as pool:
+                    results = list(pool.map(_schedule_partition, jobs))
+
+        with instr.phase("merge"):
+            n_people = len(people)
+            system = n_people + len(table.servers)
+            resources = [p.name for p in people] + list(table.servers) + ["System", "Milestone", "Unknown"]
+            start_time = cpm.es.copy()
+            end_time = cpm.ef.copy()
+            assigned = np.full(n, system + 2, dtype=np.int32)
+            assigned[table.type_mask("automated")] = system
+            assigned[table.type_mask("milestone")] = system + 1
+            # filas fijas: por inicio y nivel topológico (dependencias antes)
+            level = np.empty(n, dtype=np.int64)
+            for k, nodes in enumerate(cpm.levels):
+                level[nodes] = k
+            fixed = np.flatnonzero(pinned)
+            sequences = [fixed[np.lexsort((fixed, level[fixed], start_time[fixed]))].tolist()]
+            for p, (start, end, codes, order) in zip(jobs, results):
+                start_time[p.rows] = start
+                end_time[p.rows] = end
+                assigned[p.rows] = codes
+                sequences.append(order.tolist())
+            # a igual inicio gana la secuencia anterior: las filas fijas van primero
+            starts = start_time.tolist()
+            order = np.fromiter(heapq.merge(*sequences, key=starts.__getitem__), dtype=np.int64, count=n)
+
+            initial = (tuple(avail for _, avail in people_state),
+                       tuple(servers.get(name, 0.0) for name in table.servers))
+            last_end = np.full(len(resources), -np.inf)
+            np.maximum.at(last_end, assigned, end_time)
+            for i, p in enumerate(people):
+                p.available_from = max(p.available_from, float(last_end[i]))
+            for s, name in enumerate(table.servers):
+                if np.isfinite(last_end[n_people + s]):
+                    scheduler.servers[name] = max(servers.get(name, 0.0), float(last_end[n_people + s]))
+
+            table.resources = resources
+            table.resource_start = initial
+            table.start_time = start_time
+            table.end_time = end_time
+            table.assigned = assigned
+            table.order = order
+        return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Programación en paralelo por componentes independientes")
+    parser.add_argument("config", nargs="?", default="config.yaml", help="fichero de configuración YAML")
+    parser.add_argument("--people", type=int, default=2, help="tamaño del pool de personas")
+    parser.add_argument("--servers", default="S1,S2", help="servidores: 'S1,S2' o 'S1=0,S2=8'")
+    parser.add_argument("--policy", default="shared", choices=PEOPLE_POLICIES,
+                        help="personas: un pool común (shared) o equipos por grupo (split)")
+    parser.add_argument("--engine", default="heap", help="motor del scheduler")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    config = ScheduleCache().load_config(args.config)
+    start_day = config.get("start_day")
+    if isinstance(start_day, str):
+        start_day = datetime.fromisoformat(start_day)
+    table = build_task_table(config)
+    scheduler = Scheduler([Person(f"Persona_{i+1}") for i in range(args.people)],
+                          parse_servers(args.servers), start_day=start_day, engine=args.engine,
+                          work_calendar=calendar_from_config(config, start_day))
+    partitions, pinned = plan_partitions(table, args.people, args.policy)
+    _, count = independent_components(table, pinned)
+    started = time.perf_counter()
+    schedule_partitioned(scheduler, table, args.policy, max_workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"{len(table)} tareas: {int(pinned.sum())} fijas, {count} componentes, {len(partitions)} grupos")
+    for p in sorted(partitions, key=len, reverse=True)[:10]:
+        print(f"  {len(p)} tareas, {len(p.people)} personas")
+    print(f"Makespan: {float(table.end_time.max()) if len(table) else 0.0:g} h en {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+# portfolio.py
+# Cartera de proyectos: varios config.yaml independientes que compiten por el mismo
+# pool de personas y servidores. Los configs de un directorio se cargan y compilan
+# en paralelo (pool de procesos, con la caché en disco de ScheduleCache), se fusionan
+# en una sola TaskTable y se programan juntos con un Scheduler.
+#
+#  - Espacio de nombres: cada proyecto lleva su nombre (el del fichero sin extensión)
+#    delante de sus clientes y de sus nombres de tarea ("proyecto::Cliente::plantilla::
+#    tarea"), así dos proyectos con los mismos clientes o plantillas no se mezclan.
+#    Tipos, servidores, plantillas y tareas se comparten por nombre: S1 es el mismo
+#    servidor en todos los proyectos.
+#  - Pesos: la prioridad de las tareas de un proyecto se divide por su peso (por
+#    defecto 1); un peso 2 adelanta sus tareas frente a las de igual prioridad.
+#  - Fechas: el plan empieza en el start_day más temprano y las tareas de cada
+#    proyecto no empiezan antes del suyo (se desplaza su start_after).
+#  - Calendario laboral: si los proyectos tienen sección calendar, debe ser la misma
+#    en todos (el pool es común) o darse uno explícito con work_calendar.
+#
+# La fusión es lineal en el total de tareas: las columnas de todos los proyectos se
+# concatenan una sola vez y los códigos internados se remapean con un array por
+# proyecto (no hay concatenaciones sucesivas de tablas ni búsquedas por fila).
+#
+#   python -m src.portfolio proyectos/ --people 6 --servers S1,S2 --weight urgente=2
+import argparse
+import copy
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import critical_path, mark_acyclic
+from src.cache import ScheduleCache
+from src.export import export_schedule
+from src.models import Person, TaskNames, TaskTable
+from src.scheduler import Scheduler
+from src.store import STORE_EXTENSIONS
+from src.sweep import parse_servers
+from src.work_calendar import WorkCalendar
+
+PROJECT_EXTENSIONS = (".yaml", ".yml") + STORE_EXTENSIONS
+# ficheros por tarea del pool al cargar (equilibrio de carga con cientos de proyectos)
+CHUNKS_PER_WORKER = 4
+
+
+class Project:
+    """
+    Proyecto de la cartera: nombre, TaskTable compilada (sin programar), start_day
+    y sección calendar de su config (o None).
+    """
+
+    def __init__(self, name, table, start_day=None, weight=1.0, calendar=None):
+        if weight <= 0:
+            raise ValueError(f"Peso inválido para el proyecto '{name}': {weight}")
+        self.name = name
+        self.table = table
+        self.start_day = start_day
+        self.weight = float(weight)
+        self.calendar = calendar
+
+    def __len__(self):
+        return len(self.table)
+
+    def __repr__(self):
+        return f"Project({self.name}, tasks={len(self.table)}, weight={self.weight:g})"
+
+
+def project_paths(directory):
+    """Ficheros de proyecto (YAML o almacén SQLite) de un directorio, por nombre."""
+    paths = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                   if os.path.splitext(f)[1].lower() in PROJECT_EXTENSIONS)
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    duplicated = sorted(n for n, count in Counter(names).items() if count > 1)
+    if duplicated:
+        raise ValueError(f"Proyectos con el mismo nombre en {directory}: {', '.join(duplicated)}")
+    return paths
+
+
+def _load_project(path):
+    # en los procesos del pool: config y tabla compilada pasan por la caché en disco
+    # (escrituras atómicas, así que varios procesos pueden compartirla)
+    cache = ScheduleCache()
+    config = cache.load_config(path)
+    start_day = config.get("start_day")
+    if isinstance(start_day, str):
+        start_day = datetime.fromisoformat(start_day)
+    return cache.compiled(config), start_day, config.get("calendar") or None
+
+
+def load_projects(paths, weights=None, max_workers=None):
+    """
+    Carga y compila los proyectos de `paths` en paralelo (max_workers=None: todos
+    los núcleos; 1: en este proceso). weights: {nombre de proyecto: peso}.
+    """
+    paths = list(paths)
+    weights = dict(weights or {})
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    unknown = sorted(set(weights) - set(names))
+    if unknown:
+        raise ValueError(f"Pesos para proyectos inexistentes: {', '.join(unknown)}")
+
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        loaded = [_load_project(p) for p in paths]
+    else:
+        chunksize = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            loaded = list(pool.map(_load_project, paths, chunksize=chunksize))
+    return [Project(name, table, start_day, weights.get(name, 1.0), calendar)
+            for name, (table, start_day, calendar) in zip(names, loaded)]
+
+
+class Portfolio:
+    """
+    Tabla conjunta de una cartera. Las filas del proyecto k son
+    offsets[k]:offsets[k+1] de `table`; start_day es el origen común de las horas
+    y work_calendar el calendario laboral con el que se programó (o None).
+    """
+
+    def __init__(self, projects, table, offsets, start_day, work_calendar=None):
+        self.projects = projects
+        self.table = table
+        self.offsets = offsets
+        self.start_day = start_day
+        self.work_calendar = work_calendar
+
+    def __repr__(self):
+        return f"Portfolio(projects={len(self.projects)}, tasks={len(self.table)})"
+
+    def project_of(self):
+        """Índice del proyecto de cada fila de la tabla."""
+        return np.repeat(np.arange(len(self.projects)), np.diff(self.offsets))
+
+    def rows(self, name):
+        """Filas de la tabla conjunta de un proyecto (por nombre)."""
+        for k, p in enumerate(self.projects):
+            if p.name == name:
+                return np.arange(self.offsets[k], self.offsets[k + 1])
+        raise ValueError(f"Proyecto '{name}' no está en la cartera")
+
+
+def _remap(symbols, merged, index):
+    # códigos de `symbols` en la lista común `merged` (+ un -1 final para los códigos -1)
+    codes = []
+    for s in symbols:
+        code = index.get(s)
+        if code is None:
+            code = index[s] = len(merged)
+            merged.append(s)
+        codes.append(code)
+    return np.array(codes + [-1], dtype=np.int64)
+
+
+def _start_day(projects):
+    # origen común: el start_day más temprano (None si ningún proyecto lo da)
+    days = [p.start_day for p in projects if p.start_day is not None]
+    return min(days) if days else None
+
+
+def _common_calendar(projects, start_day):
+    # calendario de la sección calendar de los proyectos: la misma en todos o ninguna
+    specs = [p.calendar for p in projects]
+    if all(spec is None for spec in specs):
+        return None
+    if any(spec != specs[0] for spec in specs):
+        with_calendar = sorted(p.name for p in projects if p.calendar is not None)
+        raise ValueError("Los proyectos de la cartera tienen calendarios laborales distintos "
+                         f"(con sección calendar: {', '.join(with_calendar)}); "
+                         "hay que dar uno común con work_calendar")
+    return WorkCalendar.from_config(specs[0], start_day)
+
+
+def merge_projects(projects, start_day=None):
+    """
+    Fusiona las tablas compiladas de `projects` en un Portfolio sin programar.
+    start_day: origen común (por defecto, el más temprano de los proyectos).
+    """
+    if not projects:
+        raise ValueError("La cartera no tiene proyectos")
+    if start_day is None:
+        start_day = _start_day(projects)
+
+    types, servers, clients, scopes, templates, tasks = [], [], [], [], [], []
+    index = {name: {} for name in ("types", "servers", "clients", "scopes", "templates", "tasks")}
+    offsets = np.zeros(len(projects) + 1, dtype=np.int64)
+    columns = {c: [] for c in ("duration", "start_after", "priority", "type_code", "client_code",
+                               "server_code", "scope_code", "template_code", "task_code",
+                               "dep_counts", "dep_indices")}
+    acyclic = True
+    for k, p in enumerate(projects):
+        t = p.table
+        names = t.names
+        n = len(t)
+        offsets[k + 1] = offsets[k] + n
+        prefix = p.name + "::"
+
+        # símbolos: los del proyecto con su nombre delante (clientes y ámbitos de
+        # nombre) o compartidos por nombre (el resto)
+        type_map = _remap(t.types, types, index["types"])
+        server_map = _remap(t.servers, servers, index["servers"])
+        client_map = _remap([prefix + str(c) for c in t.clients], clients, index["clients"])
+        # filas sin ámbito (milestones globales, nombres sueltos): el del proyecto
+        scope_map = _remap([prefix + s for s in names.scopes] + [p.name], scopes, index["scopes"])
+        scope_map[-1] = scope_map[-2]
+        template_map = _remap(names.templates, templates, index["templates"])
+        task_map = _remap(names.tasks, tasks, index["tasks"])
+
+        shift = 0.0
+        if start_day is not None and p.start_day is not None:
+            shift = (p.start_day - start_day).total_seconds() / 3600
+        columns["duration"].append(t.duration)
+        columns["start_after"].append(t.start_after + shift if shift else t.start_after)
+        columns["priority"].append(t.priority / p.weight if p.weight != 1.0 else t.priority)
+        columns["type_code"].append(type_map[t.type_code])
+        columns["client_code"].append(client_map[t.client_code])
+        columns["server_code"].append(server_map[t.server_code])
+        columns["scope_code"].append(scope_map[names.scope_code])
+        columns["template_code"].append(template_map[names.template_code])
+        columns["task_code"].append(task_map[names.task_code])
+        columns["dep_counts"].append(np.diff(t.dep_indptr))
+        columns["dep_indices"].append(t.dep_indices + offsets[k])
+        acyclic = acyclic and getattr(t, "_acyclic_deps", None) is t.dep_indices
+
+    merged = {c: np.concatenate(v) for c, v in columns.items()}
+    dep_indptr = np.zeros(offsets[-1] + 1, dtype=np.int64)
+    np.cumsum(merged["dep_counts"], out=dep_indptr[1:])
+    table = TaskTable(
+        names=TaskNames(merged["scope_code"], merged["template_code"], merged["task_code"],
+                        scopes, templates, tasks),
+        duration=merged["duration"], start_after=merged["start_after"],
+        priority=merged["priority"], type_code=merged["type_code"],
+        client_code=merged["client_code"], server_code=merged["server_code"],
+        dep_indptr=dep_indptr, dep_indices=merged["dep_indices"],
+        types=types, clients=clients, servers=servers,
+    )
+    if acyclic:
+        mark_acyclic(table)  # unión disjunta de DAGs
+    return Portfolio(projects, table, offsets, start_day)
+
+
+def schedule_portfolio(projects, people, servers, start_day=None, engine="heap",
+                       work_calendar=None, instrumentation=None):
+    """
+    Programa los proyectos juntos con un solo pool de personas y servidores.
+    work_calendar: calendario laboral común; por defecto el de la sección calendar
+    de los proyectos (ValueError si no es la misma en todos).
+    Devuelve el Portfolio con la tabla conjunta programada.
+    """
+    if work_calendar is None:
+        if start_day is None:
+            start_day = _start_day(projects)
+        work_calendar = _common_calendar(projects, start_day)
+    if work_calendar is not None:
+        start_day = work_calendar.start_day
+    portfolio = merge_projects(projects, start_day)
+    scheduler = Scheduler(people, servers, start_day=portfolio.start_day, engine=engine,
+                          instrumentation=instrumentation, work_calendar=work_calendar)
+    scheduler.schedule_table(portfolio.table)
+    portfolio.start_day = scheduler.start_day
+    portfolio.work_calendar = work_calendar
+    return portfolio
+
+
+def project_summary(portfolio):
+    """
+    Una fila por proyecto: tareas, peso, inicio y fin (horas desde el start_day común),
+    fin del CPM sin restricciones de recursos y retraso respecto a él.
+    """
+    table = portfolio.table
+    k = len(portfolio.projects)
+    project = portfolio.project_of()
+    has_rows = np.diff(portfolio.offsets) > 0
+    calendar = portfolio.work_calendar
+    if calendar is None:
+        cpm_ef = critical_path(table).ef
+    else:
+        # CPM en horas de trabajo, como el plan, y después a horas de reloj
+        work = copy.copy(table)
+        work.start_after = calendar.to_work(table.start_after)
+        cpm_ef = calendar.to_wall(critical_path(work).ef, end=True)
+
+    def per_project(values, reduce, empty):
+        out = np.full(k, empty)
+        reduce.at(out, project, values)
+        return np.where(has_rows, out, np.nan)
+
+    start = per_project(table.start_time, np.minimum, np.inf)
+    end = per_project(table.end_time, np.maximum, -np.inf)
+    cpm_end = per_project(cpm_ef, np.maximum, -np.inf)
+    return pd.DataFrame({
+        "project": [p.name for p in portfolio.projects],
+        "tasks": np.diff(portfolio.offsets),
+        "weight": [p.weight for p in portfolio.projects],
+        "start": start,
+        "end": end,
+        "cpm_end": cpm_end,
+        "delay": end - cpm_end,
+    })
+
+
+def parse_weights(items):
+    """['urgente=2', 'interno=0.5'] -> {'urgente': 2.0, 'interno': 0.5}."""
+    weights = {}
+    for item in items or ():
+        name, sep, value = item.partition("=")
+        try:
+            weights[name] = float(value)
+        except ValueError:
+            sep = ""
+        if not sep or not name:
+            raise ValueError(f"Peso inválido: {item!r} (se espera proyecto=peso)")
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Programación conjunta de una cartera de proyectos")
+    parser.add_argument("directory", help="directorio con un config (.yaml o almacén SQLite) por proyecto")
+    parser.add_argument("--people", type=int, default=2, help="tamaño del pool común de personas")
+    parser.add_argument("--servers", default="S1,S2", help="servidores: 'S1,S2' o 'S1=0,S2=8'")
+    parser.add_argument("--weight", nargs="+", default=[], metavar="PROYECTO=PESO",
+                        help="pesos de prioridad por proyecto (por defecto 1)")
+    parser.add_argument("--engine", default="heap", help="motor del scheduler")
+    parser.add_argument("--workers", type=int, default=None, help="procesos de carga (por defecto, todos los núcleos)")
+    parser.add_argument("--export", metavar="FICHERO", help="exporta el plan conjunto a .csv, .parquet o .arrow")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    projects = load_projects(project_paths(args.directory), parse_weights(args.weight),
+                             max_workers=args.workers)
+    loaded = time.perf_counter()
+    people = [Person(f"Persona_{i+1}") for i in range(args.people)]
+    portfolio = schedule_portfolio(projects, people, parse_servers(args.servers), engine=args.engine)
+    elapsed = time.perf_counter() - loaded
+
+    print(f"{len(projects)} proyectos, {len(portfolio.table)} tareas "
+          f"(carga {loaded - started:.2f} s, programación {elapsed:.2f} s)")
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(project_summary(portfolio).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    if args.export:
+        fmt = export_schedule(portfolio.table, portfolio.start_day, args.export)
+        print(f"Plan exportado ({fmt}): {args.export}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,364 @@
 # process_manager.py
 import yaml
-from src.models import Task, Process
+import numpy as np
+from src.models import Task, Process, TaskNames, TaskTable, intern_codes
+from src.analysis import DependencyCycleError, find_cycles, mark_acyclic
+from src.instrumentation import NULL
+from src.store import ConfigStore, is_store
 from collections import defaultdict
 
-def load_config(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+def load_config(path, instrumentation=None):
+    """config.yaml o, si la ruta es un almacén SQLite (src/store.py), su config."""
+    if is_store(path):
+        with (instrumentation or NULL).phase("store_load", path=str(path)):
+            with ConfigStore(path) as store:
+                return store.load_config()
+    with (instrumentation or NULL).phase("yaml_load", path=str(path)):
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f)
 
 
-def build_processes(config):
+# Clasificación estática de una dependencia que no es una tarea de la propia plantilla
+# (la búsqueda en plantillas previas del cliente siempre tiene preferencia y es por cliente).
+DEP_MILESTONE = "milestone"
+DEP_GLOBAL_TEMPLATE = "global_template"   # hay un global con esa plantilla (el cliente tiene preferencia)
+DEP_CLIENT_TEMPLATE = "client_template"   # plantilla que solo puede resolver el propio cliente
+DEP_GLOBAL_TASK = "global_task"
+DEP_UNRESOLVED = "unresolved"
+
+
+class _SymbolTable:
+    """
+    Tabla única de los nombres a los que puede referirse una dependencia externa a
+    su plantilla: nombre -> (clase, Task o None). Se construye una vez por config y
+    resuelve cada referencia con una sola búsqueda. Precedencia, de mayor a menor:
+    milestone, plantilla con global, plantilla de cliente, tarea global.
+    """
+    __slots__ = ("entries",)
+
+    def __init__(self, process_templates, milestones_map, global_last_task_map):
+        entries = {}
+        # de menor a mayor precedencia: cada clase sobrescribe las anteriores
+        for (key, name), task in global_last_task_map.items():
+            if key == "name":
+                entries[name] = (DEP_GLOBAL_TASK, task)
+        for name in process_templates:
+            entries[name] = (DEP_CLIENT_TEMPLATE, None)
+        for (key, name), task in global_last_task_map.items():
+            if key == "template":
+                entries[name] = (DEP_GLOBAL_TEMPLATE, task)
+        for name, task in milestones_map.items():
+            entries[name] = (DEP_MILESTONE, task)
+        self.entries = entries
+
+    def kind(self, name):
+        entry = self.entries.get(name)
+        return entry[0] if entry is not None else DEP_UNRESOLVED
+
+    def task(self, name):
+        return self.entries[name][1]
+
+
+def _check_local_cycles(qualified_names, deps):
+    # deps: dependencias locales de cada tarea como índices (las demás se ignoran)
+    indptr = [0]
+    indices = []
+    for task_deps in deps:
+        indices.extend(d for d in task_deps if type(d) is int)
+        indptr.append(len(indices))
+    found = find_cycles(indptr, indices)
+    if found:
+        raise DependencyCycleError([[qualified_names[i] for i in cycle] for cycle, _ in found],
+                                   [[qualified_names[i] for i in members] for _, members in found])
+
+
+class _CompiledTemplate:
+    """
+    Plantilla compilada una sola vez: tareas indexadas localmente (un nombre repetido
+    se queda con la última definición, como hacía el mapping por nombre), aristas
+    internas como índices locales y referencias externas como (nombre, clase).
+    Los ciclos entre tareas de la plantilla se detectan aquí, antes de expandir
+    ningún cliente (las referencias externas solo apuntan a plantillas previas,
+    milestones o globales, así que no pueden cerrar ciclos).
+    last: índice local de la tarea de la última entrada de la plantilla (la que
+    resuelve una dependencia sobre la plantilla, también con nombres repetidos).
+    """
+    __slots__ = ("names", "fields", "deps", "local_only", "last")
+
+    def __init__(self, template_name, template_tasks, symbols):
+        local = {}
+        for tdef in template_tasks:
+            local[tdef["name"]] = tdef
+        self.names = list(local)
+        position = {name: i for i, name in enumerate(self.names)}
+        self.last = position[template_tasks[-1]["name"]] if template_tasks else -1
+        # campos de Task que no dependen del cliente (el nombre es cliente::plantilla::tarea)
+        self.fields = [
+            (
+                template_name,
+                raw_name,
+                tdef["duration"],
+                tdef["type"],
+                tdef.get("server"),
+                tdef.get("start_after", 0),
+                tdef.get("priority", 999)
+            )
+            for raw_name, tdef in local.items()
+        ]
+
+        self.deps = [[] for _ in self.names]
+        for tdef in template_tasks:
+            out = self.deps[position[tdef["name"]]]
+            for dep in tdef.get("dependencies", []):
+                if dep in position:
+                    out.append(position[dep])
+                else:
+                    out.append((dep, symbols.kind(dep)))
+        self.local_only = [all(type(dep) is int for dep in deps) for deps in self.deps]
+        _check_local_cycles([f"{template_name}::{name}" for name in self.names], self.deps)
+
+
+class _ClientPlan:
+    """
+    Expansión de un processes_order concreto: campos de cada tarea y dependencias
+    como enteros (>= 0: índice dentro del cliente, < 0: ~k en `externals`, que son
+    milestones o tareas globales compartidas por todos los clientes).
+    """
+    __slots__ = ("fields", "deps", "externals", "_columns")
+
+    def __init__(self):
+        self.fields = []
+        self.deps = []
+        self.externals = []
+        self._columns = None
+
+    def columns(self, types, servers, templates, task_names, global_index):
+        """
+        Columnas NumPy del plan para build_task_table (se calculan una vez por plan);
+        los códigos se internan en las listas types, servers, templates y task_names.
+        dep_target es el índice relativo al cliente, o el índice absoluto de la fila
+        global cuando dep_external es True.
+        """
+        if self._columns is None:
+            cols = _PlanColumns()
+            template, raw_name, duration, task_type, server, start_after, priority = zip(*self.fields)
+            cols.template_code = np.array(intern_codes(template, templates), dtype=np.int32)
+            cols.task_code = np.array(intern_codes(raw_name, task_names), dtype=np.int32)
+            cols.duration = np.array(duration, dtype=np.float64)
+            cols.start_after = np.array([v or 0.0 for v in start_after], dtype=np.float64)
+            cols.priority = np.array(priority)
+            cols.type_code = np.array(intern_codes(task_type, types), dtype=np.int32)
+            cols.server_code = np.array(intern_codes(server, servers, none_code=-1), dtype=np.int32)
+            cols.dep_count = np.array([len(d) for d in self.deps], dtype=np.int64)
+            flat = np.array([j for d in self.deps for j in d], dtype=np.int64)
+            cols.dep_external = flat < 0
+            external_rows = np.array([global_index[id(t)] for t in self.externals] or [0], dtype=np.int64)
+            cols.dep_target = np.where(cols.dep_external, external_rows[np.where(cols.dep_external, ~flat, 0)], flat)
+            self._columns = cols
+        return self._columns
+
+
+class _PlanColumns:
+    # columnas de un _ClientPlan (ver _ClientPlan.columns)
+    __slots__ = ("template_code", "task_code", "duration", "start_after", "priority", "type_code", "server_code",
+                 "dep_count", "dep_external", "dep_target")
+
+
+def _compile_plan(order, client_name, process_templates, compiled_templates, symbols):
+    plan = _ClientPlan()
+    external_index = {}
+    overall = {}          # raw name -> índice (tareas de plantillas previas del cliente)
+    template_last = {}    # plantilla -> índice de su última tarea en este cliente
+
+    def external(task):
+        k = external_index.get(id(task))
+        if k is None:
+            k = len(plan.externals)
+            external_index[id(task)] = k
+            plan.externals.append(task)
+        return ~k
+
+    for template_name in order:
+        if template_name not in process_templates:
+            raise ValueError(f"Template '{template_name}' not found for client {client_name}")
+        ct = compiled_templates.get(template_name)
+        if ct is None:
+            ct = _CompiledTemplate(template_name, process_templates[template_name], symbols)
+            compiled_templates[template_name] = ct
+        if not ct.names:
+            raise ValueError(f"Template '{template_name}' has no tasks (client {client_name})")
+
+        base = len(plan.fields)
+        plan.fields.extend(ct.fields)
+
+        for raw_name, task_deps, local_only in zip(ct.names, ct.deps, ct.local_only):
+            if local_only:
+                plan.deps.append([base + dep for dep in task_deps])
+                continue
+            out = []
+            for dep in task_deps:
+                if type(dep) is int:
+                    out.append(base + dep)
+                    continue
+                dep, kind = dep
+                if dep in overall:
+                    out.append(overall[dep])
+                elif kind == DEP_MILESTONE:
+                    out.append(external(symbols.task(dep)))
+                elif kind == DEP_GLOBAL_TEMPLATE:
+                    # prefer client-side: if client already has that template built, use client's last
+                    if dep in template_last:
+                        out.append(template_last[dep])
+                    else:
+                        out.append(external(symbols.task(dep)))
+                elif kind == DEP_CLIENT_TEMPLATE:
+                    if dep in template_last:
+                        out.append(template_last[dep])
+                    else:
+                        raise ValueError(f"Dependency on template '{dep}' cannot be resolved for client {client_name}")
+                elif kind == DEP_GLOBAL_TASK:
+                    out.append(external(symbols.task(dep)))
+                else:
+                    raise ValueError(f"Dependencia '{dep}' no resuelta para tarea "
+                                     f"{client_name}::{template_name}::{raw_name} (cliente {client_name})")
+            plan.deps.append(out)
+
+        for k, raw_name in enumerate(ct.names):
+            overall[raw_name] = base + k
+        template_last[template_name] = base + ct.last
+
+    return plan
+
+
+def build_processes(config, instrumentation=None):
     """
     Construye tareas y procesos (clientes + global) a partir del YAML.
     - Las tareas generadas tienen nombre único implícito: para clientes se usan prefijos
       "ClientName::Template::TaskName" y para globals "Global::GName::TaskName" (si plantilla)
       o "Global::TaskName" (si simple).
     - Devuelve: processes (lista de Process), mappings útiles (global_last_task_map).
+    - instrumentation: ver src/instrumentation.py (opcional).
     """
+    instr = instrumentation or NULL
+    with instr.phase("expand"):
+        global_tasks, _, global_last_task_map, client_plans = _expand(config, instr)
+
+    # Instanciar cada cliente a partir de su plan: solo se crean los Task y se
+    # traducen las aristas enteras (offset dentro del cliente o tarea global compartida).
+    processes = []
+    with instr.phase("instantiate_tasks", clients=len(client_plans)):
+        for client_name, plan in client_plans:
+            client_tasks = [
+                Task(f"{client_name}::{template}::{raw_name}", duration, task_type, client_name, server,
+                     None, start_after, priority)
+                for (template, raw_name, duration, task_type, server, start_after, priority) in plan.fields
+            ]
+            externals = plan.externals
+            for t, deps in zip(client_tasks, plan.deps):
+                if deps:
+                    t.dependencies = [client_tasks[j] if j >= 0 else externals[~j] for j in deps]
+
+            processes.append(Process(client_name, client_tasks))
+
+    # Proceso global con milestones + global_tasks expandidos
+    processes.append(Process("Global", global_tasks))
 
+    return processes, global_last_task_map
+
+
+def build_task_table(config, instrumentation=None):
+    """
+    Igual que build_processes pero produce directamente una TaskTable (sin crear un
+    Task por tarea de cliente). Las filas siguen el mismo orden que las tareas de
+    build_processes: clientes en orden y al final milestones + globales.
+    Los nombres no se componen: cada fila guarda códigos de cliente, plantilla y
+    tarea (ver models.TaskNames) y el texto se genera al mostrar o exportar.
+    """
+    instr = instrumentation or NULL
+    with instr.phase("expand"):
+        global_tasks, global_names, _, client_plans = _expand(config, instr)
+    with instr.phase("build_columns", clients=len(client_plans)):
+        return _table_from_plans(global_tasks, global_names, client_plans)
+
+
+def _table_from_plans(global_tasks, global_names, client_plans):
+    n_client_tasks = sum(len(plan.fields) for _, plan in client_plans)
+    global_index = {id(t): n_client_tasks + k for k, t in enumerate(global_tasks)}
+    types, clients, servers = [], [], []
+    templates, task_names = [], []
+    client_index = {}
+
+    # (duration, start_after, priority, type_code, server_code, client_code,
+    #  scope_code, template_code, task_code, dep_count, dep_indices)
+    blocks = []
+    base = 0
+    for client_name, plan in client_plans:
+        if not plan.fields:
+            continue
+        cols = plan.columns(types, servers, templates, task_names, global_index)
+        n = len(plan.fields)
+        client_code = client_index.get(client_name)
+        if client_code is None:
+            client_code = client_index[client_name] = len(clients)
+            clients.append(client_name)
+        client_column = np.full(n, client_code, dtype=np.int32)
+        blocks.append((
+            cols.duration, cols.start_after, cols.priority, cols.type_code, cols.server_code,
+            client_column, client_column, cols.template_code, cols.task_code, cols.dep_count,
+            np.where(cols.dep_external, cols.dep_target, cols.dep_target + base),
+        ))
+        base += n
+
+    # milestones y globales: pocas tareas, se leen de los Task ya creados
+    dep_count = []
+    dep_indices = []
+    for t in global_tasks:
+        dep_count.append(len(t.dependencies))
+        dep_indices.extend(global_index[id(d)] for d in t.dependencies)
+    scope, template, raw_name = zip(*global_names) if global_names else ((), (), ())
+    blocks.append((
+        np.array([t.duration for t in global_tasks], dtype=np.float64),
+        np.array([t.start_after or 0.0 for t in global_tasks], dtype=np.float64),
+        np.array([t.priority for t in global_tasks]),
+        np.array(intern_codes((t.task_type for t in global_tasks), types), dtype=np.int32),
+        np.array(intern_codes((t.server for t in global_tasks), servers, none_code=-1), dtype=np.int32),
+        np.array(intern_codes((t.client for t in global_tasks), clients), dtype=np.int32),
+        np.array(intern_codes(scope, clients, none_code=-1), dtype=np.int32),
+        np.array(intern_codes(template, templates, none_code=-1), dtype=np.int32),
+        np.array(intern_codes(raw_name, task_names), dtype=np.int32),
+        np.array(dep_count, dtype=np.int64),
+        np.array(dep_indices, dtype=np.int64),
+    ))
+
+    # los bloques vacíos se descartan para no alterar el dtype de priority al concatenar
+    blocks = [b for b in blocks if len(b[0])] or blocks[-1:]
+    columns = [np.concatenate(col) for col in zip(*blocks)]
+    (duration, start_after, priority, type_code, server_code, client_code,
+     scope_code, template_code, task_code, dep_count, dep_indices) = columns
+    dep_indptr = np.zeros(len(duration) + 1, dtype=np.int64)
+    np.cumsum(dep_count, out=dep_indptr[1:])
+
+    # el ámbito de los nombres es el cliente: comparten lista de símbolos
+    names = TaskNames(scope_code, template_code, task_code, clients, templates, task_names)
+    table = TaskTable(
+        names=names, duration=duration, start_after=start_after, priority=priority,
+        type_code=type_code, client_code=client_code, server_code=server_code,
+        dep_indptr=dep_indptr, dep_indices=dep_indices,
+        types=types, clients=clients, servers=servers,
+    )
+    # las plantillas se comprobaron al compilarlas y las referencias externas solo
+    # apuntan hacia atrás (plantillas previas, milestones, globales): no hay ciclos
+    mark_acyclic(table)
+    return table
+
+
+def _expand(config, instr=NULL):
+    """
+    Expande milestones y global_tasks (como Task) y compila el plan de cada cliente.
+    Devuelve (global_tasks, global_names, global_last_task_map, [(client_name, plan), ...]);
+    global_names tiene las partes (ámbito, plantilla, tarea) del nombre de cada global
+    (None = sin esa parte), para construir TaskNames sin volver a partir el str.
+    """
     process_templates = config.get("process_templates", {})
     clients_cfg = config.get("clients", [])
     milestones_cfg = config.get("milestones", [])
@@ -26,6 +368,7 @@ def build_processes(config):
     # 1) Crear milestones (Task with duration 0)
     milestones_map = {}
     milestone_tasks = []
+    milestone_names = []
     for m in milestones_cfg:
         m_name = m["name"]
         start_after = m.get("start_after", 0)
@@ -39,9 +382,11 @@ def build_processes(config):
         )
         milestones_map[m_name] = t
         milestone_tasks.append(t)
+        milestone_names.append((None, None, m_name))
 
     # 2) Expandir global_tasks. Guardar "último nodo" por template o por nombre.
     global_tasks_expanded = []
+    global_names = []
     # keys of global_last_task_map:
     #  - ('template', template_name) -> Task (last of that expanded template as Global)
     #  - ('name', global_task_name) -> Task (for simple global tasks)
@@ -56,6 +401,7 @@ def build_processes(config):
             expanded = []
             for tdef in template_tasks:
                 fq_name = f"Global::{gdef.get('name',template_name)}::{tdef['name']}"
+                global_names.append(("Global", gdef.get('name', template_name), tdef['name']))
                 t = Task(
                     name=fq_name,
                     duration=tdef["duration"],
@@ -67,20 +413,19 @@ def build_processes(config):
                 )
                 mapping[tdef["name"]] = t
                 expanded.append(t)
-            # Resolver dependencias internas de la plantilla (local names)
+            # Resolver dependencias internas de la plantilla (local names); fuera de la
+            # plantilla solo se admiten milestones (el resto se ignora)
             for tdef in template_tasks:
                 t = mapping[tdef["name"]]
                 for dep in tdef.get("dependencies", []):
-                    # dep can be local task name or milestone name or (rare) template name - handle milestones
                     if dep in mapping:
                         t.dependencies.append(mapping[dep])
                     elif dep in milestones_map:
                         t.dependencies.append(milestones_map[dep])
-                    else:
-                        # Could be reference to some global milestone or will be resolved later
-                        # We'll attempt to resolve by name from milestones_map
-                        if dep in milestones_map:
-                            t.dependencies.append(milestones_map[dep])
+            local = list(mapping.values())
+            position = {id(t): i for i, t in enumerate(local)}
+            _check_local_cycles([t.name for t in local],
+                                [[position[id(d)] for d in t.dependencies if id(d) in position] for t in local])
             # last task of this global template:
             last = expanded[-1]
             global_last_task_map[("template", template_name)] = last
@@ -104,96 +449,30 @@ def build_processes(config):
                 priority=gdef.get("priority", 999)
             )
             global_tasks_expanded.append(t)
+            global_names.append(("Global", None, gdef['name']))
             global_last_task_map[("name", gdef["name"])] = t
 
-    # 3) Construir procesos por cliente
-    processes = []
-    # Mapa por cliente: cliente -> mapping raw_task_name -> Task (for that client)
-    client_task_maps = {}
-
-    for c in clients_cfg:
-        client_name = c["name"]
-        proc_order = c.get("processes_order", [])
-        client_tasks = []
-        # mapping across all templates of this client (raw name -> Task object)
-        overall_map = {}
-        # keep track of last task of each template for that client
-        client_template_last = {}
-
-        for template_name in proc_order:
-            if template_name not in process_templates:
-                raise ValueError(f"Template '{template_name}' not found for client {client_name}")
-            template_tasks = process_templates[template_name]
-            # local mapping for this template
-            local_map = {}
-            expanded = []
+    # 3) Plan por cliente.
+    #    Cada plantilla se compila una sola vez (índices locales + referencias externas
+    #    ya clasificadas) y cada orden de plantillas distinto se resuelve una sola vez;
+    #    los clientes con el mismo processes_order comparten el plan.
+    symbols = _SymbolTable(process_templates, milestones_map, global_last_task_map)
+    compiled_templates = {}
+    plans = {}
+    client_plans = []
 
-            for tdef in template_tasks:
-                fq_name = f"{client_name}::{template_name}::{tdef['name']}"
-                t = Task(
-                    name=fq_name,
-                    duration=tdef["duration"],
-                    task_type=tdef["type"],
-                    client=client_name,
-                    server=tdef.get("server"),
-                    start_after=tdef.get("start_after", 0),
-                    priority=tdef.get("priority", 999)
-                )
-                local_map[tdef["name"]] = t
-                expanded.append(t)
+    with instr.phase("resolve_dependencies", clients=len(clients_cfg)):
+        for c in clients_cfg:
+            client_name = c["name"]
+            order = tuple(c.get("processes_order", []))
+            plan = plans.get(order)
+            if plan is None:
+                plan = _compile_plan(order, client_name, process_templates, compiled_templates, symbols)
+                plans[order] = plan
+            client_plans.append((client_name, plan))
+    instr.count("expand.clients", len(clients_cfg))
+    instr.count("expand.distinct_plans", len(plans))
+    instr.count("expand.compiled_templates", len(compiled_templates))
 
-            # Resolver dependencias internas / milestones / template-deps / global template last
-            for tdef in template_tasks:
-                t = local_map[tdef["name"]]
-                for dep in tdef.get("dependencies", []):
-                    # 1) dep is a local task in same template
-                    if dep in local_map:
-                        t.dependencies.append(local_map[dep])
-                    # 2) dep is in overall_map (task from previous templates of same client)
-                    elif dep in overall_map:
-                        t.dependencies.append(overall_map[dep])
-                    # 3) dep is a milestone
-                    elif dep in milestones_map:
-                        t.dependencies.append(milestones_map[dep])
-                    # 4) dep is a template name -> depends on last task of that template for this client if exists
-                    elif ("template", dep) in global_last_task_map:
-                        # there exists a global template with this name; but client dependency likely to refer to client's own template
-                        # prefer client-side: if client already has that template built, use client's last
-                        if dep in client_template_last:
-                            t.dependencies.append(client_template_last[dep])
-                        else:
-                            # fallback to global template last
-                            t.dependencies.append(global_last_task_map[("template", dep)])
-                    elif dep in process_templates:
-                        # depends on another template in the same client (if already built)
-                        if dep in client_template_last:
-                            t.dependencies.append(client_template_last[dep])
-                        else:
-                            # If not yet present in client, attempt to use global template last if exists
-                            if ("template", dep) in global_last_task_map:
-                                t.dependencies.append(global_last_task_map[("template", dep)])
-                            else:
-                                raise ValueError(f"Dependency on template '{dep}' cannot be resolved for client {client_name}")
-                    # 5) dep could be a global simple task name
-                    elif ("name", dep) in global_last_task_map:
-                        t.dependencies.append(global_last_task_map[("name", dep)])
-                    else:
-                        raise ValueError(f"Dependencia '{dep}' no resuelta para tarea {t.name} (cliente {client_name})")
-
-            # Append expanded tasks and update maps
-            for raw_name, task_obj in local_map.items():
-                overall_map[raw_name] = task_obj
-                client_tasks.append(task_obj)
-
-            # last task of this template for client
-            client_template_last[template_name] = expanded[-1]
-
-        processes.append(Process(client_name, client_tasks))
-        client_task_maps[client_name] = overall_map
-
-    # 4) Ahora que tenemos client_template_last info implicitly (we constructed above),
-    #    some client tasks might have depended on templates that are global: already handled.
-    # 5) Formar el proceso global que contiene milestones + global_tasks_expanded
-    processes.append(Process("Global", milestone_tasks + global_tasks_expanded))
-
-    return processes, global_last_task_map
+    return (milestone_tasks + global_tasks_expanded, milestone_names + global_names,
+            global_last_task_map, client_plans)
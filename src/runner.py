@@ -0,0 +1,206 @@
+# runner.py
+# Ejecución de cálculos largos (el scheduler) en segundo plano para las páginas de
+# Streamlit: cada cálculo corre en un hilo, publica su progreso y las filas ya
+# programadas, y se puede cancelar. Los cálculos se identifican por una clave
+# (el hash de config + recursos): pedir dos veces la misma clave devuelve el
+# cálculo en curso, y cuando una sesión pide otra clave (la config cambió) su
+# cálculo anterior se cancela si nadie más lo está esperando.
+#
+#   runner = Runner()
+#   run = runner.submit(key, job, owner=session_id)   # job(run) -> resultado
+#   run.fraction, run.snapshot(), run.state; run.cancel()
+#
+# Se usan hilos y no procesos: el resultado (una TaskTable) y las filas parciales
+# se leen sin copiarlas entre procesos. El hilo comparte el GIL con el servidor de
+# Streamlit, pero el bucle del scheduler lo suelta a menudo y la página sigue
+# respondiendo; lo que se evita es bloquear la ejecución del script.
+import threading
+import time
+from collections import OrderedDict
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = "pending", "running", "done", "cancelled", "failed"
+# cálculos terminados que se conservan para las sesiones que vuelvan a por ellos
+KEEP_FINISHED = 8
+
+
+class RunCancelled(Exception):
+    """Lanzada dentro del job (Run.check / Run.track) cuando se ha pedido cancelar."""
+
+
+class Run:
+    """
+    Un cálculo en segundo plano. job(run) se ejecuta en un hilo propio y puede
+    informar del progreso con run.track(iterable, total) o run.progress(done, total);
+    ambos lanzan RunCancelled en cuanto se cancela. state pasa de "pending" a
+    "running" y termina en "done" (result), "cancelled" o "failed" (error).
+    """
+
+    def __init__(self, key, job):
+        self.key = key
+        self.job = job
+        self.state = PENDING
+        self.done = 0
+        self.total = None
+        self.items = []   # lo producido por track(), en orden
+        self.result = None
+        self.error = None
+        self.owners = set()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+        self._items_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._main, name=f"run-{key[:12]}", daemon=True)
+
+    # ------------------------------------------------------------------
+    # Lado del job
+    # ------------------------------------------------------------------
+    def check(self):
+        if self._cancel.is_set():
+            raise RunCancelled(self.key)
+
+    def progress(self, done, total=None):
+        self.check()
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def track(self, iterable, total=None):
+        """Recorre iterable guardando cada elemento en items y contando el progreso."""
+        if total is not None:
+            self.total = total
+        items = self.items
+        lock = self._items_lock
+        for item in iterable:
+            self.check()
+            with lock:
+                items.append(item)
+                self.done += 1
+            yield item
+
+    def _main(self):
+        self.state = RUNNING
+        try:
+            self.result = self.job(self)
+            self.state = DONE
+        except RunCancelled:
+            self.state = CANCELLED
+        except Exception as e:
+            self.error = e
+            self.state = FAILED
+        finally:
+            self.finished = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Lado de la página
+    # ------------------------------------------------------------------
+    def snapshot(self):
+        """Copia de items (lo producido hasta ahora) tomada sin que el job la modifique."""
+        with self._items_lock:
+            return list(self.items)
+
+    def start(self):
+        self.started = time.monotonic()
+        self._thread.start()
+
+    def cancel(self):
+        """Pide cancelar; el job se detiene en su siguiente check/progress/track."""
+        self._cancel.set()
+
+    @property
+    def cancelling(self):
+        return self._cancel.is_set() and self.active
+
+    @property
+    def active(self):
+        return self.state in (PENDING, RUNNING)
+
+    @property
+    def fraction(self):
+        """Progreso en [0, 1], o None si el job no ha dicho el total."""
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def wait(self, timeout=None):
+        """Espera a que termine; devuelve True si terminó."""
+        if self.started is not None:
+            self._thread.join(timeout)
+        return not self.active
+
+    def __repr__(self):
+        return f"Run({self.key[:12]}, {self.state}, {self.done}/{self.total})"
+
+
+class Runner:
+    """
+    Registro de cálculos por clave, compartido entre sesiones (en Streamlit, con
+    st.cache_resource). owner identifica a quien espera el resultado (la sesión):
+    cada owner espera a lo sumo un cálculo, y uno sin owners se cancela.
+    Los cancelados o fallidos no se reutilizan: volver a pedirlos los relanza.
+    """
+
+    def __init__(self, keep=KEEP_FINISHED):
+        self.keep = keep
+        self._runs = OrderedDict()
+        self._owned = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, job, owner=None):
+        """Cálculo de `key`: el que ya está en curso o terminado bien, o uno nuevo con job."""
+        with self._lock:
+            run = self._runs.get(key)
+            if run is None or run.state in (CANCELLED, FAILED) or run.cancelling:
+                run = Run(key, job)
+                self._runs[key] = run
+                run.start()
+            self._runs.move_to_end(key)
+            if owner is not None:
+                self._attach(owner, run)
+            self._trim()
+            return run
+
+    def get(self, key):
+        with self._lock:
+            return self._runs.get(key)
+
+    def cancel(self, key):
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None:
+                run.cancel()
+                for owner in run.owners:
+                    self._owned.pop(owner, None)
+                run.owners.clear()
+            return run
+
+    def release(self, owner):
+        """owner deja de esperar su cálculo (se cancela si nadie más lo espera)."""
+        with self._lock:
+            self._detach(owner)
+
+    def _attach(self, owner, run):
+        if self._owned.get(owner) is run:
+            return
+        self._detach(owner)
+        run.owners.add(owner)
+        self._owned[owner] = run
+
+    def _detach(self, owner):
+        previous = self._owned.pop(owner, None)
+        if previous is None:
+            return
+        previous.owners.discard(owner)
+        if not previous.owners and previous.active:
+            previous.cancel()
+
+    def _trim(self):
+        # se olvidan los terminados más antiguos; los activos o con owners, nunca
+        finished = [key for key, run in self._runs.items() if not run.active and not run.owners]
+        for key in finished[:max(0, len(finished) - self.keep)]:
+            del self._runs[key]
@@ -1,53 +1,366 @@
 # scheduler.py
-from src.models import Person
+import heapq
+import itertools
+from collections import deque
+
+import numpy as np
+from src.analysis import check_acyclic
+from src.models import Person, TaskTable, TaskView
+from src.instrumentation import NULL
+from src.timeline import ResourceTimeline
 from datetime import datetime, timedelta
 
+# Motores disponibles: "greedy" es el bucle original (rescanea todas las tareas
+# pendientes en cada iteración), "heap" es el motor por eventos con colas de prioridad
+# y "backfill" coloca cada tarea en el primer hueco libre de un calendario por
+# recurso (src/timeline.py), sin mover las ya colocadas.
+ENGINES = ("greedy", "heap", "backfill")
+
+# tolerancia usada para considerar que dos tareas pueden empezar "a la vez"
+TIE_EPS = 1e-9
+
+
+class _ReadyQueue:
+    """
+    Ready tasks competing for the same resource (the people pool, one server, or
+    no resource at all).
+
+    Every task in the queue starts at max(earliest, available). Tasks whose earliest
+    is already <= available all start at `available`, so they only differ by score:
+    they live in `released`, keyed by (score, idx). The rest wait in `pending`
+    groups (one heap of (score, idx) per distinct earliest value, plus a heap of
+    those values in `times`) until the resource availability catches up.
+    """
+    __slots__ = ("available", "times", "pending", "released")
+
+    def __init__(self, available):
+        self.available = available
+        self.times = []
+        self.pending = {}
+        self.released = []
+
+    def push(self, earliest, score, idx):
+        if earliest <= self.available:
+            heapq.heappush(self.released, (score, idx))
+            return
+        group = self.pending.get(earliest)
+        if group is None:
+            group = self.pending[earliest] = []
+            heapq.heappush(self.times, earliest)
+        heapq.heappush(group, (score, idx))
+
+    def advance(self, available):
+        # la disponibilidad de un recurso nunca retrocede
+        self.available = available
+        times = self.times
+        while times and times[0] <= available:
+            for entry in self.pending.pop(heapq.heappop(times), ()):
+                heapq.heappush(self.released, entry)
+
+    def min_start(self):
+        if self.released:
+            return self.available
+        if self.times:
+            return self.times[0]
+        return None
+
+    def best_within(self, min_start, best):
+        """
+        Mejor (score, idx) de la cola entre las tareas que empiezan a menos de TIE_EPS
+        de min_start, si mejora `best`. Devuelve (best, earliest) donde earliest es el
+        grupo pendiente del que sale, o None si sale de `released` (o no mejora).
+        """
+        origin = None
+        if self.released and self.available - min_start < TIE_EPS:
+            if best is None or self.released[0] < best:
+                best = self.released[0]
+        times = self.times
+        if times and times[0] - min_start < TIE_EPS:
+            window = []
+            while times and times[0] - min_start < TIE_EPS:
+                earliest = heapq.heappop(times)
+                group = self.pending.get(earliest)
+                if not group or (window and window[-1] == earliest):
+                    continue
+                window.append(earliest)
+                top = group[0]
+                if best is None or top < best:
+                    best, origin = top, earliest
+            for earliest in window:
+                heapq.heappush(times, earliest)
+        return best, origin
+
+    def stats(self, min_start):
+        """(tareas en la cola, tareas empatadas en min_start); solo para instrumentación."""
+        size = len(self.released)
+        ties = size if size and self.available - min_start < TIE_EPS else 0
+        for earliest, group in self.pending.items():
+            size += len(group)
+            if earliest - min_start < TIE_EPS:
+                ties += len(group)
+        return size, ties
+
+    def take(self, entry, origin):
+        """Saca de la cola la entrada elegida (ver best_within)."""
+        if origin is None:
+            heapq.heappop(self.released)
+            return
+        group = self.pending[origin]
+        heapq.heappop(group)
+        if not group:
+            # el valor queda en `times` y se descarta al salir; la cima nunca es obsoleta
+            del self.pending[origin]
+            times = self.times
+            while times and times[0] not in self.pending:
+                heapq.heappop(times)
+
+
 class Scheduler:
-    def __init__(self, people, servers, start_day=None):
+    def __init__(self, people, servers, start_day=None, engine="heap", instrumentation=None,
+                 calendars=None, work_calendar=None):
         """
         people: list of Person objects
         servers: dict {server_name: available_from_hours} (float)
         start_day: datetime for start reference
+        engine: "heap" (event-driven, O(n log n)) or "greedy" (original rescanning loop).
+                Both apply the same rule and return the same schedule.
+                "backfill" keeps a calendar of free gaps per resource and places each
+                task in the earliest gap where it fits, so idle time left before a
+                late task can still be used by later ones.
+        instrumentation: optional Instrumentation (phases, steps, ready-set sizes and
+                         ties per step; see src/instrumentation.py)
+        calendars: optional dict {person_or_server_name: [(start_h, end_h), ...]} of
+                   blocked intervals (only with engine="backfill")
+        work_calendar: optional WorkCalendar (src/work_calendar.py). Durations are then
+                       working hours: the engine runs on a working-time axis and the
+                       results (start/end, resource availability) are converted back to
+                       wall-clock hours from start_day. Not available with "greedy".
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Engine '{engine}' no soportado (opciones: {', '.join(ENGINES)})")
+        if calendars and engine != "backfill":
+            raise ValueError("Los calendarios de recursos requieren engine='backfill'")
+        if work_calendar is not None:
+            if engine == "greedy":
+                raise ValueError("El calendario laboral requiere engine='heap' o 'backfill'")
+            if start_day is not None and start_day != work_calendar.start_day:
+                raise ValueError(f"El calendario laboral empieza en {work_calendar.start_day} "
+                                 f"y el plan en {start_day}")
+            start_day = work_calendar.start_day
         self.people = people
         self.servers = dict(servers)  # copia
         self.start_day = start_day or datetime(2025,1,1,8,0)
+        self.work_calendar = work_calendar
+        self.engine = engine
+        self.instrumentation = instrumentation or NULL
+        self.calendars = {name: [tuple(interval) for interval in intervals]
+                          for name, intervals in (calendars or {}).items()}
 
     def schedule(self, processes):
         """
         processes: list of Process objects (each with Task instances already with dependencies linking)
-        Returns: list of all tasks scheduled (in the order scheduled)
+                   or a TaskTable (see build_task_table)
+        Returns: list of all tasks scheduled (in the order scheduled). For a TaskTable
+                 the items are TaskView rows of the table.
+        """
+        instr = self.instrumentation
+        if isinstance(processes, TaskTable):
+            if self.engine != "greedy":
+                return self.schedule_table(processes).scheduled()
+            with instr.phase("schedule", engine="greedy", tasks=len(processes)):
+                scheduled = self._schedule_greedy(list(processes))
+            processes.order = np.array([t.index for t in scheduled], dtype=np.int64)
+            return scheduled
+
+        all_tasks = self._collect_tasks(processes)
+
+        if self.engine == "greedy":
+            with instr.phase("schedule", engine="greedy", tasks=len(all_tasks)):
+                return self._schedule_greedy(all_tasks)
+
+        # motores sobre columnas: se ejecutan sobre la tabla y se copian los resultados a los Task
+        with instr.phase("from_processes", tasks=len(all_tasks)):
+            table = TaskTable.from_processes(processes)
+        self.schedule_table(table)
+        resources = table.resources
+        for t, code, start, end in zip(all_tasks, table.assigned.tolist(),
+                                       table.start_time.tolist(), table.end_time.tolist()):
+            t.assigned_to = resources[code]
+            t.start_time = start
+            t.end_time = end
+        return [all_tasks[i] for i in table.order.tolist()]
+
+    def iter_schedule(self, processes):
         """
-        # collect all tasks
+        Generador equivalente a schedule(processes): produce cada tarea en cuanto su
+        inicio, fin y recurso quedan fijados, en el mismo orden que schedule.
+        Con un TaskTable produce TaskView (los resultados se escriben en la tabla a
+        medida que avanzan); con una lista de Process, los Task originales.
+        Al agotarse deja la tabla/tareas y los recursos igual que schedule. Si se
+        abandona antes, el estado queda a medias.
+        """
+        if isinstance(processes, TaskTable):
+            table = processes
+            all_tasks = None
+        else:
+            all_tasks = self._collect_tasks(processes)
+            if self.engine != "greedy":
+                table = TaskTable.from_processes(processes)
+
+        if self.engine == "greedy":
+            if all_tasks is not None:
+                yield from self._iter_greedy(all_tasks)
+                return
+            order = []
+            for t in self._iter_greedy(list(table)):
+                order.append(t.index)
+                yield t
+            table.order = np.array(order, dtype=np.int64)
+            return
+
+        run = self._table_run(table)
+        run.start()
+        if all_tasks is None:
+            yield from self._iter_table_run(run, table)
+            return
+        resources = run.resources
+        assigned = run.assigned
+        for i in run.steps():
+            t = all_tasks[i]
+            t.assigned_to = resources[assigned[i]]
+            t.start_time, t.end_time = run.wall_times(i)
+            yield t
+        run.finish()
+
+    @staticmethod
+    def _iter_table_run(run, table):
+        # filas de una ejecución ya preparada (start o resume) como TaskView: primero
+        # las ya decididas (prefijo de resume) y después según se programan
+        n = len(table)
+        assigned = run.assigned
+        table.resources = run.resources
+        table.resource_start = run.initial
+        table.start_time = np.full(n, np.nan)
+        table.end_time = np.full(n, np.nan)
+        table.assigned = np.full(n, -1, dtype=np.int32)
+        table.order = None
+        for i in itertools.chain(list(run.order), run.steps()):
+            table.start_time[i], table.end_time[i] = run.wall_times(i)
+            table.assigned[i] = assigned[i]
+            yield TaskView(table, i)
+        run.finish()
+
+    # ------------------------------------------------------------------
+    # Reglas comunes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _collect_tasks(processes):
+        # all tasks (sin duplicados, respetando el orden de los procesos)
         all_tasks = []
+        seen = set()
         for p in processes:
-            all_tasks.extend(p.tasks)
+            for t in p.tasks:
+                if id(t) not in seen:
+                    seen.add(id(t))
+                    all_tasks.append(t)
+        return all_tasks
 
-        # helper: set of scheduled tasks
-        scheduled = []
-        remaining = set(all_tasks)
+    @staticmethod
+    def _task_graph(all_tasks):
+        """
+        Dependencias de cada tarea como índices en all_tasks (len(all_tasks) = tarea
+        ajena, nunca programada) y número de dependientes de cada una (para la
+        prioridad). Las tareas se hashean una sola vez, aquí; el motor trabaja con enteros.
+        """
+        n = len(all_tasks)
+        if all_tasks and isinstance(all_tasks[0], TaskView):
+            # filas de una tabla: las dependencias ya son índices (CSR)
+            table = all_tasks[0].table
+            rows = [t.index for t in all_tasks]
+            position = {row: i for i, row in enumerate(rows)}
+            deps = [[position.get(j, n) for j in table.dependencies_of(row)] for row in rows]
+        else:
+            position = {id(t): i for i, t in enumerate(all_tasks)}
+            deps = [[position.get(id(d), n) for d in t.dependencies] for t in all_tasks]
+        dependents = [0] * (n + 1)
+        for task_deps in deps:
+            for j in task_deps:
+                dependents[j] += 1
+        return deps, dependents[:n]
 
-        # helper to count dependents (for priority impact)
-        def compute_dependents_count():
-            cnt = {t: 0 for t in all_tasks}
-            for t in all_tasks:
-                for d in t.dependencies:
-                    cnt[d] = cnt.get(d, 0) + 1
-            return cnt
+    @staticmethod
+    def _earliest(task):
+        # earliest possible start ignoring resource contention
+        deps_end = 0.0
+        if task.dependencies:
+            deps_end = max(dep.end_time for dep in task.dependencies)
+        return max(deps_end, task.start_after or 0.0)
 
-        dependents_count = compute_dependents_count()
+    def _assign(self, task_to_sched):
+        """Fija start/end/assigned_to de la tarea elegida y actualiza el recurso."""
+        start = self._earliest(task_to_sched)
+
+        if task_to_sched.task_type == "manual":
+            # assign to person who becomes available first
+            person = min(self.people, key=lambda p: p.available_from)
+            start = max(start, person.available_from)
+            task_to_sched.assigned_to = person.name
+            task_to_sched.start_time = start
+            task_to_sched.end_time = start + task_to_sched.duration
+            person.available_from = task_to_sched.end_time
+        elif task_to_sched.task_type == "automated":
+            if task_to_sched.server:
+                # use the server's availability
+                server_av = self.servers.get(task_to_sched.server, 0.0)
+                start = max(start, server_av)
+                task_to_sched.assigned_to = task_to_sched.server
+                task_to_sched.start_time = start
+                task_to_sched.end_time = start + task_to_sched.duration
+                self.servers[task_to_sched.server] = task_to_sched.end_time
+            else:
+                # no dedicated server -> can run in parallel, no resource blocking
+                task_to_sched.assigned_to = "System"
+                task_to_sched.start_time = start
+                task_to_sched.end_time = start + task_to_sched.duration
+        elif task_to_sched.task_type == "milestone":
+            task_to_sched.assigned_to = "Milestone"
+            task_to_sched.start_time = start
+            task_to_sched.end_time = start  # zero duration
+        else:
+            # default behavior
+            task_to_sched.assigned_to = "Unknown"
+            task_to_sched.start_time = start
+            task_to_sched.end_time = start + task_to_sched.duration
+
+    # ------------------------------------------------------------------
+    # Motor original: rescanea las tareas pendientes en cada iteración
+    # ------------------------------------------------------------------
+    def _schedule_greedy(self, all_tasks):
+        return list(self._iter_greedy(all_tasks))
+
+    def _iter_greedy(self, all_tasks):
+        # los ciclos se detectan antes de empezar (lineal) y no como deadlock tras
+        # muchas iteraciones cuadráticas
+        check_acyclic(all_tasks)
+        # estado por índice en all_tasks: done[n] es el centinela de las dependencias ajenas
+        n = len(all_tasks)
+        deps, dependents_count = self._task_graph(all_tasks)
+        done = [False] * (n + 1)
+        remaining = list(range(n))
+        scheduled = []
+
+        instr = self.instrumentation
+        observe = instr.observe if instr.enabled else None
 
         # main loop
         while remaining:
             # 1) Find tasks whose dependencies are already scheduled (or none).
             ready = []
-            for t in list(remaining):
-                if all(dep in scheduled for dep in t.dependencies):
+            for i in remaining:
+                if all(done[j] for j in deps[i]):
+                    t = all_tasks[i]
                     # this task is "ready" logically; compute earliest possible start ignoring resource contention
-                    deps_end = 0.0
-                    if t.dependencies:
-                        deps_end = max(dep.end_time for dep in t.dependencies)
-                    earliest = max(deps_end, t.start_after or 0.0)
+                    earliest = self._earliest(t)
 
                     # compute earliest resource availability
                     if t.task_type == "manual":
@@ -66,7 +379,7 @@ class Scheduler:
                     else:
                         eff_start = earliest
 
-                    ready.append((t, eff_start))
+                    ready.append((i, eff_start))
 
             if not ready:
                 raise RuntimeError("Deadlock: no hay tareas listas pero quedan tareas por programar (posible ciclo de dependencias)")
@@ -74,56 +387,538 @@ class Scheduler:
             # 2) Choose task to schedule next:
             #    choose minimal eff_start, tie-breaker by score = priority - dependents_count
             min_start = min(s for (_, s) in ready)
-            candidates = [t for (t, s) in ready if abs(s - min_start) < 1e-9]
+            candidates = [i for (i, s) in ready if abs(s - min_start) < TIE_EPS]
+            if observe is not None:
+                observe("scheduler.ready", len(ready))
+                observe("scheduler.ties", len(candidates))
 
-            def score(task):
-                return getattr(task, "priority", 999) - dependents_count.get(task, 0)
+            def score(i):
+                return getattr(all_tasks[i], "priority", 999) - dependents_count[i]
 
-            # choose candidate with minimal score
+            # choose candidate with minimal score (sort estable: empate -> orden de entrada)
             candidates.sort(key=score)
-            task_to_sched = candidates[0]
+            chosen = candidates[0]
+            task_to_sched = all_tasks[chosen]
 
-            # recompute chosen's start and end
-            deps_end = 0.0
-            if task_to_sched.dependencies:
-                deps_end = max(dep.end_time for dep in task_to_sched.dependencies)
-            start = max(deps_end, task_to_sched.start_after or 0.0)
+            self._assign(task_to_sched)
 
-            if task_to_sched.task_type == "manual":
-                # assign to person who becomes available first
-                person = min(self.people, key=lambda p: p.available_from)
-                start = max(start, person.available_from)
-                task_to_sched.assigned_to = person.name
-                task_to_sched.start_time = start
-                task_to_sched.end_time = start + task_to_sched.duration
-                person.available_from = task_to_sched.end_time
-            elif task_to_sched.task_type == "automated":
-                if task_to_sched.server:
-                    # use the server's availability
-                    server_av = self.servers.get(task_to_sched.server, 0.0)
-                    start = max(start, server_av)
-                    task_to_sched.assigned_to = task_to_sched.server
-                    task_to_sched.start_time = start
-                    task_to_sched.end_time = start + task_to_sched.duration
-                    self.servers[task_to_sched.server] = task_to_sched.end_time
+            # record scheduled
+            done[chosen] = True
+            remaining.remove(chosen)
+            scheduled.append(task_to_sched)
+            yield task_to_sched
+        instr.count("scheduler.steps", len(scheduled))
+
+    # ------------------------------------------------------------------
+    # Motor por eventos: colas de prioridad + contadores de dependencias
+    # ------------------------------------------------------------------
+    def _table_run(self, table, keys=None):
+        if self.engine == "backfill":
+            return _BackfillRun(self, table, keys)
+        if keys is not None:
+            raise ValueError("Las claves de orden (keys) requieren engine='backfill'")
+        return _TableRun(self, table)
+
+    def schedule_table(self, table, keys=None):
+        """
+        Programa una TaskTable con el motor por eventos (o con backfill si es el
+        motor elegido). Rellena start_time, end_time, assigned (códigos en
+        table.resources) y order, y devuelve la misma tabla.
+        keys (solo backfill): una clave por fila; las tareas se colocan por clave
+        creciente entre las que tienen sus dependencias colocadas, en lugar de por
+        (earliest, score). Es la forma de probar otros órdenes (src/optimizer.py).
+
+        Same rule as the greedy engine (minimal eff_start, then minimal
+        priority - dependents_count, then row order), but tasks only enter a
+        ready queue when their last dependency is scheduled, and each resource
+        keeps its own queue so the next task is found in O(log n).
+        """
+        instr = self.instrumentation
+        with instr.phase("schedule", engine="backfill" if self.engine == "backfill" else "heap",
+                         tasks=len(table)):
+            with instr.phase("prepare"):
+                run = self._table_run(table, keys)
+                run.start()
+            with instr.phase("run"):
+                run.run()
+            return run.finish()
+
+    def reschedule(self, previous, table):
+        """
+        Reprograma `table` reutilizando el resultado de `previous` (una TaskTable ya
+        programada con los mismos recursos iniciales). Pensado para ediciones locales
+        de la configuración (duración, prioridad o start_after de algunas tareas).
+
+        Las decisiones del motor anteriores al primer punto perturbado no cambian:
+        una tarea editada no influye en nada antes de estar lista (prioridad,
+        start_after) o antes de programarse (duración). Se copia ese prefijo, se
+        reconstruye el estado de colas y recursos en ese punto y se continúa desde
+        ahí. El resultado es idéntico bit a bit al de schedule_table(table).
+        Si cambia la estructura (tareas, dependencias, tipos, servidores o recursos)
+        se hace un cálculo completo, igual que con el motor backfill o con calendario
+        laboral.
+        """
+        instr = self.instrumentation
+        with instr.phase("reschedule", tasks=len(table)):
+            with instr.phase("prepare"):
+                run = self._table_run(table)
+                k = run.perturbed_step(previous)
+                if k is None:
+                    run.start()
                 else:
-                    # no dedicated server -> can run in parallel, no resource blocking
-                    task_to_sched.assigned_to = "System"
-                    task_to_sched.start_time = start
-                    task_to_sched.end_time = start + task_to_sched.duration
-            elif task_to_sched.task_type == "milestone":
-                task_to_sched.assigned_to = "Milestone"
-                task_to_sched.start_time = start
-                task_to_sched.end_time = start  # zero duration
+                    run.resume(previous, k)
+            instr.count("reschedule.reused_steps", k or 0)
+            with instr.phase("run"):
+                run.run()
+            return run.finish()
+
+    def iter_reschedule(self, previous, table):
+        """
+        Generador equivalente a reschedule(previous, table), como iter_schedule lo es
+        de schedule_table: produce TaskView de `table` en el orden final, primero las
+        filas del prefijo reutilizado de `previous` (sin calcularlas) y después las que
+        se van programando. Si cambia la estructura es un iter_schedule completo.
+        Al agotarse la tabla queda igual que con reschedule; si se abandona antes, a medias.
+        """
+        run = self._table_run(table)
+        k = run.perturbed_step(previous)
+        if k is None:
+            run.start()
+        else:
+            run.resume(previous, k)
+        self.instrumentation.count("reschedule.reused_steps", k or 0)
+        yield from self._iter_table_run(run, table)
+
+
+class _TableRun:
+    """
+    Estado de una ejecución del motor por eventos sobre una TaskTable: columnas
+    convertidas a listas de Python (el bucle es escalar), colas por recurso y
+    resultados parciales. Con calendario laboral todo el estado está en horas de
+    trabajo: start_after y las disponibilidades se convierten al empezar y los
+    resultados al terminar (finish), en bloque.
+    """
+
+    def __init__(self, scheduler, table):
+        check_acyclic(table)
+        self.scheduler = scheduler
+        self.table = table
+        n = len(table)
+        people = scheduler.people
+        n_people = len(people)
+        n_servers = len(table.servers)
+        self.n = n
+        self.n_people = n_people
+
+        # recursos: personas (por posición), servidores de la tabla y pseudo-recursos
+        self.resources = [p.name for p in people] + list(table.servers) + ["System", "Milestone", "Unknown"]
+        system = n_people + n_servers
+        milestone_code = system + 1
+        unknown = system + 2
+
+        # cola de cada tarea: 0 = pool de personas, 1 = sin recurso, 2 + s = servidor s
+        manual = table.type_mask("manual")
+        automated = table.type_mask("automated")
+        milestone = table.type_mask("milestone")
+        server_code = table.server_code
+        named_server = np.array([bool(name) for name in table.servers] + [False], dtype=bool)
+        on_server = automated & named_server[server_code]
+        queue_id = np.ones(n, dtype=np.int64)
+        queue_id[manual] = 0
+        queue_id[on_server] = 2 + server_code[on_server]
+        resource = np.full(n, unknown, dtype=np.int64)
+        resource[on_server] = n_people + server_code[on_server]
+        resource[automated & ~on_server] = system
+        resource[milestone] = milestone_code
+        duration = table.duration.copy()
+        duration[milestone] = 0.0   # zero duration
+
+        dependents_count = np.bincount(table.dep_indices, minlength=n)
+        self.scores = (table.priority - dependents_count).tolist()
+
+        self.dep_indptr = table.dep_indptr.tolist()
+        self.dep_indices = table.dep_indices.tolist()
+        succ_indptr, succ_indices = table.dependents()
+        self.succ_indptr = succ_indptr.tolist()
+        self.succ_indices = succ_indices.tolist()
+        self.calendar = calendar = scheduler.work_calendar
+        start_after = table.start_after
+        if calendar is not None:
+            start_after = calendar.to_work(start_after)
+        self.start_after = start_after.tolist()
+        self.duration = duration.tolist()
+        self.queue_id = queue_id.tolist()
+        self.resource = resource.tolist()
+
+        self.initial = (tuple(p.available_from for p in people),
+                        tuple(scheduler.servers.get(name, 0.0) for name in table.servers))
+        self.person_avail = list(self.initial[0])
+        self.server_avail = list(self.initial[1])
+        if calendar is not None:
+            self.person_avail = [calendar.work(avail) for avail in self.person_avail]
+            self.server_avail = [calendar.work(avail) for avail in self.server_avail]
+        self.server_used = [False] * n_servers
+
+        self.earliest = [0.0] * n
+        self.start_time = [0.0] * n
+        self.end_time = [0.0] * n
+        self.assigned = [-1] * n
+        self.order = []
+        self.unmet = None
+        self.queues = None
+
+    def _make_queues(self):
+        person_avail = self.person_avail
+        self.queues = [_ReadyQueue(min(person_avail) if person_avail else float('inf')),
+                       _ReadyQueue(float("-inf"))]
+        self.queues.extend(_ReadyQueue(avail) for avail in self.server_avail)
+
+    def release(self, j):
+        # earliest possible start ignoring resource contention
+        a, b = self.dep_indptr[j], self.dep_indptr[j + 1]
+        end_time = self.end_time
+        deps_end = max([end_time[d] for d in self.dep_indices[a:b]]) if b > a else 0.0
+        self.earliest[j] = max(deps_end, self.start_after[j])
+        self.queues[self.queue_id[j]].push(self.earliest[j], self.scores[j], j)
+
+    def start(self):
+        """Estado inicial: todas las tareas sin dependencias están listas."""
+        self.unmet = np.diff(self.table.dep_indptr).tolist()
+        self._make_queues()
+        for i in range(self.n):
+            if self.unmet[i] == 0:
+                self.release(i)
+
+    def perturbed_step(self, previous):
+        """
+        Primer paso del orden de `previous` cuya decisión puede cambiar con los datos
+        de esta tabla, o None si las tablas no son comparables (cálculo completo).
+        Sin cambios devuelve len(previous).
+        """
+        table = self.table
+        if self.calendar is not None:
+            # previous está en horas de reloj y el estado del motor en horas de trabajo
+            return None
+        if (previous.order is None or len(previous) != len(table)
+                or getattr(previous, "resource_start", None) != self.initial
+                or previous.resources != self.resources
+                or previous.names != table.names
+                or not np.array_equal(previous.dep_indptr, table.dep_indptr)
+                or not np.array_equal(previous.dep_indices, table.dep_indices)
+                or [previous.types[c] for c in previous.type_code.tolist()]
+                != [table.types[c] for c in table.type_code.tolist()]
+                or previous.server_code.tolist() != table.server_code.tolist()):
+            return None
+
+        position = np.empty(self.n, dtype=np.int64)
+        position[previous.order] = np.arange(self.n)
+        # paso en que cada tarea pasa a estar lista (tras su última dependencia)
+        owners = np.repeat(np.arange(self.n), np.diff(table.dep_indptr))
+        ready_step = np.zeros(self.n, dtype=np.int64)
+        np.maximum.at(ready_step, owners, position[table.dep_indices] + 1)
+
+        # la duración solo importa una vez programada la tarea; prioridad y
+        # start_after en cuanto entra en las colas
+        duration_changed = previous.duration != table.duration
+        ready_changed = (previous.priority != table.priority) | (previous.start_after != table.start_after)
+        steps = np.concatenate([position[duration_changed], ready_step[ready_changed], [self.n]])
+        return int(steps.min())
+
+    def resume(self, previous, k):
+        """Estado tras los k primeros pasos de `previous` (idénticos en esta tabla)."""
+        prefix = previous.order[:k]
+        self.order = prefix.tolist()
+        # las filas fuera del prefijo se sobrescriben al programarse
+        self.start_time = previous.start_time.tolist()
+        self.end_time = previous.end_time.tolist()
+        self.assigned = previous.assigned.tolist()
+        end_time = previous.end_time[prefix]
+        assigned = previous.assigned[prefix]
+
+        # disponibilidad de cada recurso = fin de su última tarea en el prefijo
+        n_people = self.n_people
+        n_servers = len(self.server_avail)
+        for code, end in zip(assigned.tolist(), end_time.tolist()):
+            if code < n_people:
+                self.person_avail[code] = end
+            elif code - n_people < n_servers:
+                self.server_avail[code - n_people] = end
+                self.server_used[code - n_people] = True
+
+        # dependencias pendientes de las tareas que quedan por programar
+        done = np.zeros(self.n, dtype=bool)
+        done[prefix] = True
+        table = self.table
+        owners = np.repeat(np.arange(self.n), np.diff(table.dep_indptr))
+        unmet = np.diff(table.dep_indptr) - np.bincount(owners[done[table.dep_indices]], minlength=self.n)
+        self.unmet = unmet.tolist()
+        self._make_queues()
+        for i in np.flatnonzero(~done & (unmet == 0)).tolist():
+            self.release(i)
+
+    def run(self):
+        deque(self.steps(), maxlen=0)
+
+    def wall_times(self, i):
+        """(inicio, fin) de la fila i ya programada, en horas de reloj (como en finish)."""
+        start, end = self.start_time[i], self.end_time[i]
+        calendar = self.calendar
+        if calendar is None:
+            return start, end
+        wall_start = calendar.wall(start)
+        return wall_start, wall_start if end == start else calendar.wall(end, end=True)
+
+    def steps(self):
+        """Bucle principal; produce la fila programada en cada paso."""
+        n = self.n
+        n_people = self.n_people
+        queues = self.queues
+        queue_id = self.queue_id
+        earliest = self.earliest
+        duration = self.duration
+        resource = self.resource
+        person_avail = self.person_avail
+        server_avail = self.server_avail
+        server_used = self.server_used
+        start_time = self.start_time
+        end_time = self.end_time
+        assigned = self.assigned
+        order = self.order
+        unmet = self.unmet
+        succ_indptr = self.succ_indptr
+        succ_indices = self.succ_indices
+        release = self.release
+        instr = self.scheduler.instrumentation
+        observe = instr.observe if instr.enabled else None
+        first_step = len(order)
+
+        while len(order) < n:
+            # 1) menor eff_start entre las colas
+            min_start = None
+            for q in queues:
+                s = q.min_start()
+                if s is not None and (min_start is None or s < min_start):
+                    min_start = s
+            if min_start is None:
+                raise RuntimeError("Deadlock: no hay tareas listas pero quedan tareas por programar (posible ciclo de dependencias)")
+
+            if observe is not None:
+                size = ties = 0
+                for q in queues:
+                    q_size, q_ties = q.stats(min_start)
+                    size += q_size
+                    ties += q_ties
+                observe("scheduler.ready", size)
+                observe("scheduler.ties", ties)
+
+            # 2) candidatos dentro de la tolerancia; desempate por (score, orden de entrada)
+            best = None
+            best_queue = None
+            best_origin = None
+            for q in queues:
+                cand, origin = q.best_within(min_start, best)
+                if cand is not best:
+                    best, best_queue, best_origin = cand, q, origin
+            best_queue.take(best, best_origin)
+            chosen = best[1]
+
+            # 3) fijar inicio/fin y avanzar la disponibilidad del recurso usado
+            start = earliest[chosen]
+            qid = queue_id[chosen]
+            if qid == 0:
+                # assign to person who becomes available first
+                person = min(range(n_people), key=person_avail.__getitem__)
+                start = max(start, person_avail[person])
+                end = start + duration[chosen]
+                person_avail[person] = end
+                assigned[chosen] = person
+                queues[0].advance(min(person_avail))
+            elif qid >= 2:
+                server = qid - 2
+                start = max(start, server_avail[server])
+                end = start + duration[chosen]
+                server_avail[server] = end
+                server_used[server] = True
+                assigned[chosen] = resource[chosen]
+                queues[qid].advance(end)
             else:
-                # default behavior
-                task_to_sched.assigned_to = "Unknown"
-                task_to_sched.start_time = start
-                task_to_sched.end_time = start + task_to_sched.duration
+                end = start + duration[chosen]
+                assigned[chosen] = resource[chosen]
+            start_time[chosen] = start
+            end_time[chosen] = end
+            order.append(chosen)
 
-            # record scheduled
-            scheduled.append(task_to_sched)
-            remaining.remove(task_to_sched)
+            # 4) liberar dependientes cuyo último requisito acaba de programarse
+            for j in succ_indices[succ_indptr[chosen]:succ_indptr[chosen + 1]]:
+                unmet[j] -= 1
+                if unmet[j] == 0:
+                    release(j)
+            yield chosen
+        instr.count("scheduler.steps", len(order) - first_step)
+
+    def finish(self):
+        """Vuelca resultados a la tabla y el estado final de recursos al scheduler."""
+        scheduler = self.scheduler
+        table = self.table
+        calendar = self.calendar
+        wall = (lambda h: h) if calendar is None else (lambda h: calendar.wall(h, end=True))
+        # estado final de los recursos, como en el motor greedy
+        for p, avail in zip(scheduler.people, self.person_avail):
+            p.available_from = wall(avail)
+        for name, avail, used in zip(table.servers, self.server_avail, self.server_used):
+            if used:
+                scheduler.servers[name] = wall(avail)
+
+        start_time = np.array(self.start_time, dtype=np.float64)
+        end_time = np.array(self.end_time, dtype=np.float64)
+        if calendar is not None:
+            # horas de trabajo -> reloj: un fin en el límite de un turno es el fin de
+            # ese turno; las tareas de duración cero acaban donde empiezan
+            wall_start = calendar.to_wall(start_time)
+            end_time = np.where(end_time == start_time, wall_start, calendar.to_wall(end_time, end=True))
+            start_time = wall_start
+        table.resources = self.resources
+        table.resource_start = self.initial
+        table.start_time = start_time
+        table.end_time = end_time
+        table.assigned = np.array(self.assigned, dtype=np.int32)
+        table.order = np.array(self.order, dtype=np.int64)
+        return table
+
+
+class _BackfillRun(_TableRun):
+    """
+    Motor "backfill": cada recurso tiene un ResourceTimeline (huecos libres) en
+    lugar de una única marca de disponibilidad. Las tareas se colocan en orden de
+    (earliest, score, fila), donde earliest es el fin de sus dependencias o su
+    start_after, y cada una ocupa el primer hueco donde cabe a partir de earliest:
+    en el servidor que usa, o en la persona que antes la puede empezar (a igualdad,
+    la de menor índice). Las tareas ya colocadas no se mueven nunca, así que una
+    tarea solo aprovecha huecos anteriores si cabe entera en ellos.
+    Con `keys` (una por fila) el orden de colocación es (keys[j], j).
+    """
+
+    def __init__(self, scheduler, table, keys=None):
+        super().__init__(scheduler, table)
+        if keys is not None and len(keys) != self.n:
+            raise ValueError(f"Se esperaban {self.n} claves de orden y hay {len(keys)}")
+        self.keys = None if keys is None else list(keys)
+        calendars = scheduler.calendars
+        # los huecos más cortos que cualquier tarea del recurso no sirven para nada
+        duration = np.asarray(self.duration)
+        queue_id = np.asarray(self.queue_id, dtype=np.int64)
+        n_queues = 2 + len(table.servers)
+        min_duration = np.full(n_queues, np.inf)
+        np.minimum.at(min_duration, queue_id, duration)
+        min_duration[~np.isfinite(min_duration)] = 0.0
+        people_gap = float(min_duration[0])
+        # los intervalos bloqueados vienen en horas de reloj
+        blocked = ((lambda name: calendars.get(name, ())) if self.calendar is None
+                   else (lambda name: self.calendar.work_intervals(calendars.get(name, ()))))
+        self.person_timeline = [
+            ResourceTimeline(avail, blocked(p.name), min_gap=people_gap)
+            for p, avail in zip(scheduler.people, self.person_avail)
+        ]
+        self.server_timeline = [
+            ResourceTimeline(avail, blocked(name), min_gap=float(min_duration[2 + s]))
+            for s, (name, avail) in enumerate(zip(table.servers, self.server_avail))
+        ]
+        self.ready = None
+
+    def release(self, j):
+        a, b = self.dep_indptr[j], self.dep_indptr[j + 1]
+        end_time = self.end_time
+        deps_end = max([end_time[d] for d in self.dep_indices[a:b]]) if b > a else 0.0
+        self.earliest[j] = max(deps_end, self.start_after[j])
+        if self.keys is None:
+            heapq.heappush(self.ready, (self.earliest[j], self.scores[j], j))
+        else:
+            heapq.heappush(self.ready, (self.keys[j], j))
+
+    def start(self):
+        self.unmet = np.diff(self.table.dep_indptr).tolist()
+        self.ready = []
+        for i in range(self.n):
+            if self.unmet[i] == 0:
+                self.release(i)
+
+    def perturbed_step(self, previous):
+        # los huecos dependen de todo lo colocado antes: siempre cálculo completo
+        return None
+
+    def steps(self):
+        n = self.n
+        ready = self.ready
+        queue_id = self.queue_id
+        earliest = self.earliest
+        duration = self.duration
+        resource = self.resource
+        person_timeline = self.person_timeline
+        server_timeline = self.server_timeline
+        server_used = self.server_used
+        start_time = self.start_time
+        end_time = self.end_time
+        assigned = self.assigned
+        order = self.order
+        unmet = self.unmet
+        succ_indptr = self.succ_indptr
+        succ_indices = self.succ_indices
+        release = self.release
+        instr = self.scheduler.instrumentation
+        observe = instr.observe if instr.enabled else None
+        first_step = len(order)
+
+        while len(order) < n:
+            if not ready:
+                raise RuntimeError("Deadlock: no hay tareas listas pero quedan tareas por programar (posible ciclo de dependencias)")
+            if observe is not None:
+                observe("scheduler.ready", len(ready))
+            chosen = heapq.heappop(ready)[-1]
+
+            start = earliest[chosen]
+            d = duration[chosen]
+            qid = queue_id[chosen]
+            if qid == 0:
+                person = -1
+                best = None
+                for p, timeline in enumerate(person_timeline):
+                    s = timeline.earliest_fit(start, d)
+                    if best is None or s < best:
+                        best, person = s, p
+                if person < 0:
+                    raise RuntimeError("No hay personas para programar tareas manuales")
+                start = best
+                person_timeline[person].reserve(start, start + d)
+                assigned[chosen] = person
+            elif qid >= 2:
+                server = qid - 2
+                start = server_timeline[server].earliest_fit(start, d)
+                server_timeline[server].reserve(start, start + d)
+                server_used[server] = True
+                assigned[chosen] = resource[chosen]
+            else:
+                assigned[chosen] = resource[chosen]
+            start_time[chosen] = start
+            end_time[chosen] = start + d
+            order.append(chosen)
+
+            for j in succ_indices[succ_indptr[chosen]:succ_indptr[chosen + 1]]:
+                unmet[j] -= 1
+                if unmet[j] == 0:
+                    release(j)
+            yield chosen
+        instr.count("scheduler.steps", len(order) - first_step)
 
-        # return scheduled list (in the execution order we selected)
-        return scheduled
+    def finish(self):
+        # disponibilidad final de cada recurso: fin de su última tarea
+        n_people = self.n_people
+        n_servers = len(self.server_avail)
+        for code, end in zip(self.assigned, self.end_time):
+            if code < n_people:
+                if end > self.person_avail[code]:
+                    self.person_avail[code] = end
+            elif code - n_people < n_servers:
+                s = code - n_people
+                if end > self.server_avail[s]:
+                    self.server_avail[s] = end
+        return super().finish()
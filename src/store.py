@@ -0,0 +1,561 @@
+# store.py
+# Almacén SQLite de la configuración y de los planes calculados, alternativo a
+# config.yaml. La config se guarda normalizada (plantillas, tareas, dependencias,
+# clientes, milestones y tareas globales en tablas propias) y el editor la
+# actualiza por partes: solo se reescriben las plantillas, clientes o tareas que
+# cambian. Cada plan programado se guarda como una ejecución (runs) con una fila
+# por tarea, indexada por recurso, cliente e inicio, así que consultas como "las
+# tareas de Luis la semana que viene" son búsquedas en índice y no un cálculo.
+#
+#   python -m src.store import config.yaml config.db
+#   python -m src.store schedule config.db --people Ana Luis
+#   python -m src.store tasks config.db --resource Luis --from 2025-09-29 --to 2025-10-06
+#
+# Cualquier ruta con extensión de STORE_EXTENSIONS se trata como almacén en
+# load_config, ScheduleCache y el editor de configuración.
+import argparse
+import json
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from src.export import schedule_columns, to_datetimes
+
+STORE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+# variable de entorno con el fichero de configuración de las páginas y main.py
+CONFIG_ENV = "SCHEDULER_CONFIG"
+DEFAULT_CONFIG = "config.yaml"
+
+# campos de una tarea con columna propia; el resto (y los None) van a extra (JSON)
+TASK_FIELDS = ("name", "type", "duration", "priority", "server", "start_after", "template")
+MILESTONE_FIELDS = ("name", "start_after")
+
+# duration, priority y start_after sin tipo declarado: SQLite guarda 3 y 3.0 tal
+# cual, así la config leída es igual a la guardada (y su config_hash también)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS templates (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    template_id INTEGER REFERENCES templates(id) ON DELETE CASCADE,  -- NULL: tarea global
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    duration,
+    priority,
+    server TEXT,
+    start_after,
+    template TEXT,
+    has_dependencies INTEGER NOT NULL DEFAULT 1,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_by_template ON tasks(template_id, position);
+CREATE TABLE IF NOT EXISTS dependencies (
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (task_id, position)
+);
+CREATE INDEX IF NOT EXISTS dependencies_by_name ON dependencies(name);
+CREATE TABLE IF NOT EXISTS clients (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    has_processes INTEGER NOT NULL DEFAULT 1,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS clients_by_name ON clients(name);
+CREATE TABLE IF NOT EXISTS client_processes (
+    client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    template TEXT NOT NULL,
+    PRIMARY KEY (client_id, position)
+);
+CREATE INDEX IF NOT EXISTS client_processes_by_template ON client_processes(template);
+CREATE TABLE IF NOT EXISTS milestones (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    start_after,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    config_hash TEXT,
+    created TEXT NOT NULL,
+    start_day TEXT NOT NULL,
+    engine TEXT,
+    people TEXT,
+    servers TEXT,
+    tasks INTEGER NOT NULL,
+    makespan REAL,
+    max_duration REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_hash ON runs(config_hash, id);
+CREATE TABLE IF NOT EXISTS run_tasks (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    step INTEGER NOT NULL,
+    client TEXT,
+    name TEXT NOT NULL,
+    type TEXT,
+    resource TEXT,
+    start_hours REAL NOT NULL,
+    end_hours REAL NOT NULL,
+    duration,
+    priority,
+    PRIMARY KEY (run_id, step)
+);
+CREATE INDEX IF NOT EXISTS run_tasks_by_resource ON run_tasks(run_id, resource, start_hours);
+CREATE INDEX IF NOT EXISTS run_tasks_by_client ON run_tasks(run_id, client, start_hours);
+CREATE INDEX IF NOT EXISTS run_tasks_by_start ON run_tasks(run_id, start_hours);
+"""
+
+
+def is_store(path):
+    """True si la ruta es un almacén SQLite (por extensión)."""
+    return os.path.splitext(os.fspath(path))[1].lower() in STORE_EXTENSIONS
+
+
+def config_path(default=DEFAULT_CONFIG):
+    """Fichero de configuración: SCHEDULER_CONFIG si está definida (YAML o SQLite)."""
+    return os.environ.get(CONFIG_ENV) or default
+
+
+def config_revision(path):
+    """Revisión de la config de un almacén (ConfigStore.revision) sin crear el esquema."""
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+    except sqlite3.OperationalError:
+        row = None  # almacén vacío (sin tabla meta)
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False, default=str) if value else None
+
+
+def _split(item, fields):
+    # columnas conocidas con valor; el resto se conserva tal cual en extra
+    columns = {f: item[f] for f in fields if item.get(f) is not None}
+    extra = {k: v for k, v in item.items() if k not in columns and k not in ("dependencies", "processes_order")}
+    return columns, extra
+
+
+def _merge(fields, row, extra):
+    item = {f: v for f, v in zip(fields, row) if v is not None}
+    if extra:
+        item.update(json.loads(extra))
+    return item
+
+
+def _hours(value, start_day):
+    # datetime/date -> horas desde start_day; números se dejan como están
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    return (value - start_day).total_seconds() / 3600
+
+
+class ConfigStore:
+    """
+    Config y planes en un fichero SQLite. save_config/load_config guardan y leen la
+    config completa (el mismo dict que yaml.safe_load de config.yaml); update(base,
+    config) aplica solo las diferencias. save_run guarda un plan programado y
+    tasks() consulta sus filas por recurso, cliente y rango de tiempo.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Config
+    # ------------------------------------------------------------------
+    def save_config(self, config):
+        """Sustituye la config guardada por `config`."""
+        with self.conn:
+            for table in ("templates", "tasks", "clients", "milestones"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self._write_meta(config)
+            self._touch()
+            for position, (name, tasks) in enumerate((config.get("process_templates") or {}).items()):
+                self._insert_template(name, position, tasks)
+            for position, task in enumerate(config.get("global_tasks") or []):
+                self._insert_task(None, position, task)
+            for position, client in enumerate(config.get("clients") or []):
+                self._insert_client(position, client)
+            for position, milestone in enumerate(config.get("milestones") or []):
+                self._insert_milestone(position, milestone)
+
+    def update(self, base, config):
+        """
+        Aplica los cambios de `base` (la config tal como se leyó) a `config`: solo se
+        reescriben las plantillas, tareas globales, clientes y milestones que
+        cambian. Devuelve el número de elementos reescritos o borrados.
+        """
+        changed = 0
+        with self.conn:
+            if self._meta_of(base) != self._meta_of(config):
+                self._write_meta(config)
+                changed += 1
+
+            old = base.get("process_templates") or {}
+            new = config.get("process_templates") or {}
+            for name in old.keys() - new.keys():
+                self.conn.execute("DELETE FROM templates WHERE name = ?", (name,))
+                changed += 1
+            for position, (name, tasks) in enumerate(new.items()):
+                if name not in old or old[name] != tasks:
+                    self.conn.execute("DELETE FROM templates WHERE name = ?", (name,))
+                    self._insert_template(name, position, tasks)
+                    changed += 1
+            if list(old) != list(new):
+                self.conn.executemany("UPDATE templates SET position = ? WHERE name = ?",
+                                      [(p, name) for p, name in enumerate(new)])
+                changed += 1
+
+            changed += self._update_list(
+                "tasks", "template_id IS NULL", base.get("global_tasks") or [],
+                config.get("global_tasks") or [], lambda p, item: self._insert_task(None, p, item))
+            changed += self._update_list(
+                "clients", "1", base.get("clients") or [], config.get("clients") or [], self._insert_client)
+            changed += self._update_list(
+                "milestones", "1", base.get("milestones") or [], config.get("milestones") or [],
+                self._insert_milestone)
+            if changed:
+                self._touch()
+        return changed
+
+    def _update_list(self, table, where, old, new, insert):
+        # listas por posición: se reescriben las posiciones que cambian
+        changed = 0
+        for position in range(max(len(old), len(new))):
+            item = new[position] if position < len(new) else None
+            if position < len(old) and old[position] == item:
+                continue
+            self.conn.execute(f"DELETE FROM {table} WHERE {where} AND position = ?", (position,))
+            if item is not None:
+                insert(position, item)
+            changed += 1
+        return changed
+
+    def revision(self):
+        """Identificador de la versión de la config; cambia con cada escritura de config."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return row[0] if row else None
+
+    def _touch(self):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('revision', ?)",
+                          (uuid.uuid4().hex,))
+
+    @staticmethod
+    def _meta_of(config):
+        sections = ("process_templates", "global_tasks", "clients", "milestones")
+        # una sección vacía en el YAML (None) se guarda como un valor más
+        return {"keys": list(config),
+                "extra": {k: v for k, v in config.items() if k not in sections or v is None}}
+
+    def _write_meta(self, config):
+        meta = self._meta_of(config)
+        start_day = meta["extra"].pop("start_day", None)
+        kind = ("datetime" if isinstance(start_day, datetime) else
+                "date" if isinstance(start_day, date) else None)
+        rows = {
+            "keys": json.dumps(meta["keys"], ensure_ascii=False),
+            "extra": _json(meta["extra"]),
+            "start_day": start_day.isoformat() if kind else start_day,
+            "start_day_type": kind,
+        }
+        self.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", rows.items())
+
+    def _insert_template(self, name, position, tasks):
+        cur = self.conn.execute("INSERT INTO templates (name, position) VALUES (?, ?)", (name, position))
+        for p, task in enumerate(tasks or []):
+            self._insert_task(cur.lastrowid, p, task)
+
+    def _insert_task(self, template_id, position, task):
+        columns, extra = _split(task, TASK_FIELDS)
+        deps = task.get("dependencies")
+        listed = isinstance(deps, list)
+        if not listed and "dependencies" in task:
+            extra["dependencies"] = deps
+        cur = self.conn.execute(
+            "INSERT INTO tasks (template_id, position, name, type, duration, priority, server, start_after,"
+            " template, has_dependencies, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (template_id, position, *(columns.get(f) for f in TASK_FIELDS), int(listed), _json(extra)))
+        if listed and deps:
+            self.conn.executemany("INSERT INTO dependencies (task_id, position, name) VALUES (?, ?, ?)",
+                                  [(cur.lastrowid, p, d) for p, d in enumerate(deps)])
+
+    def _insert_client(self, position, client):
+        columns, extra = _split(client, ("name",))
+        processes = client.get("processes_order")
+        listed = isinstance(processes, list)
+        if not listed and "processes_order" in client:
+            extra["processes_order"] = processes
+        cur = self.conn.execute(
+            "INSERT INTO clients (name, position, has_processes, extra) VALUES (?, ?, ?, ?)",
+            (columns.get("name"), position, int(listed), _json(extra)))
+        if listed and processes:
+            self.conn.executemany("INSERT INTO client_processes (client_id, position, template) VALUES (?, ?, ?)",
+                                  [(cur.lastrowid, p, t) for p, t in enumerate(processes)])
+
+    def _insert_milestone(self, position, milestone):
+        columns, extra = _split(milestone, MILESTONE_FIELDS)
+        self.conn.execute("INSERT INTO milestones (position, name, start_after, extra) VALUES (?, ?, ?, ?)",
+                          (position, *(columns.get(f) for f in MILESTONE_FIELDS), _json(extra)))
+
+    def load_config(self):
+        """La config guardada, con la misma forma que yaml.safe_load de config.yaml."""
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if "keys" not in meta:
+            raise ValueError(f"{self.path} no contiene ninguna configuración")
+        extra = json.loads(meta["extra"]) if meta.get("extra") else {}
+        start_day = meta.get("start_day")
+        if meta.get("start_day_type") == "datetime":
+            extra["start_day"] = datetime.fromisoformat(start_day)
+        elif meta.get("start_day_type") == "date":
+            extra["start_day"] = date.fromisoformat(start_day)
+        elif "start_day" in json.loads(meta["keys"]):
+            extra["start_day"] = start_day
+
+        deps = {}
+        for task_id, name in self.conn.execute("SELECT task_id, name FROM dependencies ORDER BY task_id, position"):
+            deps.setdefault(task_id, []).append(name)
+        templates = {}
+        global_tasks = []
+        template_names = dict(self.conn.execute("SELECT id, name FROM templates ORDER BY position"))
+        for template_id in template_names:
+            templates[template_names[template_id]] = []
+        for row in self.conn.execute(
+                "SELECT id, template_id, has_dependencies, extra, " + ", ".join(TASK_FIELDS)
+                + " FROM tasks ORDER BY template_id, position"):
+            task_id, template_id, listed, task_extra = row[:4]
+            task = _merge(TASK_FIELDS, row[4:], task_extra)
+            if listed:
+                task["dependencies"] = deps.get(task_id, [])
+            if template_id is None:
+                global_tasks.append(task)
+            else:
+                templates[template_names[template_id]].append(task)
+
+        processes = {}
+        for client_id, template in self.conn.execute(
+                "SELECT client_id, template FROM client_processes ORDER BY client_id, position"):
+            processes.setdefault(client_id, []).append(template)
+        clients = []
+        for client_id, name, listed, client_extra in self.conn.execute(
+                "SELECT id, name, has_processes, extra FROM clients ORDER BY position"):
+            client = _merge(("name",), (name,), client_extra)
+            if listed:
+                client["processes_order"] = processes.get(client_id, [])
+            clients.append(client)
+        milestones = [_merge(MILESTONE_FIELDS, row[:2], row[2]) for row in self.conn.execute(
+            "SELECT name, start_after, extra FROM milestones ORDER BY position")]
+
+        sections = {"process_templates": templates, "global_tasks": global_tasks,
+                    "clients": clients, "milestones": milestones}
+        return {key: extra[key] if key in extra else sections[key] for key in json.loads(meta["keys"])}
+
+    # ------------------------------------------------------------------
+    # Planes programados
+    # ------------------------------------------------------------------
+    def save_run(self, table, start_day, config_hash=None, engine=None, people=None, servers=None):
+        """
+        Guarda un plan programado (TaskTable con order, o lista de tareas
+        programadas) como una ejecución nueva. Devuelve su id.
+        people: nombres de las personas; servers: {nombre: disponibilidad}.
+        """
+        columns = schedule_columns(table, start_day)
+        n = len(columns["name"])
+        start = columns["start_hours"]
+        end = columns["end_hours"]
+        rows = zip(range(n),
+                   np.asarray(columns["client"], dtype=object).tolist(),
+                   columns["name"].tolist(),
+                   np.asarray(columns["task_type"], dtype=object).tolist(),
+                   np.asarray(columns["assigned_to"], dtype=object).tolist(),
+                   start.tolist(), end.tolist(),
+                   columns["duration"].tolist(), np.asarray(columns["priority"]).tolist())
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (config_hash, created, start_day, engine, people, servers, tasks, makespan,"
+                " max_duration) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (config_hash, datetime.now().isoformat(timespec="seconds"), start_day.isoformat(), engine,
+                 json.dumps(list(people)) if people is not None else None,
+                 json.dumps(dict(servers)) if servers is not None else None, n,
+                 float(end.max()) if n else 0.0, float((end - start).max()) if n else 0.0))
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO run_tasks (run_id, step, client, name, type, resource, start_hours, end_hours,"
+                " duration, priority) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, *row) for row in rows))
+        return run_id
+
+    def runs(self):
+        """Ejecuciones guardadas (la más reciente al final)."""
+        return pd.read_sql_query(
+            "SELECT id, config_hash, created, start_day, engine, people, servers, tasks, makespan FROM runs ORDER BY id",
+            self.conn)
+
+    def latest_run(self, config_hash=None):
+        """id de la última ejecución (de esa config si se da config_hash), o None."""
+        if config_hash is None:
+            row = self.conn.execute("SELECT MAX(id) FROM runs").fetchone()
+        else:
+            row = self.conn.execute("SELECT MAX(id) FROM runs WHERE config_hash = ?", (config_hash,)).fetchone()
+        return row[0]
+
+    def delete_run(self, run_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def tasks(self, run_id=None, resource=None, client=None, start=None, end=None):
+        """
+        Tareas de una ejecución (la última si run_id es None) que se solapan con
+        [start, end) y, si se dan, de ese recurso y cliente. start/end: datetime,
+        date u horas desde el start_day de la ejecución. DataFrame en orden de
+        inicio con las columnas de schedule_frame.
+        """
+        if run_id is None:
+            run_id = self.latest_run()
+        run = self.conn.execute("SELECT start_day, max_duration FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise ValueError(f"No existe la ejecución {run_id}")
+        start_day = datetime.fromisoformat(run[0])
+        t0, t1 = _hours(start, start_day), _hours(end, start_day)
+
+        where = ["run_id = ?"]
+        params = [run_id]
+        if resource is not None:
+            where.append("resource = ?")
+            params.append(resource)
+        if client is not None:
+            where.append("client = ?")
+            params.append(client)
+        if t1 is not None:
+            where.append("start_hours < ?")
+            params.append(t1)
+        if t0 is not None:
+            # ninguna tarea dura más que max_duration: acota también por abajo el
+            # rango de start_hours que se recorre en el índice
+            where.append("start_hours >= ? AND end_hours > ?")
+            params.extend([t0 - run[1], t0])
+        frame = pd.read_sql_query(
+            "SELECT client, name, type AS task_type, resource AS assigned_to, start_hours, end_hours,"
+            " duration, priority FROM run_tasks WHERE " + " AND ".join(where) + " ORDER BY start_hours, step",
+            self.conn, params=params)
+        frame.insert(4, "start", to_datetimes(start_day, frame["start_hours"].to_numpy()))
+        frame.insert(5, "end", to_datetimes(start_day, frame["end_hours"].to_numpy()))
+        return frame
+
+
+# --------------------------------------------------------------------------
+# Línea de comandos
+# --------------------------------------------------------------------------
+def _import(args):
+    from src.process_manager import load_config
+    with ConfigStore(args.store) as store:
+        store.save_config(load_config(args.source))
+    print(f"{args.source} -> {args.store}")
+
+
+def _export(args):
+    from src.config_editor import write_config
+    with ConfigStore(args.store) as store:
+        write_config(args.target, store.load_config())
+    print(f"{args.store} -> {args.target}")
+
+
+def _schedule(args):
+    from src.cache import scheduled_key
+    from src.models import Person
+    from src.process_manager import build_task_table
+    from src.scheduler import Scheduler
+    from src.sweep import parse_servers
+    from src.work_calendar import calendar_from_config
+
+    with ConfigStore(args.store) as store:
+        config = store.load_config()
+        start_day = config.get("start_day")
+        if isinstance(start_day, str):
+            start_day = datetime.fromisoformat(start_day)
+        people = [Person(name) for name in args.people]
+        servers = parse_servers(args.servers)
+        work_calendar = calendar_from_config(config, start_day)
+        sched = Scheduler(people, servers, start_day=start_day, engine=args.engine, work_calendar=work_calendar)
+        key = scheduled_key(config, sched)
+        table = sched.schedule_table(build_task_table(config))
+        run_id = store.save_run(table, sched.start_day, config_hash=key, engine=args.engine,
+                                people=args.people, servers=servers)
+    print(f"Ejecución {run_id}: {len(table)} tareas")
+
+
+def _tasks(args):
+    with ConfigStore(args.store) as store:
+        frame = store.tasks(args.run, resource=args.resource, client=args.client,
+                            start=datetime.fromisoformat(args.start) if args.start else None,
+                            end=datetime.fromisoformat(args.end) if args.end else None)
+    with pd.option_context("display.max_rows", args.limit, "display.width", 200):
+        print(frame.drop(columns=["start_hours", "end_hours"]).head(args.limit).to_string(index=False))
+    print(f"{len(frame)} tareas")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Almacén SQLite de configuración y planes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", help="guarda un config.yaml en el almacén")
+    p.add_argument("source")
+    p.add_argument("store")
+    p.set_defaults(func=_import)
+    p = sub.add_parser("export", help="escribe la config del almacén en YAML")
+    p.add_argument("store")
+    p.add_argument("target")
+    p.set_defaults(func=_export)
+    p = sub.add_parser("schedule", help="programa la config del almacén y guarda el plan")
+    p.add_argument("store")
+    p.add_argument("--people", nargs="+", default=["Ana", "Luis"], help="nombres de las personas")
+    p.add_argument("--servers", default="S1,S2", help="servidores: 'S1,S2' o 'S1=0,S2=8'")
+    p.add_argument("--engine", default="heap", help="motor del scheduler")
+    p.set_defaults(func=_schedule)
+    p = sub.add_parser("tasks", help="consulta las tareas de un plan guardado")
+    p.add_argument("store")
+    p.add_argument("--run", type=int, default=None, help="id de la ejecución (por defecto, la última)")
+    p.add_argument("--resource", help="persona o servidor")
+    p.add_argument("--client")
+    p.add_argument("--from", dest="start", help="inicio del rango (ISO)")
+    p.add_argument("--to", dest="end", help="fin del rango (ISO)")
+    p.add_argument("--limit", type=int, default=50, help="filas a mostrar")
+    p.set_defaults(func=_tasks)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
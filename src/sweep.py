@@ -0,0 +1,229 @@
+# sweep.py
+# Barrido what-if de capacidad: programa la misma configuración con distintos
+# recursos (número de personas, servidores y su disponibilidad) y compara makespan,
+# utilización y retraso respecto al CPM sin restricciones de recursos.
+#
+# Cada tarea automática usa el servidor que nombra el config, así que un escenario
+# no puede quitar ni añadir servidores: debe dar exactamente los que usan las
+# tareas y solo varía cuándo está disponible cada uno (ValueError si no).
+#
+#   python -m src.sweep config.yaml --people 3 4 5 --servers S1,S2 S1=0,S2=8
+import argparse
+import copy
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import critical_path
+from src.cache import ScheduleCache
+from src.models import Person, TaskTable
+from src.process_manager import build_task_table
+from src.scheduler import ENGINES, Scheduler
+from src.work_calendar import calendar_from_config
+
+
+class Scenario:
+    """
+    Recursos de un escenario: número de personas y servidores {nombre: disponible_desde}
+    (los servidores que usan las tareas del config, ni más ni menos).
+    """
+
+    def __init__(self, num_people, servers, name=None):
+        if num_people < 1:
+            raise ValueError(f"Número de personas inválido: {num_people}")
+        self.num_people = int(num_people)
+        self.servers = dict(servers)
+        self.name = name or f"{self.num_people}p/" + ",".join(
+            f"{s}={a:g}" if a else s for s, a in self.servers.items()
+        )
+
+    def people(self):
+        return [Person(f"Persona_{i+1}") for i in range(self.num_people)]
+
+    def __repr__(self):
+        return f"Scenario({self.name})"
+
+
+def scenario_grid(people, servers):
+    """Producto cartesiano: people es una lista de tamaños y servers una lista de dicts."""
+    return [Scenario(n, s) for n, s in itertools.product(people, servers)]
+
+
+def parse_servers(spec):
+    """'S1,S2=8' -> {'S1': 0.0, 'S2': 8.0} (horas de disponibilidad inicial)."""
+    servers = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, avail = item.partition("=")
+        try:
+            servers[name] = float(avail) if avail else 0.0
+        except ValueError:
+            raise ValueError(f"Disponibilidad inválida para el servidor '{name}': {avail}")
+    return servers
+
+
+# ------------------------------------------------------------------
+# Trabajo por escenario (en los procesos del pool)
+# ------------------------------------------------------------------
+# estado de solo lectura de cada proceso: la tabla compilada y el CPM se reciben una
+# vez al arrancar el worker (initializer), no con cada escenario
+_SHARED = {}
+
+
+def _init_worker(table, earliest, cpm_makespan, start_day, engine, work_calendar):
+    _SHARED.update(table=table, earliest=earliest, cpm_makespan=cpm_makespan,
+                   start_day=start_day, engine=engine, work_calendar=work_calendar)
+
+
+def _run_scenario(scenario):
+    table = _SHARED["table"]
+    sched = Scheduler(scenario.people(), scenario.servers, start_day=_SHARED["start_day"],
+                      engine=_SHARED["engine"], work_calendar=_SHARED["work_calendar"])
+    # copia superficial: el motor solo lee las columnas y deja los resultados en
+    # atributos nuevos de la copia
+    result = sched.schedule_table(copy.copy(table))
+    return scenario_metrics(result, scenario, _SHARED["earliest"], _SHARED["cpm_makespan"],
+                            _SHARED["work_calendar"])
+
+
+def _check_servers(scenarios, table):
+    # los servidores de las tareas son fijos: un escenario solo cambia su disponibilidad
+    used = [s for s in table.servers if s]
+    for scenario in scenarios:
+        missing = [s for s in used if s not in scenario.servers]
+        extra = [s for s in scenario.servers if s not in used]
+        if missing or extra:
+            raise ValueError(
+                f"El escenario '{scenario.name}' debe dar los servidores que usan las tareas "
+                f"({', '.join(used) or 'ninguno'})"
+                + (f"; faltan: {', '.join(missing)}" if missing else "")
+                + (f"; no usados: {', '.join(extra)}" if extra else ""))
+
+
+def _critical_path(table, work_calendar):
+    # CPM sin restricciones de recursos; con calendario laboral se calcula en horas
+    # de trabajo y se pasa a horas de reloj, como los planes
+    if work_calendar is None:
+        cpm = critical_path(table)
+        return cpm.es, cpm.makespan
+    work = copy.copy(table)
+    work.start_after = work_calendar.to_work(table.start_after)
+    cpm = critical_path(work)
+    return work_calendar.to_wall(cpm.es), work_calendar.wall(cpm.makespan, end=True)
+
+
+def scenario_metrics(table, scenario, earliest, cpm_makespan, work_calendar=None):
+    """
+    Fila de resultados de una tabla programada con los recursos de `scenario`.
+    Con calendario laboral la utilización es sobre horas de trabajo (la ocupación
+    es la duración de las tareas y el plan dura las horas de trabajo hasta su fin).
+    """
+    start = table.start_time
+    end = table.end_time
+    makespan = float(end.max()) if len(end) else 0.0
+    n_people = scenario.num_people
+    wait = start - earliest
+    if work_calendar is None:
+        busy = np.bincount(table.assigned, weights=end - start, minlength=len(table.resources))
+        span = makespan
+    else:
+        # los tramos de reloj de una tarea incluyen noches y festivos
+        busy = np.bincount(table.assigned, weights=table.duration, minlength=len(table.resources))
+        span = work_calendar.work(makespan)
+
+    row = {
+        "scenario": scenario.name,
+        "people": n_people,
+        "servers": len(scenario.servers),
+        "makespan": makespan,
+        "cpm_makespan": cpm_makespan,
+        "delay": makespan - cpm_makespan,
+        "mean_wait": float(wait.mean()) if len(wait) else 0.0,
+        "max_wait": float(wait.max()) if len(wait) else 0.0,
+        "people_utilization": (float(busy[:n_people].sum()) / (n_people * span)
+                               if n_people and span else 0.0),
+    }
+    for s, name in enumerate(table.servers):
+        if name:
+            row[f"utilization_{name}"] = float(busy[n_people + s]) / span if span else 0.0
+    return row
+
+
+def sweep(config, scenarios, start_day=None, max_workers=None, engine="heap", work_calendar=None):
+    """
+    Programa `config` (dict de configuración o TaskTable ya compilada) con cada
+    escenario y devuelve un DataFrame con una fila por escenario, en el mismo orden.
+    La configuración se compila una sola vez; los escenarios se reparten en un pool
+    de procesos (max_workers=None: todos los núcleos; 1: en este proceso).
+    Cada escenario debe dar exactamente los servidores que usan las tareas
+    (ValueError si falta o sobra alguno).
+    work_calendar: calendario laboral (WorkCalendar); con un dict de configuración,
+    por defecto el de su sección calendar.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Engine '{engine}' no soportado (opciones: {', '.join(ENGINES)})")
+    if isinstance(config, TaskTable):
+        table = config
+    else:
+        table = build_task_table(config)
+        if start_day is None:
+            start_day = config.get("start_day")
+    if isinstance(start_day, str):
+        start_day = datetime.fromisoformat(start_day)
+    if work_calendar is None and not isinstance(config, TaskTable):
+        work_calendar = calendar_from_config(config, start_day)
+    if work_calendar is not None:
+        start_day = work_calendar.start_day
+
+    scenarios = list(scenarios)
+    _check_servers(scenarios, table)
+
+    earliest, cpm_makespan = _critical_path(table, work_calendar)
+    table.dependents()  # CSR inverso calculado una vez y compartido con los workers
+    initargs = (table, earliest, cpm_makespan, start_day, engine, work_calendar)
+
+    workers = min(max_workers or os.cpu_count() or 1, len(scenarios))
+    if workers <= 1:
+        _init_worker(*initargs)
+        rows = [_run_scenario(s) for s in scenarios]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            rows = list(pool.map(_run_scenario, scenarios))
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barrido de capacidad (personas y servidores)")
+    parser.add_argument("config", nargs="?", default="config.yaml", help="fichero de configuración YAML")
+    parser.add_argument("--people", type=int, nargs="+", default=[2], help="tamaños del pool de personas")
+    parser.add_argument("--servers", nargs="+", default=None,
+                        help="disponibilidad de los servidores de las tareas: 'S1,S2' o 'S1=0,S2=8' "
+                             "(por defecto, todos desde 0)")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--engine", default="heap", help="motor del scheduler")
+    parser.add_argument("--out", help="guarda la tabla de resultados (.csv o .parquet)")
+    args = parser.parse_args(argv)
+
+    config = ScheduleCache().load_config(args.config)
+    table = build_task_table(config)
+    servers = ([parse_servers(s) for s in args.servers] if args.servers
+               else [{s: 0.0 for s in table.servers if s}])
+    scenarios = scenario_grid(args.people, servers)
+    results = sweep(table, scenarios, start_day=config.get("start_day"), max_workers=args.workers,
+                    engine=args.engine, work_calendar=calendar_from_config(config))
+
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(results.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    if args.out:
+        if args.out.endswith(".parquet"):
+            results.to_parquet(args.out, index=False)
+        else:
+            results.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
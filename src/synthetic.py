@@ -0,0 +1,72 @@
+# synthetic.py
+# Generador de configuraciones sintéticas válidas (mismo formato que config.yaml)
+# para benchmarks y pruebas de escala.
+import random
+from datetime import datetime
+
+
+def synthetic_config(clients=100, templates=12, tasks_per_template=5, depth=3,
+                     milestones=3, global_tasks=2, servers=2, automated_ratio=0.4,
+                     server_ratio=0.8, templates_per_client=2, seed=0):
+    """
+    Config con `clients` clientes y `templates` plantillas de `tasks_per_template`
+    tareas encadenadas. Las plantillas se agrupan en cadenas de `depth` plantillas:
+    cada una depende de la anterior de su cadena (dependencia por nombre de
+    plantilla), y la primera de cada cadena de un milestone o de una tarea global.
+    Cada cliente ejecuta `templates_per_client` cadenas completas, así todas las
+    dependencias se resuelven. Las tareas automáticas (automated_ratio) usan uno de
+    los `servers` servidores con probabilidad server_ratio (contención), o System.
+    """
+    if depth < 1 or templates < 1 or tasks_per_template < 1:
+        raise ValueError("templates, tasks_per_template y depth deben ser >= 1")
+    rnd = random.Random(seed)
+    server_names = [f"S{i+1}" for i in range(servers)]
+    milestone_names = [f"hito_{i+1}" for i in range(milestones)]
+    global_names = [f"global_{i+1}" for i in range(global_tasks)]
+    roots = milestone_names + global_names
+
+    process_templates = {}
+    chains = []
+    for k in range(templates):
+        name = f"plantilla_{k+1}"
+        if k % depth == 0:
+            chains.append([])
+            previous = [rnd.choice(roots)] if roots else []
+        else:
+            previous = [chains[-1][-1]]
+        chains[-1].append(name)
+
+        tasks = []
+        for j in range(tasks_per_template):
+            tdef = {
+                "name": f"tarea_{j+1}",
+                "duration": rnd.randint(1, 8),
+                "type": "manual",
+                "priority": rnd.randint(1, 5),
+                "dependencies": [f"tarea_{j}"] if j else list(previous),
+            }
+            if rnd.random() < automated_ratio:
+                tdef["type"] = "automated"
+                if server_names and rnd.random() < server_ratio:
+                    tdef["server"] = rnd.choice(server_names)
+            tasks.append(tdef)
+        process_templates[name] = tasks
+
+    clients_cfg = []
+    for i in range(clients):
+        picked = rnd.sample(chains, min(templates_per_client, len(chains)))
+        clients_cfg.append({
+            "name": f"Cliente_{i+1}",
+            "processes_order": [t for chain in picked for t in chain],
+        })
+
+    return {
+        "start_day": datetime(2025, 1, 6, 9, 0),
+        "process_templates": process_templates,
+        "clients": clients_cfg,
+        "milestones": [{"name": m, "start_after": 24 * (i + 1)} for i, m in enumerate(milestone_names)],
+        "global_tasks": [
+            {"name": g, "type": "manual", "duration": rnd.randint(1, 4), "priority": 1, "dependencies": []}
+            for g in global_names
+        ],
+    }
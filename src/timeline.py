@@ -0,0 +1,88 @@
+# timeline.py
+# Calendario de un recurso (persona o servidor) como lista ordenada de huecos
+# libres. Sustituye a la marca única `available_from` cuando hace falta recordar
+# los huecos que deja una tarea colocada tarde (motor "backfill" del scheduler) o
+# bloquear intervalos concretos (mantenimientos, trabajo ya comprometido).
+from bisect import bisect_left, bisect_right
+
+INF = float("inf")
+
+
+class ResourceTimeline:
+    """
+    Huecos libres [inicio, fin) ordenados y disjuntos, en dos listas paralelas
+    (gap_start, gap_end). El último hueco llega siempre hasta infinito.
+
+        tl = ResourceTimeline(available_from=0.0, blocked=[(8, 10)])
+        start = tl.earliest_fit(3.0, duration=6.0)   # 10.0: no cabe en [3, 8)
+        tl.reserve(start, start + 6.0)
+
+    earliest_fit localiza con bisect el primer hueco que termina después de t
+    (O(log g)) y avanza solo por huecos demasiado cortos para la duración; con
+    min_gap, los huecos más cortos que cualquier tarea pendiente se descartan al
+    crearse, así que ese recorrido se mantiene corto.
+    """
+    __slots__ = ("gap_start", "gap_end", "min_gap")
+
+    def __init__(self, available_from=0.0, blocked=(), min_gap=0.0):
+        self.gap_start = [available_from]
+        self.gap_end = [INF]
+        self.min_gap = min_gap
+        for start, end in blocked:
+            self.block(start, end)
+
+    @property
+    def available_from(self):
+        """Inicio del último hueco (el equivalente a la marca del scheduler clásico)."""
+        return self.gap_start[-1]
+
+    def gaps(self):
+        return list(zip(self.gap_start, self.gap_end))
+
+    def is_free(self, start, end):
+        i = bisect_right(self.gap_start, start) - 1
+        return i >= 0 and end <= self.gap_end[i]
+
+    def earliest_fit(self, t, duration):
+        """Primer instante >= t en el que cabe una tarea de `duration` horas."""
+        gap_start = self.gap_start
+        gap_end = self.gap_end
+        i = bisect_left(gap_end, t)
+        while True:
+            start = gap_start[i] if gap_start[i] > t else t
+            if start + duration <= gap_end[i]:
+                return start
+            i += 1
+
+    def reserve(self, start, end):
+        """Ocupa [start, end), que debe estar libre (ValueError si no)."""
+        if end <= start:
+            return
+        i = bisect_right(self.gap_start, start) - 1
+        if i < 0 or end > self.gap_end[i]:
+            raise ValueError(f"El intervalo [{start}, {end}) no está libre en el calendario")
+        self._cut(i, i + 1, start, end)
+
+    def block(self, start, end):
+        """Marca [start, end) como no disponible, esté libre del todo o no."""
+        if end <= start:
+            return
+        lo = bisect_right(self.gap_end, start)
+        hi = lo
+        while hi < len(self.gap_start) and self.gap_start[hi] < end:
+            hi += 1
+        if hi > lo:
+            self._cut(lo, hi, start, end)
+
+    def _cut(self, lo, hi, start, end):
+        # sustituye los huecos lo..hi-1 por lo que queda fuera de [start, end); los
+        # trozos más cortos que min_gap se descartan (el hueco infinito nunca)
+        gap_start = self.gap_start
+        gap_end = self.gap_end
+        keep = [(s, e) for s, e in ((gap_start[lo], start), (end, gap_end[hi - 1]))
+                if e > s and (e - s >= self.min_gap or e == INF)]
+        gap_start[lo:hi] = [s for s, _ in keep]
+        gap_end[lo:hi] = [e for _, e in keep]
+
+    def __repr__(self):
+        return f"ResourceTimeline({self.gaps()})"
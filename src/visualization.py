@@ -1,7 +1,21 @@
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 from datetime import timedelta
+from src.export import to_datetimes
+from src.instrumentation import NULL
+from src.models import TaskTable, TaskView
 
-def plot_gantt(tasks, start_date):
+def plot_gantt(tasks, start_date, critical=None, instrumentation=None):
+    """
+    critical: conjunto opcional de nombres de tareas del camino crítico
+              (ver analysis.critical_path); esas barras se dibujan rayadas.
+    """
+    with (instrumentation or NULL).phase("plotly", view="rows", tasks=len(tasks)):
+        return _rows_figure(tasks, start_date, critical)
+
+
+def _rows_figure(tasks, start_date, critical):
     df = []
     for idx, t in enumerate(tasks):
         df.append({
@@ -10,7 +24,8 @@ def plot_gantt(tasks, start_date):
             "Finish": start_date + timedelta(hours=t.end_time),
             "Resource": getattr(t, "assigned_to", None),
             "Cliente": t.client,
-            "Nombre completo": f"{t.client} - {t.name}"
+            "Nombre completo": f"{t.client} - {t.name}",
+            "Crítica": critical is not None and t.name in critical
         })
 
     # Ordenar por hora de inicio
@@ -22,7 +37,9 @@ def plot_gantt(tasks, start_date):
         x_end="Finish",
         y="Task",
         color="Resource",
-        hover_data=["Nombre completo", "Cliente"]
+        hover_data=["Nombre completo", "Cliente"] + (["Crítica"] if critical is not None else []),
+        pattern_shape="Crítica" if critical is not None else None,
+        pattern_shape_map={True: "/", False: ""}
     )
 
     # Invertir eje Y para que lo primero quede arriba
@@ -37,3 +54,252 @@ def plot_gantt(tasks, start_date):
     )
 
     return fig
+
+
+# ------------------------------------------------------------------
+# Vista por carriles (un carril por recurso) con trazas WebGL
+# ------------------------------------------------------------------
+# a partir de este número de tareas las páginas usan la vista por carriles
+LANES_THRESHOLD = 500
+LANE_HEIGHT = 40  # px por carril
+BAR_WIDTH = 22    # grosor de las barras (px)
+
+
+class GanttColumns:
+    """
+    Columnas de las tareas programadas que necesita el Gantt por carriles:
+    start/end (horas), lane (índice en `lanes`), milestone y critical (máscaras),
+    labels (texto de hover por tarea).
+    """
+
+    def __init__(self, start, end, lane, lanes, milestone, critical, labels):
+        self.start = start
+        self.end = end
+        self.lane = lane
+        self.lanes = lanes
+        self.milestone = milestone
+        self.critical = critical
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.start)
+
+    def take(self, rows):
+        """Subconjunto de filas (array de índices), con los mismos carriles."""
+        return GanttColumns(self.start[rows], self.end[rows], self.lane[rows], self.lanes,
+                            self.milestone[rows], self.critical[rows],
+                            [self.labels[i] for i in rows.tolist()])
+
+
+def gantt_columns(tasks, critical=None):
+    """
+    Extrae las columnas de una TaskTable programada, de una lista de TaskView de una
+    misma tabla (p. ej. table.scheduled()) o de una lista de Task.
+    """
+    if isinstance(tasks, TaskTable):
+        table, rows = tasks, tasks.order
+    elif tasks and isinstance(tasks[0], TaskView) and all(t.table is tasks[0].table for t in tasks):
+        table, rows = tasks[0].table, np.fromiter((t.index for t in tasks), dtype=np.int64, count=len(tasks))
+    else:
+        table = None
+
+    if table is not None:
+        codes = table.assigned[rows]
+        used = np.unique(codes)
+        lanes = [table.resources[c] if c >= 0 else None for c in used.tolist()]
+        lane = np.searchsorted(used, codes)
+        milestone = table.type_mask("milestone")[rows]
+        names = table.names.array(rows).tolist()
+        clients = table.clients
+        client_code = table.client_code[rows].tolist()
+        labels = [f"{clients[c]} - {name}" for c, name in zip(client_code, names)]
+        start = table.start_time[rows]
+        end = table.end_time[rows]
+    else:
+        names = [t.name for t in tasks]
+        resources = [getattr(t, "assigned_to", None) for t in tasks]
+        lane_index = {}
+        for r in resources:
+            lane_index.setdefault(r, len(lane_index))
+        lanes = list(lane_index)
+        lane = np.array([lane_index[r] for r in resources], dtype=np.int64)
+        milestone = np.array([t.task_type == "milestone" for t in tasks], dtype=bool)
+        labels = [f"{t.client} - {t.name}" for t in tasks]
+        start = np.array([t.start_time for t in tasks], dtype=np.float64)
+        end = np.array([t.end_time for t in tasks], dtype=np.float64)
+
+    if critical is not None:
+        crit = np.fromiter((name in critical for name in names), dtype=bool, count=len(names))
+    else:
+        crit = np.zeros(len(names), dtype=bool)
+    return GanttColumns(start, end, lane, lanes, milestone, crit, labels)
+
+
+def _segments(start_date, start, end, y):
+    # barras como segmentos [inicio, fin, hueco] de una única traza de líneas
+    n = len(start)
+    x = np.empty(3 * n, dtype="datetime64[us]")
+    x[0::3] = to_datetimes(start_date, start)
+    x[1::3] = to_datetimes(start_date, end)
+    x[2::3] = np.datetime64("NaT")
+    ys = np.empty(3 * n, dtype=object)
+    ys[0::3] = y
+    ys[1::3] = y
+    ys[2::3] = None
+    return x, ys
+
+
+def plot_gantt_lanes(tasks, start_date, critical=None, columns=None, title="Gantt del proyecto",
+                     x_range=None, instrumentation=None):
+    """
+    Gantt con un carril por recurso (assigned_to): las barras de cada recurso se
+    dibujan como segmentos de una traza Scattergl (WebGL), construida a partir de
+    columnas NumPy. La altura depende del número de carriles, no de tareas.
+    columns: GanttColumns ya calculadas (si no, se extraen de `tasks`), p. ej. la
+             salida de GanttLOD.view.
+    x_range: (inicio, fin) en horas para fijar el zoom del eje X.
+    """
+    instr = instrumentation or NULL
+    with instr.phase("gantt_columns"):
+        cols = columns if columns is not None else gantt_columns(tasks, critical)
+    with instr.phase("plotly", view="lanes", tasks=len(cols)):
+        return _lanes_figure(cols, start_date, title, x_range)
+
+
+def _lanes_figure(cols, start_date, title, x_range):
+    lane_labels = [str(l) for l in cols.lanes]
+    fig = go.Figure()
+
+    bars = ~cols.milestone
+    for k, label in enumerate(lane_labels):
+        rows = np.flatnonzero(bars & (cols.lane == k))
+        if rows.size == 0:
+            continue
+        x, y = _segments(start_date, cols.start[rows], cols.end[rows], label)
+        text = np.repeat(np.array([cols.labels[i] for i in rows.tolist()], dtype=object), 3)
+        fig.add_trace(go.Scattergl(
+            x=x, y=y, mode="lines", name=label, text=text,
+            line=dict(width=BAR_WIDTH), hoverinfo="text+x", connectgaps=False
+        ))
+
+    rows = np.flatnonzero(cols.milestone)
+    if rows.size:
+        fig.add_trace(go.Scattergl(
+            x=to_datetimes(start_date, cols.start[rows]),
+            y=[lane_labels[k] for k in cols.lane[rows].tolist()],
+            mode="markers", name="Milestone", marker=dict(symbol="diamond", size=12, color="black"),
+            text=[cols.labels[i] for i in rows.tolist()], hoverinfo="text+x"
+        ))
+
+    rows = np.flatnonzero(cols.critical & bars)
+    if rows.size:
+        x, y = _segments(start_date, cols.start[rows], cols.end[rows],
+                         np.array(lane_labels, dtype=object)[cols.lane[rows]])
+        fig.add_trace(go.Scattergl(
+            x=x, y=y, mode="lines", name="Camino crítico",
+            line=dict(width=4, color="black"), hoverinfo="skip"
+        ))
+
+    fig.update_yaxes(categoryorder="array", categoryarray=lane_labels, autorange="reversed")
+    if x_range is not None:
+        fig.update_xaxes(range=list(to_datetimes(start_date, x_range).astype(str)))
+    fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        title=title,
+        yaxis_title="",
+        xaxis_title="Tiempo",
+        height=max(300, len(lane_labels) * LANE_HEIGHT + 120)
+    )
+    return fig
+
+
+# ------------------------------------------------------------------
+# Nivel de detalle: ventana temporal + agrupación de barras cortas
+# ------------------------------------------------------------------
+MIN_BAR_PX = 2  # por debajo de este ancho en pantalla una barra se agrupa
+
+
+class GanttLOD:
+    """
+    Índice de intervalos sobre las tareas programadas para pintar solo lo visible.
+    Las filas se ordenan por start y sobre sus fines se construye un árbol de
+    máximos (cada nodo guarda el mayor end de su rango de filas). Una ventana
+    [t0, t1] acota por arriba con una búsqueda binaria en start y por abajo bajando
+    por el árbol solo por los nodos cuyo máximo llega a t0: una barra larga no
+    obliga a recorrer las demás. La bajada es un paso vectorizado por nivel, con
+    coste O((k + 1) log n) (k: barras en la ventana).
+    view() además agrupa las barras que a ese zoom medirían menos de MIN_BAR_PX en
+    bloques de ocupación por recurso.
+    """
+
+    def __init__(self, columns):
+        order = np.argsort(columns.start, kind="stable")
+        self.columns = columns.take(order)
+        self.starts = self.columns.start
+        self.span = ((float(self.starts.min()), float(self.columns.end.max()))
+                     if len(self.starts) else (0.0, 0.0))
+        # niveles del árbol de máximos, de las hojas (un end por fila, rellenado
+        # hasta potencia de 2 con -inf) a la raíz; fmax ignora los NaN
+        size = 1 << max(len(self.starts) - 1, 0).bit_length()
+        level = np.full(size, -np.inf)
+        level[:len(self.starts)] = self.columns.end
+        self.levels = [level]
+        while len(level) > 1:
+            level = np.fmax(level[0::2], level[1::2])
+            self.levels.append(level)
+
+    def window(self, t0, t1):
+        """Filas (ordenadas por start) que se solapan con [t0, t1]."""
+        hi = np.searchsorted(self.starts, t1, side="right")
+        nodes = np.zeros(1 if hi else 0, dtype=np.int64)
+        for depth in range(len(self.levels) - 1, -1, -1):
+            # nodos del nivel con alguna fila antes de hi y algún fin >= t0
+            nodes = nodes[(self.levels[depth][nodes] >= t0) & ((nodes << depth) < hi)]
+            if depth:
+                nodes = np.stack((2 * nodes, 2 * nodes + 1), axis=1).ravel()
+        return nodes
+
+    def view(self, t0, t1, width_px=1200):
+        """
+        GanttColumns de la ventana [t0, t1] con las barras cortas (ni hitos ni
+        críticas) fusionadas en bloques por carril: barras consecutivas del mismo
+        recurso separadas menos que el umbral forman un único bloque.
+        """
+        cols = self.columns.take(self.window(t0, t1))
+        min_hours = (t1 - t0) / max(width_px, 1) * MIN_BAR_PX
+        short = (cols.end - cols.start < min_hours) & ~cols.milestone & ~cols.critical
+        if short.sum() < 2:
+            return cols
+        keep = cols.take(np.flatnonzero(~short))
+        small = cols.take(np.flatnonzero(short))
+
+        # ordenar por (carril, start) y desplazar cada carril para que el máximo
+        # acumulado del fin no se arrastre de un carril al siguiente
+        order = np.lexsort((small.start, small.lane))
+        lane = small.lane[order]
+        offset = lane * (self.span[1] - self.span[0] + 2 * min_hours + 1.0)
+        start = small.start[order] + offset
+        end = small.end[order] + offset
+        reach = np.maximum.accumulate(end)
+        new_block = np.ones(len(start), dtype=bool)
+        new_block[1:] = (lane[1:] != lane[:-1]) | (start[1:] > reach[:-1] + min_hours)
+        firsts = np.flatnonzero(new_block)
+        counts = np.diff(np.append(firsts, len(start)))
+        block_start = small.start[order][firsts]
+        # un bloque no cruza carriles: su fin es el máximo de los end sin desplazar
+        block_end = np.maximum.reduceat(small.end[order], firsts)
+        block_lane = lane[firsts]
+        heads = order[firsts].tolist()
+        labels = [small.labels[i] if c == 1 else f"{c} tareas"
+                  for i, c in zip(heads, counts.tolist())]
+
+        n = len(firsts)
+        return GanttColumns(
+            np.concatenate([keep.start, block_start]),
+            np.concatenate([keep.end, block_end]),
+            np.concatenate([keep.lane, block_lane]),
+            cols.lanes,
+            np.concatenate([keep.milestone, np.zeros(n, dtype=bool)]),
+            np.concatenate([keep.critical, np.zeros(n, dtype=bool)]),
+            keep.labels + labels,
+        )
@@ -0,0 +1,246 @@
+# work_calendar.py
+# Calendario laboral: turnos por día de la semana y festivos. Las duraciones de
+# las tareas son horas de trabajo; el scheduler (motores heap y backfill) programa
+# sobre un eje de horas de trabajo y convierte al final a horas de reloj desde
+# start_day, así que noches, fines de semana y festivos quedan fuera del plan.
+#
+# La conversión no hace aritmética de datetime por tarea: los intervalos laborables
+# se precalculan (en horas de reloj desde start_day) junto con las horas de trabajo
+# acumuladas al inicio de cada uno, y convertir es una búsqueda binaria vectorizada
+# (np.searchsorted) sobre esas tablas. El horizonte se amplía solo si hace falta.
+#
+#   calendar:
+#     shifts:
+#       - {days: [mon, tue, wed, thu, fri], start: "09:00", end: "14:00"}
+#       - {days: [mon, tue, wed, thu, fri], start: "15:00", end: "18:00"}
+#     holidays: ["2025-10-12", "2025-11-01"]
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time
+
+import numpy as np
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DEFAULT_HORIZON_DAYS = 366
+
+
+def _hour_of_day(value, where):
+    # "09:30", 9.5 o datetime.time -> horas desde medianoche
+    if isinstance(value, time):
+        return value.hour + value.minute / 60 + value.second / 3600
+    if isinstance(value, str):
+        try:
+            parts = [int(p) for p in value.split(":")]
+        except ValueError:
+            raise ValueError(f"Hora inválida en {where}: {value!r} (se espera HH:MM)")
+        return sum(p / 60 ** k for k, p in enumerate(parts))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError(f"Hora inválida en {where}: {value!r} (se espera HH:MM)")
+
+
+def _weekday(value, where):
+    if isinstance(value, int) and 0 <= value < 7:
+        return value
+    key = str(value).strip().lower()[:3]
+    if key not in WEEKDAYS:
+        raise ValueError(f"Día de la semana inválido en {where}: {value!r} (opciones: {', '.join(WEEKDAYS)})")
+    return WEEKDAYS.index(key)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class WorkCalendar:
+    """
+    Horas laborables a partir de start_day (la hora 0 de los planes).
+
+    shifts: {día de la semana (0 = lunes): [(hora_inicio, hora_fin), ...]} en horas
+            del día; un turno que cruza la medianoche se da como fin > 24.
+    holidays: fechas sin trabajo (date o ISO).
+
+    Tablas precalculadas, un intervalo laborable por fila y ordenadas:
+      wall_start, wall_end: inicio y fin en horas de reloj desde start_day
+      work_start: horas de trabajo acumuladas al inicio de cada intervalo
+    Los intervalos contiguos se fusionan (un turno de noche que sigue al de tarde).
+    """
+
+    def __init__(self, shifts, holidays=(), start_day=None, horizon_days=DEFAULT_HORIZON_DAYS):
+        self.shifts = {day: sorted((float(s), float(e)) for s, e in intervals)
+                       for day, intervals in shifts.items() if intervals}
+        for day, intervals in self.shifts.items():
+            for s, e in intervals:
+                if not 0 <= s < e <= 48:
+                    raise ValueError(f"Turno inválido ({s}, {e}) el {WEEKDAYS[day]}: "
+                                     f"se requiere 0 <= inicio < fin <= 48")
+        if not self.shifts:
+            raise ValueError("El calendario laboral no tiene ningún turno")
+        self.holidays = sorted({_as_date(d) for d in holidays})
+        self.start_day = start_day or datetime(2025, 1, 1, 8, 0)
+        self.horizon_days = horizon_days
+        self._build()
+
+    @classmethod
+    def from_config(cls, spec, start_day=None):
+        """Calendario de la sección `calendar` del config (ver el ejemplo del módulo)."""
+        if not isinstance(spec, dict) or not spec.get("shifts"):
+            raise ValueError("calendar: se espera un dict con una lista 'shifts'")
+        shifts = {}
+        for k, shift in enumerate(spec["shifts"]):
+            where = f"calendar.shifts[{k}]"
+            if not isinstance(shift, dict) or "start" not in shift or "end" not in shift:
+                raise ValueError(f"{where}: se esperan 'start' y 'end'")
+            start = _hour_of_day(shift["start"], where)
+            end = _hour_of_day(shift["end"], where)
+            if end <= start:
+                end += 24   # turno que termina al día siguiente
+            for day in shift.get("days", WEEKDAYS[:5]):
+                shifts.setdefault(_weekday(day, where), []).append((start, end))
+        return cls(shifts, spec.get("holidays") or (), start_day)
+
+    def spec(self):
+        """Definición canónica (para claves de caché)."""
+        return {"shifts": {WEEKDAYS[day]: intervals for day, intervals in sorted(self.shifts.items())},
+                "holidays": [d.isoformat() for d in self.holidays],
+                "start_day": self.start_day.isoformat()}
+
+    def __repr__(self):
+        return (f"WorkCalendar(days={len(self.shifts)}, holidays={len(self.holidays)}, "
+                f"intervals={len(self.wall_start)})")
+
+    # ------------------------------------------------------------------
+    # Tablas
+    # ------------------------------------------------------------------
+    def _build(self):
+        # intervalos de todos los días del horizonte, sin bucle por día: un bloque
+        # de arrays por turno (días de su día de la semana que no son festivo)
+        midnight = datetime.combine(self.start_day.date(), time())
+        offset = (self.start_day - midnight).total_seconds() / 3600
+        # un día más al principio por los turnos que cruzan la medianoche
+        days = np.arange(-1, self.horizon_days)
+        first = np.datetime64(self.start_day.date(), "D")
+        weekday = (self.start_day.weekday() + days) % 7
+        holiday = np.isin(first + days, np.array(self.holidays, dtype="datetime64[D]"))
+        starts, ends = [], []
+        for day, intervals in self.shifts.items():
+            base = days[(weekday == day) & ~holiday] * 24.0 - offset
+            for s, e in intervals:
+                starts.append(base + s)
+                ends.append(base + e)
+        start = np.concatenate(starts)
+        end = np.concatenate(ends)
+        order = np.argsort(start, kind="stable")
+        start, end = np.maximum(start[order], 0.0), np.maximum(end[order], 0.0)
+
+        # fusión de solapes y contiguos: empieza bloque donde el inicio supera el
+        # mayor fin anterior
+        reach = np.maximum.accumulate(end)
+        new = np.ones(len(start), dtype=bool)
+        new[1:] = start[1:] > reach[:-1]
+        block = np.cumsum(new) - 1
+        wall_start = start[new]
+        wall_end = np.zeros(len(wall_start))
+        np.maximum.at(wall_end, block, end)
+        keep = wall_end > wall_start
+        self.wall_start = wall_start[keep]
+        self.wall_end = wall_end[keep]
+        if not len(self.wall_start):
+            raise ValueError("El calendario laboral no tiene horas de trabajo en el horizonte")
+        length = self.wall_end - self.wall_start
+        self.work_start = np.concatenate([[0.0], np.cumsum(length)[:-1]])
+        self.work_end = self.work_start + length
+        # copias en listas para las conversiones escalares (bisect)
+        self._wall_start = self.wall_start.tolist()
+        self._work_start = self.work_start.tolist()
+        self._work_end = self.work_end.tolist()
+        self._wall_end = self.wall_end.tolist()
+
+    def _ensure(self, work=None, wall=None):
+        # amplía el horizonte (doblándolo) hasta cubrir las horas pedidas
+        while ((work is not None and work >= self._work_end[-1])
+               or (wall is not None and wall >= self._wall_end[-1])):
+            self.horizon_days *= 2
+            self._build()
+
+    @staticmethod
+    def _finite_max(values):
+        finite = values[np.isfinite(values)]
+        return finite.max() if finite.size else None
+
+    # ------------------------------------------------------------------
+    # Conversiones vectorizadas
+    # ------------------------------------------------------------------
+    def to_wall(self, work, end=False):
+        """
+        Horas de trabajo -> horas de reloj desde start_day (array). Un instante en el
+        límite entre dos intervalos es el inicio del siguiente, o con end=True el fin
+        del anterior (una tarea que acaba a las 18:00 acaba a las 18:00, no a las 9:00
+        del día siguiente). inf y NaN se conservan.
+        """
+        work = np.asarray(work, dtype=np.float64)
+        self._ensure(work=self._finite_max(work))
+        if end:
+            k = np.searchsorted(self.work_end, work, side="left")
+        else:
+            k = np.searchsorted(self.work_start, work, side="right") - 1
+        k = np.clip(k, 0, len(self.work_start) - 1)
+        wall = self.wall_start[k] + (work - self.work_start[k])
+        return np.where(np.isfinite(work), wall, work)
+
+    def to_work(self, wall):
+        """Horas de reloj -> horas de trabajo transcurridas hasta ese instante (array)."""
+        wall = np.asarray(wall, dtype=np.float64)
+        self._ensure(wall=self._finite_max(wall))
+        k = np.searchsorted(self.wall_start, wall, side="right") - 1
+        inside = np.clip(wall - self.wall_start[np.maximum(k, 0)], 0.0,
+                         (self.wall_end - self.wall_start)[np.maximum(k, 0)])
+        work = np.where(k >= 0, self.work_start[np.maximum(k, 0)] + inside, 0.0)
+        return np.where(np.isfinite(wall), work, wall)
+
+    def work_intervals(self, intervals):
+        """Intervalos [inicio, fin) en horas de reloj -> en horas de trabajo (vacíos fuera)."""
+        if not intervals:
+            return []
+        bounds = self.to_work(np.asarray(intervals, dtype=np.float64))
+        return [(s, e) for s, e in bounds.tolist() if e > s]
+
+    # ------------------------------------------------------------------
+    # Conversiones escalares (bisect sobre las mismas tablas)
+    # ------------------------------------------------------------------
+    def wall(self, work, end=False):
+        """to_wall de un solo valor."""
+        if work != work or work in (float("inf"), float("-inf")):
+            return work
+        self._ensure(work=work)
+        if end:
+            k = min(bisect_left(self._work_end, work), len(self._work_end) - 1)
+        else:
+            k = max(bisect_right(self._work_start, work) - 1, 0)
+        return self._wall_start[k] + (work - self._work_start[k])
+
+    def work(self, wall):
+        """to_work de un solo valor."""
+        if wall != wall or wall in (float("inf"), float("-inf")):
+            return wall
+        self._ensure(wall=wall)
+        k = bisect_right(self._wall_start, wall) - 1
+        if k < 0:
+            return 0.0
+        return self._work_start[k] + min(max(wall - self._wall_start[k], 0.0),
+                                         self._wall_end[k] - self._wall_start[k])
+
+
+def calendar_from_config(config, start_day=None):
+    """WorkCalendar de la sección `calendar` del config, o None si no la tiene."""
+    spec = config.get("calendar")
+    if not spec:
+        return None
+    if start_day is None:
+        start_day = config.get("start_day")
+        if isinstance(start_day, str):
+            start_day = datetime.fromisoformat(start_day)
+    return WorkCalendar.from_config(spec, start_day)
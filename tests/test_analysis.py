@@ -0,0 +1,96 @@
+# tests/test_analysis.py
+import numpy as np
+import pytest
+
+from src.analysis import critical_path
+from src.process_manager import build_processes, build_task_table
+from src.synthetic import synthetic_config
+
+
+def _reference_cpm(table):
+    # forward y backward pass en Python puro, en un orden topológico cualquiera
+    n = len(table)
+    deps = [table.dependencies_of(i) for i in range(n)]
+    duration = [0.0 if t.task_type == "milestone" else float(t.duration) for t in table]
+    order, seen = [], set()
+
+    def visit(i):
+        if i not in seen:
+            seen.add(i)
+            for d in deps[i]:
+                visit(d)
+            order.append(i)
+
+    for i in range(n):
+        visit(i)
+    es = [0.0] * n
+    for i in order:
+        es[i] = max([table.start_after[i]] + [es[d] + duration[d] for d in deps[i]])
+    makespan = max(es[i] + duration[i] for i in range(n))
+    lf = [makespan] * n
+    for i in reversed(order):
+        for d in deps[i]:
+            lf[d] = min(lf[d], lf[i] - duration[i])
+    return np.array(es), np.array(lf), makespan
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_critical_path_matches_reference(seed):
+    table = build_task_table(synthetic_config(clients=12, templates=6, tasks_per_template=3, depth=3, seed=seed))
+    cpm = critical_path(table)
+    es, lf, makespan = _reference_cpm(table)
+    np.testing.assert_allclose(cpm.es, es)
+    np.testing.assert_allclose(cpm.lf, lf)
+    assert cpm.makespan == makespan
+    assert (cpm.slack >= -1e-9).all()
+    assert cpm.critical[np.argmax(cpm.ef)]
+
+
+def test_critical_path_accepts_processes():
+    config = synthetic_config(clients=4, templates=2, tasks_per_template=2, depth=1, seed=0)
+    processes, _ = build_processes(config)
+    from_processes = critical_path(processes)
+    from_table = critical_path(build_task_table(config))
+    np.testing.assert_array_equal(from_processes.es, from_table.es)
+    assert from_processes.critical_names() == from_table.critical_names()
+
+
+def _cyclic_table():
+    from src.models import TaskTable
+    # a -> b -> c -> a y d aparte (cada fila depende de las de dep_indices)
+    return TaskTable(["a", "b", "c", "d"], [1, 1, 1, 1], [0, 0, 0, 0], [1, 1, 1, 1],
+                     [0, 0, 0, 0], [0, 0, 0, 0], [-1, -1, -1, -1],
+                     dep_indptr=[0, 1, 2, 3, 3], dep_indices=[2, 0, 1],
+                     types=["manual"], clients=["A"], servers=[])
+
+
+def test_cycles_are_reported_with_names():
+    from src.analysis import DependencyCycleError, check_acyclic
+    with pytest.raises(DependencyCycleError) as err:
+        check_acyclic(_cyclic_table())
+    assert sorted(err.value.cycles[0]) == ["a", "b", "c"]
+    with pytest.raises(DependencyCycleError):
+        critical_path(_cyclic_table())
+
+
+def test_scheduler_rejects_cycles_before_scheduling():
+    from src.analysis import DependencyCycleError
+    from src.models import Person
+    from src.scheduler import Scheduler
+    for engine in ("greedy", "heap", "backfill"):
+        with pytest.raises(DependencyCycleError):
+            Scheduler([Person("Ana")], {}, engine=engine).schedule_table(_cyclic_table())
+
+
+def test_template_cycle_detected_at_build():
+    from src.analysis import DependencyCycleError
+    config = {
+        "process_templates": {"p": [
+            {"name": "x", "duration": 1, "type": "manual", "dependencies": ["z"]},
+            {"name": "y", "duration": 1, "type": "manual", "dependencies": ["x"]},
+            {"name": "z", "duration": 1, "type": "manual", "dependencies": ["y"]},
+        ]},
+        "clients": [{"name": "A", "processes_order": ["p"]}],
+    }
+    with pytest.raises(DependencyCycleError, match="p::x"):
+        build_task_table(config)
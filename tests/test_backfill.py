@@ -0,0 +1,75 @@
+# tests/test_backfill.py
+import numpy as np
+import pytest
+
+from src.models import Person
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+from src.timeline import ResourceTimeline
+
+BLOCKED = {"Ana": [(5.0, 20.0)], "S1": [(0.0, 8.0)]}
+
+
+def test_timeline_fit_reserve_and_block():
+    tl = ResourceTimeline(available_from=0.0, blocked=[(8, 10)])
+    assert tl.earliest_fit(3.0, 6.0) == 10.0
+    assert tl.earliest_fit(3.0, 5.0) == 3.0
+    tl.reserve(10.0, 14.0)
+    assert tl.gaps() == [(0.0, 8), (14.0, float("inf"))]
+    with pytest.raises(ValueError):
+        tl.reserve(7.0, 9.0)
+    tl.block(2.0, 16.0)
+    assert tl.gaps() == [(0.0, 2.0), (16.0, float("inf"))]
+    assert ResourceTimeline(0.0, [(1.0, 2.0)], min_gap=1.5).gaps() == [(2.0, float("inf"))]
+
+
+def _check_plan(table, blocked):
+    # dependencias y start_after respetados, sin solapes por recurso y fuera de lo bloqueado
+    for i in range(len(table)):
+        assert table.start_time[i] >= table.start_after[i]
+        for d in table.dependencies_of(i):
+            assert table.start_time[i] >= table.end_time[d]
+    exclusive = [r for r in table.resources if r not in ("System", "Milestone", "Unknown")]
+    for code, name in enumerate(table.resources):
+        if name not in exclusive:
+            continue
+        rows = np.flatnonzero((table.assigned == code) & (table.end_time > table.start_time))
+        rows = rows[np.argsort(table.start_time[rows])]
+        assert (table.start_time[rows[1:]] >= table.end_time[rows[:-1]]).all()
+        for s, e in blocked.get(name, ()):
+            assert ((table.end_time[rows] <= s) | (table.start_time[rows] >= e)).all()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_backfill_plan_is_valid(seed):
+    config = synthetic_config(clients=15, templates=4, tasks_per_template=3, depth=2, seed=seed)
+    people = [Person("Ana"), Person("Luis")]
+    table = Scheduler(people, {"S1": 0.0, "S2": 3.0}, engine="backfill",
+                      calendars=BLOCKED).schedule_table(build_task_table(config))
+    assert sorted(table.order.tolist()) == list(range(len(table)))
+    _check_plan(table, BLOCKED)
+
+
+def test_short_task_fills_an_earlier_gap():
+    config = {
+        "process_templates": {
+            "p": [
+                {"name": "larga", "duration": 6, "type": "manual", "priority": 1},
+                {"name": "corta", "duration": 2, "type": "manual", "priority": 2},
+            ],
+        },
+        "clients": [{"name": "A", "processes_order": ["p"]}],
+    }
+    # Ana está libre en [0, 3): la larga no cabe, la corta sí
+    calendars = {"Ana": [(3.0, 100.0)]}
+    table = Scheduler([Person("Ana")], {}, engine="backfill",
+                      calendars=calendars).schedule_table(build_task_table(config))
+    start = dict(zip(table.names, table.start_time.tolist()))
+    assert start["A::p::corta"] == 0.0
+    assert start["A::p::larga"] == 100.0
+
+
+def test_calendars_require_backfill():
+    with pytest.raises(ValueError):
+        Scheduler([Person("Ana")], {}, calendars=BLOCKED)
@@ -0,0 +1,84 @@
+# tests/test_cache.py
+from datetime import date, datetime
+
+import yaml
+
+from src.cache import ScheduleCache, config_hash, scheduled_key
+from src.instrumentation import Instrumentation
+from src.models import Person
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+from src.work_calendar import WorkCalendar
+
+CALENDAR = {"shifts": [{"days": ["mon", "tue", "wed", "thu", "fri"], "start": "09:00", "end": "17:00"}]}
+
+
+def _scheduler(**kwargs):
+    return Scheduler([Person("Ana"), Person("Luis")], {"S1": 0.0, "S2": 4.0},
+                     start_day=datetime(2025, 1, 6, 9), **kwargs)
+
+
+def _write_config(tmp_path, config):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config, allow_unicode=True), encoding="utf-8")
+    return str(path)
+
+
+def test_config_roundtrip_keeps_dates(tmp_path):
+    config = synthetic_config(clients=3, templates=2, tasks_per_template=2, depth=1, seed=0)
+    config["calendar"] = dict(CALENDAR, holidays=[date(2025, 1, 8)])
+    path = _write_config(tmp_path, config)
+    cache = ScheduleCache(str(tmp_path / "cache"))
+
+    first = cache.load_config(path)
+    instr = Instrumentation()
+    second = cache.load_config(path, instr)
+    assert instr.counters["cache.config_hit"] == 1
+    assert second == first == config
+    assert isinstance(second["start_day"], datetime)
+    assert not list((tmp_path / "cache").glob("*.pkl"))
+
+
+def test_corrupt_config_entry_is_reparsed(tmp_path):
+    config = synthetic_config(clients=2, templates=1, tasks_per_template=2, depth=1, seed=0)
+    path = _write_config(tmp_path, config)
+    cache = ScheduleCache(str(tmp_path / "cache"))
+    cache.load_config(path)
+    for entry in (tmp_path / "cache").glob("config-*"):
+        entry.write_bytes(b'{"truncated')
+
+    instr = Instrumentation()
+    assert cache.load_config(path, instr) == config
+    assert instr.counters["cache.config_miss"] == 1
+
+
+def test_scheduled_key_depends_on_engine_and_calendar():
+    config = synthetic_config(clients=3, templates=2, tasks_per_template=2, depth=1, seed=0)
+    heap = scheduled_key(config, _scheduler())
+    assert scheduled_key(config, _scheduler(engine="greedy")) == heap
+    assert scheduled_key(config, _scheduler(engine="backfill")) != heap
+    calendar = WorkCalendar.from_config(CALENDAR, datetime(2025, 1, 6, 9))
+    assert scheduled_key(config, _scheduler(work_calendar=calendar)) != heap
+    assert config_hash(config) != heap
+
+
+def test_scheduled_hit_returns_same_plan(tmp_path):
+    config = synthetic_config(clients=5, templates=2, tasks_per_template=3, depth=1, seed=2)
+    cache = ScheduleCache(str(tmp_path / "cache"))
+    first = cache.scheduled(config, _scheduler())
+    instr = Instrumentation()
+    second = cache.scheduled(config, _scheduler(instrumentation=instr))
+    assert instr.counters["cache.scheduled_hit"] == 1
+    assert first.order.tolist() == second.order.tolist()
+    assert first.end_time.tolist() == second.end_time.tolist()
+
+
+def test_iter_scheduled_uses_given_compiled_table(tmp_path):
+    config = synthetic_config(clients=5, templates=2, tasks_per_template=3, depth=1, seed=2)
+    cache = ScheduleCache(str(tmp_path / "cache"))
+    compiled = cache.compiled(config)
+    instr = Instrumentation()
+    rows = list(cache.iter_scheduled(config, _scheduler(instrumentation=instr), compiled=compiled))
+    assert len(rows) == len(compiled)
+    assert rows[-1].table is compiled
+    assert "cache.compiled_hit" not in instr.counters and "cache.compiled_miss" not in instr.counters
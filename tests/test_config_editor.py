@@ -0,0 +1,67 @@
+# tests/test_config_editor.py
+import os
+
+import pytest
+
+from src.config_editor import (MISSING, DependencyIndex, apply_task_edit, config_diff, filter_tasks,
+                               page_slice, read_config, save_config, write_config)
+from src.cache import file_hash
+from src.synthetic import synthetic_config
+
+
+def test_config_diff_paths():
+    old = {"a": 1, "t": {"p": [{"duration": 3}, {"duration": 1}]}}
+    new = {"a": 1, "t": {"p": [{"duration": 4.5}]}, "b": True}
+    assert config_diff(old, new) == [
+        ("t.p[0].duration", 3, 4.5),
+        ("t.p[1]", {"duration": 1}, MISSING),
+        ("b", MISSING, True),
+    ]
+    assert config_diff(old, old) == []
+
+
+def test_save_only_writes_when_changed(tmp_path):
+    path = str(tmp_path / "config.yaml")
+    base = synthetic_config(clients=3, templates=2, tasks_per_template=2, depth=1, seed=0)
+    write_config(path, base)
+    base = read_config(path)
+    mtime = os.stat(path).st_mtime_ns
+    assert save_config(path, base, base) == []
+    assert os.stat(path).st_mtime_ns == mtime
+
+    edited = read_config(path)
+    edited["process_templates"]["plantilla_1"][0]["duration"] = 99
+    digest = file_hash(path)
+    changes = save_config(path, base, edited, base_hash=digest)
+    assert changes == [("process_templates.plantilla_1[0].duration",
+                        base["process_templates"]["plantilla_1"][0]["duration"], 99)]
+    assert read_config(path) == edited
+    # el fichero cambió desde que se cargó con `digest`: no se pisa
+    edited["clients"] = edited["clients"][:1]
+    with pytest.raises(RuntimeError):
+        save_config(path, base, edited, base_hash=digest)
+
+
+def test_filters_pages_and_dependency_index():
+    tasks = [{"name": f"t{i}", "type": "automated" if i % 3 == 0 else "manual",
+              "server": "S1" if i % 3 == 0 else None} for i in range(45)]
+    assert filter_tasks(tasks, "t1") == [1] + list(range(10, 20))
+    assert filter_tasks(tasks, "s1") == list(range(0, 45, 3))
+    assert filter_tasks(tasks, "", "automated") == list(range(0, 45, 3))
+    page, pages = page_slice(list(range(45)), 9, page_size=20)
+    assert pages == 3 and page == list(range(40, 45))
+
+    index = DependencyIndex(synthetic_config(clients=1, templates=2, tasks_per_template=2, depth=1, seed=0))
+    assert "plantilla_1" in index and "hito_1" in index and "global_1" in index
+    assert index.valid(["tarea_1", "nada"]) == ["tarea_1"]
+    assert len(index.options) == len(set(index.options))
+
+
+def test_apply_task_edit_touches_only_changed_fields():
+    task = {"name": "a", "duration": 2, "type": "manual"}
+    defaults = {"priority": 999, "server": None}
+    assert not apply_task_edit(task, {"duration": 2, "priority": 999, "server": ""}, defaults)
+    assert task == {"name": "a", "duration": 2, "type": "manual"}
+    assert apply_task_edit(task, {"priority": 3, "type": "automated", "server": "S1"}, defaults)
+    assert task == {"name": "a", "duration": 2, "type": "automated", "priority": 3, "server": "S1"}
+    assert apply_task_edit(task, {"server": None}, defaults) and "server" not in task
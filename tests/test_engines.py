@@ -0,0 +1,162 @@
+# tests/test_engines.py
+# Equivalencias que documenta el scheduler, sobre configuraciones sintéticas:
+#  - greedy y heap dan el mismo plan (con Process y con TaskTable);
+#  - iter_schedule deja la tabla igual que schedule_table;
+#  - reschedule / iter_reschedule tras editar duraciones, prioridades o start_after
+#    dan exactamente el plan de un cálculo completo.
+import copy
+
+import numpy as np
+import pytest
+
+from src.instrumentation import Instrumentation
+from src.models import Person
+from src.process_manager import build_processes, build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+
+SEEDS = [0, 1, 2, 3]
+SERVERS = {"S1": 0.0, "S2": 4.0}
+
+
+def _config(seed):
+    return synthetic_config(clients=25, templates=6, tasks_per_template=4, depth=2, seed=seed)
+
+
+def _scheduler(engine="heap", instrumentation=None):
+    people = [Person("Ana"), Person("Luis"), Person("Eva")]
+    people[2].available_from = 2.0
+    return Scheduler(people, SERVERS, engine=engine, instrumentation=instrumentation)
+
+
+def _plan(table):
+    return (table.order, table.start_time, table.end_time,
+            [table.resources[c] for c in table.assigned.tolist()])
+
+
+def _assert_same_plan(a, b):
+    order_a, start_a, end_a, assigned_a = _plan(a)
+    order_b, start_b, end_b, assigned_b = _plan(b)
+    np.testing.assert_array_equal(order_a, order_b)
+    np.testing.assert_array_equal(start_a, start_b)
+    np.testing.assert_array_equal(end_a, end_b)
+    assert assigned_a == assigned_b
+
+
+def _edited(table, seed, rows=5):
+    # copia de la tabla con duración, prioridad y start_after cambiados en unas filas
+    rng = np.random.default_rng(seed)
+    edited = table.copy()
+    edited.priority = edited.priority.astype(np.float64)
+    for i in rng.choice(len(table), size=rows, replace=False).tolist():
+        edited.duration[i] = float(rng.integers(1, 10))
+        edited.priority[i] = float(rng.integers(1, 20))
+        edited.start_after[i] = float(rng.integers(0, 30))
+    return edited
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_greedy_and_heap_same_plan_on_processes(seed):
+    config = _config(seed)
+    plans = []
+    for engine in ("greedy", "heap"):
+        processes, _ = build_processes(config)
+        scheduler = _scheduler(engine)
+        tasks = scheduler.schedule(processes)
+        plans.append(([(t.name, t.assigned_to, t.start_time, t.end_time) for t in tasks],
+                      [p.available_from for p in scheduler.people], scheduler.servers))
+    assert plans[0] == plans[1]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_greedy_and_heap_same_plan_on_table(seed):
+    config = _config(seed)
+    greedy = build_task_table(config)
+    _scheduler("greedy").schedule(greedy)
+    heap = _scheduler("heap").schedule_table(build_task_table(config))
+    np.testing.assert_array_equal(greedy.order, heap.order)
+    rows = heap.order
+    np.testing.assert_array_equal(greedy.start_time[rows], heap.start_time[rows])
+    np.testing.assert_array_equal(greedy.end_time[rows], heap.end_time[rows])
+    assert ([greedy[i].assigned_to for i in rows.tolist()]
+            == [heap.resources[heap.assigned[i]] for i in rows.tolist()])
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_iter_schedule_matches_schedule_table(seed):
+    config = _config(seed)
+    full = _scheduler().schedule_table(build_task_table(config))
+    table = build_task_table(config)
+    views = list(_scheduler().iter_schedule(table))
+    assert [v.index for v in views] == full.order.tolist()
+    _assert_same_plan(table, full)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_reschedule_matches_full_recompute(seed):
+    base = build_task_table(_config(seed))
+    previous = _scheduler().schedule_table(base.copy())
+    edited = _edited(base, seed)
+
+    full = _scheduler().schedule_table(edited.copy())
+    _assert_same_plan(_scheduler().reschedule(previous, edited.copy()), full)
+
+    table = edited.copy()
+    views = list(_scheduler().iter_reschedule(previous, table))
+    assert [v.index for v in views] == full.order.tolist()
+    _assert_same_plan(table, full)
+
+
+def test_reschedule_reuses_unaffected_prefix():
+    base = build_task_table(_config(0))
+    previous = _scheduler().schedule_table(base.copy())
+    edited = base.copy()
+    edited.duration[previous.order[-1]] += 3.0   # solo cambia la última tarea programada
+
+    instr = Instrumentation()
+    result = _scheduler(instrumentation=instr).reschedule(previous, edited)
+    assert instr.counters["reschedule.reused_steps"] == len(base) - 1
+    _assert_same_plan(result, _scheduler().schedule_table(edited.copy()))
+
+
+def test_reschedule_after_structural_change_is_full_recompute():
+    config = _config(1)
+    previous = _scheduler().schedule_table(build_task_table(config))
+    changed = copy.deepcopy(config)
+    changed["clients"] = changed["clients"][:-1]
+
+    instr = Instrumentation()
+    result = _scheduler(instrumentation=instr).reschedule(previous, build_task_table(changed))
+    assert instr.counters["reschedule.reused_steps"] == 0
+    _assert_same_plan(result, _scheduler().schedule_table(build_task_table(changed)))
+
+
+def test_reschedule_priority_edit_reuses_steps_until_ready():
+    base = build_task_table(_config(2))
+    previous = _scheduler().schedule_table(base.copy())
+    position = np.empty(len(base), dtype=np.int64)
+    position[previous.order] = np.arange(len(base))
+    # la tarea con dependencias que se vuelve lista más tarde
+    ready = [max((position[d] + 1 for d in base.dependencies_of(i)), default=0) for i in range(len(base))]
+    row = int(np.argmax(ready))
+    edited = base.copy()
+    edited.priority = edited.priority.astype(np.float64)
+    edited.priority[row] += 5
+
+    instr = Instrumentation()
+    result = _scheduler(instrumentation=instr).reschedule(previous, edited)
+    assert instr.counters["reschedule.reused_steps"] == ready[row] > 0
+    _assert_same_plan(result, _scheduler().schedule_table(edited.copy()))
+
+
+def test_reschedule_with_other_resources_is_full_recompute():
+    base = build_task_table(_config(3))
+    previous = _scheduler().schedule_table(base.copy())
+    scheduler = _scheduler(instrumentation=Instrumentation())
+    scheduler.people[0].available_from = 6.0
+    result = scheduler.reschedule(previous, base.copy())
+    assert scheduler.instrumentation.counters["reschedule.reused_steps"] == 0
+
+    expected = _scheduler()
+    expected.people[0].available_from = 6.0
+    _assert_same_plan(result, expected.schedule_table(base.copy()))
@@ -0,0 +1,68 @@
+# tests/test_export.py
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import export
+from src.export import export_schedule, schedule_columns, schedule_frame, write_csv
+from src.models import Person
+from src.process_manager import build_processes, build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+
+START = pd.Timestamp("2025-01-06 09:00").to_pydatetime()
+
+
+def _config():
+    return synthetic_config(clients=6, templates=3, tasks_per_template=3, depth=1, seed=7)
+
+
+def _scheduler():
+    return Scheduler([Person("Ana"), Person("Luis")], {"S1": 0.0, "S2": 1.5})
+
+
+def _table():
+    return _scheduler().schedule_table(build_task_table(_config()))
+
+
+def _no_pyarrow():
+    raise ImportError("sin pyarrow")
+
+
+def test_columns_from_table_and_tasks_agree():
+    from_table = schedule_frame(_table(), START)
+    processes, _ = build_processes(_config())
+    from_tasks = schedule_frame(_scheduler().schedule(processes), START)
+    pd.testing.assert_frame_equal(from_table.astype(str), from_tasks.astype(str))
+
+
+def test_csv_is_the_same_with_and_without_pyarrow(monkeypatch):
+    pytest.importorskip("pyarrow")
+    columns = schedule_columns(_table(), START)
+    with_arrow = io.StringIO()
+    write_csv(columns, with_arrow)
+    monkeypatch.setattr(export, "_pyarrow", _no_pyarrow)
+    without = io.StringIO()
+    write_csv(columns, without)
+    assert with_arrow.getvalue() == without.getvalue()
+
+
+@pytest.mark.parametrize("ext", [".parquet", ".arrow"])
+def test_columnar_roundtrip(tmp_path, ext):
+    pytest.importorskip("pyarrow")
+    table = _table()
+    path = tmp_path / f"plan{ext}"
+    export_schedule(table, START, path)
+    loaded = pd.read_parquet(path) if ext == ".parquet" else pd.read_feather(path)
+    expected = schedule_frame(table, START)
+    assert loaded["name"].tolist() == expected["name"].tolist()
+    assert loaded["assigned_to"].astype(str).tolist() == expected["assigned_to"].astype(str).tolist()
+    np.testing.assert_array_equal(loaded["end_hours"].to_numpy(), expected["end_hours"].to_numpy())
+    assert (loaded["start"].to_numpy() == expected["start"].to_numpy()).all()
+
+
+def test_unknown_extension_raises(tmp_path):
+    with pytest.raises(ValueError):
+        export_schedule(_table(), START, tmp_path / "plan.xlsx")
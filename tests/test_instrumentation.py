@@ -0,0 +1,64 @@
+# tests/test_instrumentation.py
+import json
+
+import numpy as np
+
+from src.instrumentation import Instrumentation
+from src.models import Person
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+
+
+def _schedule(instrumentation=None):
+    config = synthetic_config(clients=5, templates=2, tasks_per_template=3, depth=1, seed=0)
+    table = build_task_table(config, instrumentation)
+    return Scheduler([Person("Ana"), Person("Luis")], {"S1": 0.0, "S2": 0.0},
+                     instrumentation=instrumentation).schedule_table(table)
+
+
+def test_instrumented_pipeline_gives_the_same_plan():
+    instr = Instrumentation()
+    traced = _schedule(instr)
+    plain = _schedule()
+    np.testing.assert_array_equal(traced.order, plain.order)
+    np.testing.assert_array_equal(traced.end_time, plain.end_time)
+    assert instr.phases and all("wall" in p for p in instr.phases)
+    assert instr.counters
+
+
+def test_nested_phases_counters_and_stats():
+    instr = Instrumentation()
+    with instr.phase("outer", size=3):
+        with instr.phase("inner"):
+            instr.count("items", 2)
+        with instr.phase("inner"):
+            instr.count("items")
+    for value in (4, 1, 7):
+        instr.observe("ready", value)
+
+    assert [(p["name"], p["depth"]) for p in instr.phases] == [("outer", 0), ("inner", 1), ("inner", 1)]
+    assert instr.phases[0]["args"] == {"size": 3}
+    assert instr.summary()["inner"]["calls"] == 2
+    assert instr.counters == {"items": 3}
+    assert instr.to_dict()["stats"]["ready"] == {"n": 3, "mean": 4.0, "min": 1, "max": 7}
+
+
+def test_exports(tmp_path):
+    instr = Instrumentation()
+    with instr.phase("a"):
+        instr.count("n")
+    assert json.loads(instr.to_json(tmp_path / "p.json"))["counters"] == {"n": 1}
+    trace = json.loads(instr.to_chrome_trace(tmp_path / "t.json"))["traceEvents"]
+    assert [e["ph"] for e in trace] == ["X", "C"]
+
+
+def test_track_allocations():
+    instr = Instrumentation(track_allocations=True)
+    with instr.phase("outer"):
+        with instr.phase("alloc"):
+            block = bytearray(4 * 1024 * 1024)
+        del block
+    outer, alloc = instr.phases
+    assert alloc["peak_bytes"] >= 4 * 1024 * 1024
+    assert outer["peak_bytes"] >= alloc["peak_bytes"]
@@ -0,0 +1,106 @@
+# tests/test_models.py
+import io
+
+import numpy as np
+
+from src.models import Person, TaskNames, TaskTable, intern_codes, load_table, save_table
+from src.process_manager import build_processes, build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+
+
+def _config():
+    return synthetic_config(clients=6, templates=4, tasks_per_template=3, depth=2, seed=4)
+
+
+def _dependency_names(table):
+    return [[table.names[d] for d in table.dependencies_of(i)] for i in range(len(table))]
+
+
+def test_build_task_table_matches_processes():
+    config = _config()
+    table = build_task_table(config)
+    processes, _ = build_processes(config)
+    expected = TaskTable.from_processes(processes)
+    assert table.names == expected.names.tolist()
+    np.testing.assert_array_equal(table.duration, expected.duration)
+    np.testing.assert_array_equal(table.start_after, expected.start_after)
+    np.testing.assert_array_equal(table.priority, expected.priority)
+    assert [t.task_type for t in table] == [t.task_type for t in expected]
+    assert [t.client for t in table] == [t.client for t in expected]
+    assert [t.server for t in table] == [t.server for t in expected]
+    assert _dependency_names(table) == _dependency_names(expected)
+
+
+def test_task_view_writes_through_to_columns():
+    table = build_task_table(_config())
+    view = table[3]
+    view.duration = 42
+    view.priority = 7
+    assert table.duration[3] == 42 and table.priority[3] == 7
+    assert table[-1].name == table.names[len(table) - 1]
+
+
+def test_save_load_roundtrip():
+    table = Scheduler([Person("Ana"), Person("Luis")], {"S1": 0.0, "S2": 2.0}).schedule_table(
+        build_task_table(_config()))
+    buffer = io.BytesIO()
+    save_table(table, buffer)
+    buffer.seek(0)
+    loaded = load_table(buffer)
+    assert loaded.names == table.names
+    for f in ("duration", "start_after", "priority", "dep_indptr", "dep_indices",
+              "start_time", "end_time", "assigned", "order"):
+        np.testing.assert_array_equal(getattr(loaded, f), getattr(table, f))
+    assert loaded.resources == table.resources
+    assert loaded.resource_start == table.resource_start
+
+
+def test_copy_is_independent():
+    table = build_task_table(_config())
+    other = table.copy()
+    other.duration[0] += 1
+    other.clients.append("Nuevo")
+    assert table.duration[0] != other.duration[0]
+    assert "Nuevo" not in table.clients
+
+
+def test_subset_keeps_internal_dependencies():
+    table = build_task_table(_config())
+    rows = np.arange(0, len(table), 2)
+    sub = table.subset(rows)
+    assert sub.names == [table.names[i] for i in rows.tolist()]
+    kept = set(rows.tolist())
+    expected = [[table.names[d] for d in table.dependencies_of(i) if d in kept] for i in rows.tolist()]
+    assert _dependency_names(sub) == expected
+
+
+def test_intern_codes_appends_new_symbols():
+    symbols = ["a"]
+    assert intern_codes(["b", "a", None, "b"], symbols, none_code=-1) == [1, 0, -1, 1]
+    assert symbols == ["a", "b"]
+    assert intern_codes([None], symbols) == [2] and symbols[-1] is None
+
+
+def test_task_names_compose_like_strings():
+    names = build_task_table(_config()).names
+    assert isinstance(names, TaskNames)
+    strings = [names[i] for i in range(len(names))]
+    assert names.tolist() == strings == list(names)
+    assert any(s.count("::") == 2 for s in strings)
+    rows = np.array([5, 0, 5, len(names) - 1])
+    assert names.array(rows).tolist() == [strings[i] for i in rows.tolist()]
+    assert names.take(rows) == [strings[i] for i in rows.tolist()]
+    assert names.array(np.array([], dtype=np.int64)).tolist() == []
+
+    plain = TaskNames.from_list(strings)
+    assert plain == names and names == plain
+    assert plain.tolist() == strings and len(plain.tasks) == len(set(strings))
+
+
+def test_task_names_copy_is_independent():
+    names = build_task_table(_config()).names
+    other = names.copy()
+    assert other == names
+    other.tasks[other.task_code[0]] = "otra"
+    assert other != names and names[0] != other[0]
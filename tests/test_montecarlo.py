@@ -0,0 +1,40 @@
+# tests/test_montecarlo.py
+# Con duraciones fijas (sin duration_dist) todas las muestras son el plan nominal:
+# replay y dispatch deben dar P50 == nominal en cada fila, también cuando los
+# recursos empiezan tarde o hay calendario laboral.
+import numpy as np
+import pytest
+
+from src.models import Person
+from src.montecarlo import simulate
+from src.synthetic import synthetic_config
+
+CALENDAR = {
+    "shifts": [{"days": ["mon", "tue", "wed", "thu", "fri"], "start": "09:00", "end": "17:00"}],
+    "holidays": ["2025-01-08"],
+}
+
+
+def _people():
+    people = [Person("Ana"), Person("Luis")]
+    people[1].available_from = 12.0
+    return people
+
+
+@pytest.mark.parametrize("method", ["replay", "dispatch"])
+@pytest.mark.parametrize("servers", [{"S1": 0.0, "S2": 0.0}, {"S1": 0.0, "S2": 30.0}])
+@pytest.mark.parametrize("calendar", [None, CALENDAR])
+def test_zero_variance_matches_nominal(method, servers, calendar):
+    config = synthetic_config(clients=8, templates=4, tasks_per_template=3, depth=2, seed=3)
+    if calendar:
+        config["calendar"] = calendar
+    result = simulate(config, _people(), servers, samples=4, seed=0, method=method, max_workers=1)
+    np.testing.assert_array_equal(result["P50_h"].to_numpy(), result["nominal_h"].to_numpy())
+    np.testing.assert_array_equal(result["P90_h"].to_numpy(), result["nominal_h"].to_numpy())
+
+
+def test_global_tasks_are_not_a_client_row():
+    config = synthetic_config(clients=3, templates=2, tasks_per_template=2, depth=1, seed=1)
+    result = simulate(config, _people(), {"S1": 0.0, "S2": 0.0}, samples=2, seed=0, method="replay")
+    assert "Global" not in result.loc[result["tipo"] == "cliente", "nombre"].tolist()
+    assert result.loc[result["tipo"] == "global", "nombre"].tolist() == ["Global"]
@@ -0,0 +1,56 @@
+# tests/test_optimizer.py
+import numpy as np
+import pytest
+
+from src.models import Person
+from src.optimizer import lower_bound, optimize
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+
+SERVERS = {"S1": 0.0, "S2": 2.0}
+
+
+def _people():
+    return [Person("Ana"), Person("Luis")]
+
+
+def _config(seed):
+    return synthetic_config(clients=10, templates=4, tasks_per_template=3, depth=2, seed=seed)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_lower_bound_is_below_the_scheduler_plan(seed):
+    table = build_task_table(_config(seed))
+    bound = lower_bound(table, _people(), SERVERS)
+    plan = Scheduler(_people(), SERVERS).schedule_table(table.copy())
+    assert 0 < bound <= plan.end_time.max() + 1e-9
+
+
+def test_optimize_never_worse_and_valid():
+    config = _config(3)
+    result = optimize(config, _people(), SERVERS, budget=0.5, restarts=2, max_workers=1, seed=0)
+    assert result.lower_bound - 1e-9 <= result.makespan <= result.initial_makespan
+    table = result.table
+    assert result.makespan == table.end_time.max()
+    assert sorted(table.order.tolist()) == list(range(len(table)))
+    for i in range(len(table)):
+        assert table.start_time[i] >= table.start_after[i]
+        for d in table.dependencies_of(i):
+            assert table.start_time[i] >= table.end_time[d] - 1e-9
+    for code in range(len(_people()) + len(table.servers)):
+        rows = np.flatnonzero((table.assigned == code) & (table.end_time > table.start_time))
+        rows = rows[np.argsort(table.start_time[rows])]
+        assert (table.start_time[rows[1:]] >= table.end_time[rows[:-1]] - 1e-9).all()
+    assert len(result.restarts) == 2
+
+
+def test_optimize_rejects_work_calendar_and_bad_arguments():
+    config = _config(0)
+    with pytest.raises(ValueError):
+        optimize(config, _people(), SERVERS, budget=-1)
+    with pytest.raises(ValueError):
+        optimize(config, _people(), SERVERS, budget=0.1, restarts=0, max_workers=1)
+    config["calendar"] = {"shifts": [{"days": ["mon"], "start": "09:00", "end": "17:00"}]}
+    with pytest.raises(ValueError, match="calendario"):
+        optimize(config, _people(), SERVERS, budget=0.1, max_workers=1)
@@ -0,0 +1,57 @@
+# tests/test_pages.py
+# Páginas de Streamlit con AppTest, sobre config.yaml y una caché en un directorio temporal.
+import os
+import time
+
+import pytest
+import streamlit as st
+
+from src.scheduler import Scheduler
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def schedule_calls(tmp_path, monkeypatch):
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SCHEDULER_CONFIG", os.path.join(ROOT, "config.yaml"))
+    calls = []
+    original = Scheduler.schedule_table
+
+    def counted(self, table):
+        calls.append(len(table))
+        return original(self, table)
+
+    monkeypatch.setattr(Scheduler, "schedule_table", counted)
+    return calls
+
+
+def test_visualization_pro_renaming_does_not_reschedule(schedule_calls):
+    at = AppTest.from_file(os.path.join(ROOT, "pages", "visualization_pro.py"), default_timeout=60).run()
+    assert not at.exception
+    assert len(schedule_calls) == 1
+
+    at.sidebar.text_input[0].set_value("Marta").run()
+    assert not at.exception
+    assert len(schedule_calls) == 1
+    assert "Marta" in at.dataframe[0].value.to_string()
+
+
+def test_gantt_page_schedules_in_the_background(schedule_calls):
+    at = AppTest.from_file(os.path.join(ROOT, "pages", "1_visualizacion.py"), default_timeout=60).run()
+    at.button[0].click().run()
+    for _ in range(50):
+        if "gantt_previous" in at.session_state:
+            break
+        time.sleep(0.1)
+        at.run()
+    assert not at.exception
+    table = at.session_state["gantt_previous"]
+    assert table.order is not None and len(table.order) == len(table)
+    assert "gantt_run" not in at.session_state
+    # una fila por tarea en la tabla de resultados
+    assert len(at.dataframe[-1].value) == len(table)
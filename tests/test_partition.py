@@ -0,0 +1,80 @@
+# tests/test_partition.py
+import numpy as np
+import pytest
+
+from src.models import Person
+from src.partition import independent_components, pinned_rows, schedule_partitioned
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+from src.work_calendar import WorkCalendar
+
+SERVERS = {"S1": 0.0, "S2": 3.0, "S3": 0.0}
+
+
+def _people():
+    people = [Person("Ana"), Person("Luis"), Person("Eva")]
+    people[1].available_from = 5.0
+    return people
+
+
+def _config(seed):
+    return synthetic_config(clients=20, templates=6, tasks_per_template=3, depth=2, servers=3, seed=seed)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_shared_policy_matches_serial_schedule(seed, workers):
+    config = _config(seed)
+    serial_sched = Scheduler(_people(), SERVERS)
+    serial = serial_sched.schedule_table(build_task_table(config))
+    sched = Scheduler(_people(), SERVERS)
+    merged = schedule_partitioned(sched, build_task_table(config), max_workers=workers)
+
+    np.testing.assert_array_equal(merged.start_time, serial.start_time)
+    np.testing.assert_array_equal(merged.end_time, serial.end_time)
+    assert ([merged.resources[c] for c in merged.assigned.tolist()]
+            == [serial.resources[c] for c in serial.assigned.tolist()])
+    assert merged.resource_start == serial.resource_start
+    assert [p.available_from for p in sched.people] == [p.available_from for p in serial_sched.people]
+    # order: una permutación que respeta las dependencias
+    position = np.empty(len(merged), dtype=np.int64)
+    position[merged.order] = np.arange(len(merged))
+    for i in range(len(merged)):
+        assert all(position[d] < position[i] for d in merged.dependencies_of(i))
+
+
+def test_components_do_not_share_servers_or_dependencies():
+    table = build_task_table(_config(3))
+    pinned = pinned_rows(table)
+    labels, count = independent_components(table, pinned)
+    assert count > 1
+    assert (labels[pinned] == -1).all() and (labels[~pinned] >= 0).all()
+    for i in np.flatnonzero(~pinned).tolist():
+        for d in table.dependencies_of(i):
+            assert pinned[d] or labels[d] == labels[i]
+    automated = table.type_mask("automated")
+    for s in range(len(table.servers)):
+        rows = np.flatnonzero(automated & (table.server_code == s))
+        assert len(set(labels[rows].tolist())) <= 1
+
+
+def test_split_policy_gives_a_valid_plan():
+    table = schedule_partitioned(Scheduler(_people(), SERVERS), build_task_table(_config(4)),
+                                 people_policy="split", max_workers=1)
+    for i in range(len(table)):
+        for d in table.dependencies_of(i):
+            assert table.start_time[i] >= table.end_time[d]
+    for code in range(len(_people()) + len(table.servers)):
+        rows = np.flatnonzero((table.assigned == code) & (table.end_time > table.start_time))
+        rows = rows[np.argsort(table.start_time[rows])]
+        assert (table.start_time[rows[1:]] >= table.end_time[rows[:-1]]).all()
+
+
+def test_work_calendar_is_rejected():
+    calendar = WorkCalendar.from_config(
+        {"shifts": [{"days": ["mon", "tue", "wed", "thu", "fri"], "start": "09:00", "end": "17:00"}]},
+        synthetic_config(clients=1)["start_day"])
+    sched = Scheduler(_people(), SERVERS, work_calendar=calendar)
+    with pytest.raises(ValueError):
+        schedule_partitioned(sched, build_task_table(_config(0)), max_workers=1)
@@ -0,0 +1,117 @@
+# tests/test_portfolio.py
+# Cartera: merge_projects pone el nombre del proyecto delante de clientes y tareas,
+# comparte servidores, divide la prioridad por el peso y desplaza start_after al
+# start_day común; schedule_portfolio programa la tabla fusionada con un solo pool.
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import yaml
+
+from src.models import Person
+from src.portfolio import (Project, load_projects, merge_projects, parse_weights, project_paths,
+                           project_summary, schedule_portfolio)
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+
+START = datetime(2025, 1, 6, 9, 0)
+CALENDAR = {"shifts": [{"days": ["mon", "tue", "wed", "thu", "fri"], "start": "09:00", "end": "17:00"}]}
+SERVERS = {"S1": 0.0, "S2": 0.0}
+
+
+def _project(name, seed, weight=1.0, start_day=START, calendar=None):
+    config = synthetic_config(clients=5, templates=3, tasks_per_template=3, depth=2, seed=seed)
+    return Project(name, build_task_table(config), start_day, weight, calendar)
+
+
+def _people():
+    return [Person("Ana"), Person("Luis")]
+
+
+def _dependency_names(table):
+    return [[table.names[d] for d in table.dependencies_of(i)] for i in range(len(table))]
+
+
+def test_merge_namespaces_clients_and_names():
+    a, b = _project("a", 1), _project("b", 1)
+    portfolio = merge_projects([a, b])
+    table = portfolio.table
+    assert len(table) == len(a) + len(b)
+    assert table.names.tolist() == (["a::" + n for n in a.table.names]
+                                    + ["b::" + n for n in b.table.names])
+    rows = portfolio.rows("b")
+    assert [table[i].client for i in rows.tolist()] == ["b::" + t.client for t in b.table]
+    assert [table[i].server for i in rows.tolist()] == [t.server for t in b.table]
+    assert set(table.servers) == set(a.table.servers) | set(b.table.servers)
+    assert _dependency_names(table) == ([["a::" + n for n in deps] for deps in _dependency_names(a.table)]
+                                        + [["b::" + n for n in deps] for deps in _dependency_names(b.table)])
+    np.testing.assert_array_equal(portfolio.project_of(), np.repeat([0, 1], [len(a), len(b)]))
+    with pytest.raises(ValueError):
+        portfolio.rows("c")
+
+
+def test_merge_applies_weights_and_start_days():
+    a = _project("a", 2)
+    b = _project("b", 3, weight=4.0, start_day=START + timedelta(hours=10))
+    portfolio = merge_projects([b, a])
+    assert portfolio.start_day == START
+    rows = portfolio.rows("b")
+    np.testing.assert_array_equal(portfolio.table.priority[rows], b.table.priority / 4.0)
+    np.testing.assert_array_equal(portfolio.table.start_after[rows], b.table.start_after + 10.0)
+    np.testing.assert_array_equal(portfolio.table.priority[portfolio.rows("a")], a.table.priority)
+    with pytest.raises(ValueError):
+        Project("c", a.table, weight=0)
+    with pytest.raises(ValueError):
+        merge_projects([])
+
+
+def test_heavier_project_goes_first():
+    light, heavy = _project("light", 4), _project("heavy", 4, weight=3.0)
+    portfolio = schedule_portfolio([light, heavy], _people(), SERVERS)
+    summary = project_summary(portfolio).set_index("project")
+    assert summary.loc["heavy", "end"] <= summary.loc["light", "end"]
+    assert (summary["delay"] >= -1e-9).all()
+    assert summary["tasks"].tolist() == [len(light), len(heavy)]
+
+
+def test_schedule_portfolio_matches_merged_table():
+    projects = [_project("a", 5), _project("b", 6, start_day=START + timedelta(hours=3))]
+    portfolio = schedule_portfolio(projects, _people(), SERVERS)
+    expected = Scheduler(_people(), SERVERS, start_day=START).schedule_table(
+        merge_projects(projects).table)
+    np.testing.assert_array_equal(portfolio.table.order, expected.order)
+    np.testing.assert_array_equal(portfolio.table.start_time, expected.start_time)
+    np.testing.assert_array_equal(portfolio.table.assigned, expected.assigned)
+
+
+def test_calendars_must_agree():
+    same = [_project("a", 1, calendar=CALENDAR), _project("b", 2, calendar=CALENDAR)]
+    portfolio = schedule_portfolio(same, _people(), SERVERS)
+    assert portfolio.work_calendar is not None and portfolio.start_day == START
+
+    mixed = [_project("a", 1, calendar=CALENDAR), _project("b", 2)]
+    with pytest.raises(ValueError, match="calendarios"):
+        schedule_portfolio(mixed, _people(), SERVERS)
+
+
+def test_load_projects_from_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    folder = tmp_path / "proyectos"
+    folder.mkdir()
+    for name, seed in (("a", 1), ("b", 2)):
+        config = synthetic_config(clients=4, templates=3, tasks_per_template=3, depth=2, seed=seed)
+        (folder / f"{name}.yaml").write_text(yaml.safe_dump(config, allow_unicode=True), encoding="utf-8")
+    paths = project_paths(folder)
+    projects = load_projects(paths, parse_weights(["b=2"]), max_workers=1)
+    assert [(p.name, p.weight) for p in projects] == [("a", 1.0), ("b", 2.0)]
+    assert len(projects[0]) == len(build_task_table(
+        synthetic_config(clients=4, templates=3, tasks_per_template=3, depth=2, seed=1)))
+
+    with pytest.raises(ValueError):
+        load_projects(paths, {"c": 2.0}, max_workers=1)
+    (folder / "a.db").write_bytes(b"")
+    with pytest.raises(ValueError):
+        project_paths(folder)
+    with pytest.raises(ValueError):
+        parse_weights(["b"])
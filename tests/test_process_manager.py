@@ -0,0 +1,89 @@
+# tests/test_process_manager.py
+# Expansión de plantillas compiladas: resolución de dependencias por cliente.
+import pytest
+
+from src.process_manager import build_processes, build_task_table
+
+
+def _config(**extra):
+    config = {
+        "process_templates": {
+            "prep": [
+                {"name": "a", "duration": 1, "type": "manual"},
+                {"name": "b", "duration": 2, "type": "manual", "dependencies": ["a"]},
+            ],
+            "calc": [
+                {"name": "c", "duration": 3, "type": "automated", "server": "S1", "dependencies": ["prep"]},
+                {"name": "d", "duration": 1, "type": "manual", "dependencies": ["c", "hito"]},
+            ],
+            "shared": [{"name": "g", "duration": 2, "type": "manual"}],
+            "after_shared": [{"name": "h", "duration": 1, "type": "manual", "dependencies": ["shared"]}],
+        },
+        "milestones": [{"name": "hito", "start_after": 10}],
+        "global_tasks": [{"name": "comun", "template": "shared"}],
+        "clients": [
+            {"name": "A", "processes_order": ["prep", "calc"]},
+            {"name": "B", "processes_order": ["prep", "calc"]},
+            {"name": "C", "processes_order": ["shared", "after_shared"]},
+            {"name": "D", "processes_order": ["after_shared"]},
+        ],
+    }
+    config.update(extra)
+    return config
+
+
+def _tasks(config):
+    processes, _ = build_processes(config)
+    return {t.name: t for p in processes for t in p.tasks}
+
+
+def _deps(task):
+    return [d.name for d in task.dependencies]
+
+
+def test_dependencies_resolve_per_client():
+    tasks = _tasks(_config())
+    assert _deps(tasks["A::prep::b"]) == ["A::prep::a"]
+    # dependencia sobre una plantilla previa: su última tarea, en el mismo cliente
+    assert _deps(tasks["A::calc::c"]) == ["A::prep::b"]
+    assert _deps(tasks["B::calc::c"]) == ["B::prep::b"]
+    assert _deps(tasks["A::calc::d"]) == ["A::calc::c", "hito"]
+    # el cliente que ejecutó la plantilla tiene preferencia sobre el global
+    assert _deps(tasks["C::after_shared::h"]) == ["C::shared::g"]
+    assert _deps(tasks["D::after_shared::h"]) == ["Global::comun::g"]
+
+
+def test_clients_sharing_a_plan_get_their_own_tasks():
+    processes, _ = build_processes(_config())
+    a, b = processes[0].tasks, processes[1].tasks
+    assert [t.name.split("::", 1)[1] for t in a] == [t.name.split("::", 1)[1] for t in b]
+    assert not {id(t) for t in a} & {id(t) for t in b}
+    assert a[0].client == "A" and b[0].client == "B"
+
+
+def test_template_with_repeated_name_resolves_to_last_entry():
+    config = _config()
+    config["process_templates"]["prep"] = [
+        {"name": "a", "duration": 1, "type": "manual"},
+        {"name": "b", "duration": 2, "type": "manual", "dependencies": ["a"]},
+        {"name": "a", "duration": 4, "type": "manual"},
+    ]
+    tasks = _tasks(config)
+    # un nombre repetido se queda con la última definición
+    assert tasks["A::prep::a"].duration == 4
+    assert _deps(tasks["A::calc::c"]) == ["A::prep::a"]
+
+
+def test_unresolved_dependencies_raise():
+    config = _config()
+    config["process_templates"]["calc"][1]["dependencies"] = ["no_existe"]
+    with pytest.raises(ValueError, match="no_existe"):
+        build_processes(config)
+    config = _config()
+    config["clients"].append({"name": "E", "processes_order": ["calc"]})
+    with pytest.raises(ValueError, match="prep"):
+        build_task_table(config)
+    config = _config()
+    config["clients"].append({"name": "E", "processes_order": ["falta"]})
+    with pytest.raises(ValueError, match="falta"):
+        build_processes(config)
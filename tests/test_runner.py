@@ -0,0 +1,74 @@
+# tests/test_runner.py
+import threading
+
+from src.runner import CANCELLED, DONE, FAILED, Runner
+
+TIMEOUT = 10
+
+
+def _blocking_job(started, release, total=100):
+    # produce un elemento, avisa y espera a `release` antes de seguir
+    def items():
+        for i in range(total):
+            yield i
+            if i == 0:
+                started.set()
+                release.wait(TIMEOUT)
+
+    def job(run):
+        return sum(run.track(items(), total))
+    return job
+
+
+def test_run_finishes_with_result_and_progress():
+    run = Runner().submit("k", lambda run: sum(run.track(range(10), 10)))
+    assert run.wait(TIMEOUT)
+    assert run.state == DONE and run.result == 45
+    assert run.fraction == 1.0 and run.snapshot() == list(range(10))
+
+
+def test_cancel_stops_the_job():
+    started, release = threading.Event(), threading.Event()
+    run = Runner().submit("k", _blocking_job(started, release))
+    assert started.wait(TIMEOUT)
+    run.cancel()
+    release.set()
+    assert run.wait(TIMEOUT)
+    assert run.state == CANCELLED and run.done == 1
+
+
+def test_same_key_joins_and_new_key_cancels_previous_of_owner():
+    runner = Runner()
+    started, release = threading.Event(), threading.Event()
+    first = runner.submit("a", _blocking_job(started, release), owner="s1")
+    assert runner.submit("a", lambda run: None, owner="s2") is first
+    assert started.wait(TIMEOUT)
+
+    runner.submit("b", lambda run: "b", owner="s1")
+    assert first.active              # s2 todavía lo espera
+    runner.submit("b", lambda run: "b", owner="s2")
+    release.set()
+    assert first.wait(TIMEOUT) and first.state == CANCELLED
+    assert runner.get("b").wait(TIMEOUT) and runner.get("b").result == "b"
+
+
+def test_failed_run_is_relaunched():
+    runner = Runner()
+
+    def fail(run):
+        raise RuntimeError("boom")
+    failed = runner.submit("k", fail)
+    failed.wait(TIMEOUT)
+    assert failed.state == FAILED and str(failed.error) == "boom"
+    retry = runner.submit("k", lambda run: 1)
+    assert retry is not failed and retry.wait(TIMEOUT) and retry.result == 1
+
+
+def test_finished_runs_are_trimmed():
+    runner = Runner(keep=2)
+    for key in "abcd":
+        runner.submit(key, lambda run: key).wait(TIMEOUT)
+    runner.submit("e", lambda run: "e").wait(TIMEOUT)
+    # "e" puede haber terminado o no al recortar: se conservan los más recientes
+    kept = [k for k in "abcde" if runner.get(k) is not None]
+    assert kept[-2:] == ["d", "e"] and "a" not in kept and "b" not in kept
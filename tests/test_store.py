@@ -0,0 +1,79 @@
+# tests/test_store.py
+# ConfigStore: la configuración vuelve igual de SQLite, update() solo reescribe lo
+# que cambia, y tasks() filtra por recurso/cliente/ventana como un filtrado a mano.
+import copy
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.export import schedule_frame
+from src.models import Person
+from src.process_manager import build_task_table, load_config
+from src.scheduler import Scheduler
+from src.store import ConfigStore, config_revision
+from src.synthetic import synthetic_config
+
+
+def _config():
+    config = synthetic_config(clients=8, templates=4, tasks_per_template=3, depth=2, seed=9)
+    config["process_templates"]["plantilla_1"][0]["duration_dist"] = {"type": "pert", "min": 1, "max": 9}
+    config["calendar"] = {"shifts": [{"days": ["mon"], "start": "09:00", "end": "17:00"}]}
+    return config
+
+
+def test_config_roundtrip(tmp_path):
+    config = _config()
+    path = tmp_path / "config.db"
+    with ConfigStore(path) as store:
+        store.save_config(config)
+    assert load_config(str(path)) == config
+    assert isinstance(load_config(str(path))["start_day"], datetime)
+
+
+def test_update_rewrites_only_changes(tmp_path):
+    base = _config()
+    path = tmp_path / "config.db"
+    with ConfigStore(path) as store:
+        store.save_config(base)
+        revision = store.revision()
+        assert store.update(base, copy.deepcopy(base)) == 0
+        assert store.revision() == revision
+
+        new = copy.deepcopy(base)
+        new["process_templates"]["plantilla_2"][1]["duration"] = 42
+        new["clients"][3]["name"] = "Otro"
+        del new["milestones"][-1]
+        assert store.update(base, new) == 3
+        assert store.load_config() == new
+    assert config_revision(str(path)) != revision
+
+
+def test_runs_and_range_query(tmp_path):
+    config = _config()
+    start_day = config["start_day"]
+    table = Scheduler([Person("Ana"), Person("Luis")], {"S1": 0.0, "S2": 0.0}).schedule_table(
+        build_task_table(config))
+    frame = schedule_frame(table, start_day)
+    with ConfigStore(tmp_path / "config.db") as store:
+        first = store.save_run(table, start_day, config_hash="k1", engine="heap", people=["Ana", "Luis"])
+        second = store.save_run(table, start_day, config_hash="k2", engine="backfill")
+        assert store.latest_run() == second and store.latest_run("k1") == first
+        assert store.runs()["engine"].tolist() == ["heap", "backfill"]
+
+        everything = store.tasks(first)
+        assert sorted(everything["name"]) == sorted(frame["name"])
+
+        t0, t1 = 5.0, 20.0
+        window = store.tasks(first, resource="Luis", start=t0,
+                             end=start_day + timedelta(hours=t1))
+        hours = frame[(frame["assigned_to"] == "Luis") & (frame["start_hours"] < t1)
+                      & (frame["end_hours"] > t0)]
+        assert sorted(window["name"]) == sorted(hours["name"])
+        assert np.all(np.diff(window["start_hours"].to_numpy()) >= 0)
+
+        client = frame["client"].iloc[0]
+        assert set(store.tasks(first, client=client)["client"]) == {client}
+        store.delete_run(first)
+        with pytest.raises(ValueError):
+            store.tasks(first)
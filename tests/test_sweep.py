@@ -0,0 +1,48 @@
+# tests/test_sweep.py
+import pytest
+
+from src.models import Person
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.sweep import Scenario, parse_servers, scenario_grid, sweep
+from src.synthetic import synthetic_config
+
+
+def _config():
+    return synthetic_config(clients=10, templates=4, tasks_per_template=3, depth=2, servers=2,
+                            automated_ratio=0.8, seed=5)
+
+
+def test_parse_servers():
+    assert parse_servers("S1, S2=8") == {"S1": 0.0, "S2": 8.0}
+    with pytest.raises(ValueError):
+        parse_servers("S1=x")
+
+
+def test_sweep_matches_direct_schedule():
+    config = _config()
+    scenarios = scenario_grid([1, 3], [{"S1": 0.0, "S2": 0.0}, {"S1": 0.0, "S2": 30.0}])
+    results = sweep(config, scenarios, max_workers=1)
+    assert results["scenario"].tolist() == [s.name for s in scenarios]
+    for scenario, makespan in zip(scenarios, results["makespan"].tolist()):
+        table = Scheduler(scenario.people(), scenario.servers,
+                          start_day=config["start_day"]).schedule_table(build_task_table(config))
+        assert makespan == table.end_time.max()
+    assert (results["delay"] >= 0).all()
+
+
+def test_server_availability_changes_the_plan():
+    results = sweep(_config(), [Scenario(2, {"S1": 0.0, "S2": 0.0}), Scenario(2, {"S1": 0.0, "S2": 200.0})],
+                    max_workers=1)
+    assert results["makespan"][1] > results["makespan"][0]
+
+
+@pytest.mark.parametrize("servers", [{"S1": 0.0}, {"S1": 0.0, "S2": 0.0, "S3": 0.0}])
+def test_scenario_must_give_the_config_servers(servers):
+    with pytest.raises(ValueError, match="servidores"):
+        sweep(_config(), [Scenario(2, servers)], max_workers=1)
+
+
+def test_scenario_rejects_no_people():
+    with pytest.raises(ValueError):
+        Scenario(0, {"S1": 0.0})
@@ -0,0 +1,35 @@
+# tests/test_synthetic.py
+import yaml
+
+from benchmarks.run import MIN_SECONDS, compare
+from src.process_manager import build_task_table
+from src.synthetic import synthetic_config
+
+
+def test_same_seed_same_config():
+    assert synthetic_config(clients=5, seed=3) == synthetic_config(clients=5, seed=3)
+    assert synthetic_config(clients=5, seed=3) != synthetic_config(clients=5, seed=4)
+
+
+def test_size_and_dependencies_resolve():
+    config = synthetic_config(clients=7, templates=6, tasks_per_template=4, depth=3,
+                              milestones=2, global_tasks=3, templates_per_client=2, seed=1)
+    table = build_task_table(config)
+    # cada cliente ejecuta 2 cadenas de 3 plantillas de 4 tareas
+    assert len(table) == 7 * 2 * 3 * 4 + 2 + 3
+    assert len(table.dep_indices) > 0
+
+
+def test_yaml_roundtrip_builds_the_same_table():
+    config = synthetic_config(clients=4, seed=2)
+    reloaded = yaml.safe_load(yaml.safe_dump(config, allow_unicode=True, sort_keys=False))
+    assert build_task_table(reloaded).names == build_task_table(config).names
+
+
+def test_compare_reports_regressions_above_noise_floor():
+    baseline = {"a": {"seconds": 1.0, "peak_mb": 10.0}, "b": {"seconds": 0.001, "peak_mb": 0.1}}
+    results = {"a": {"seconds": 2.0, "peak_mb": 10.0},
+               "b": {"seconds": MIN_SECONDS, "peak_mb": 0.5},
+               "c": {"seconds": 9.0, "peak_mb": 90.0}}
+    regressions = compare(results, baseline, time_threshold=1.5, memory_threshold=1.3)
+    assert len(regressions) == 1 and regressions[0].startswith("a: tiempo")
@@ -0,0 +1,87 @@
+# tests/test_visualization.py
+from datetime import datetime
+
+import numpy as np
+import plotly.graph_objects as go
+
+from src.models import Person
+from src.process_manager import build_processes, build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+from src.visualization import LANE_HEIGHT, gantt_columns, plot_gantt_lanes
+
+START = datetime(2025, 1, 6, 9)
+
+
+def _scheduler():
+    return Scheduler([Person("Ana"), Person("Luis")], {"S1": 0.0, "S2": 0.0})
+
+
+def _config():
+    return synthetic_config(clients=8, templates=4, tasks_per_template=3, depth=2, seed=6)
+
+
+def test_columns_from_table_and_tasks_agree():
+    config = _config()
+    table = _scheduler().schedule_table(build_task_table(config))
+    processes, _ = build_processes(config)
+    tasks = _scheduler().schedule(processes)
+
+    from_table = gantt_columns(table)
+    from_tasks = gantt_columns(tasks)
+    assert sorted(map(str, from_table.lanes)) == sorted(map(str, from_tasks.lanes))
+    np.testing.assert_array_equal(from_table.start, from_tasks.start)
+    np.testing.assert_array_equal(from_table.end, from_tasks.end)
+    assert from_table.labels == from_tasks.labels
+    assert ([from_table.lanes[k] for k in from_table.lane.tolist()]
+            == [from_tasks.lanes[k] for k in from_tasks.lane.tolist()])
+
+
+def test_lanes_figure_has_one_webgl_trace_per_resource():
+    table = _scheduler().schedule_table(build_task_table(_config()))
+    cols = gantt_columns(table)
+    fig = plot_gantt_lanes(table, START, columns=cols)
+    traces = [t for t in fig.data if t.name != "Milestone"]
+    assert all(isinstance(t, go.Scattergl) for t in fig.data)
+    assert {t.name for t in traces} <= {str(l) for l in cols.lanes}
+    # tres puntos por barra (inicio, fin, hueco)
+    bars = int((~cols.milestone).sum())
+    assert sum(len(t.x) for t in traces) == 3 * bars
+    assert fig.layout.height == max(300, len(cols.lanes) * LANE_HEIGHT + 120)
+
+
+def _random_columns(rng, n):
+    from src.visualization import GanttColumns
+    start = rng.uniform(0, 1000, n)
+    end = start + rng.exponential(2.0, n)
+    end[:1] = start[:1] + 900.0   # una barra larga que cruza casi todo
+    end[1:2] = np.nan             # fila sin programar
+    milestone = rng.random(n) < 0.05
+    end[milestone] = start[milestone]
+    return GanttColumns(start, end, rng.integers(0, 4, n), ["Ana", "Luis", "S1", "S2"], milestone,
+                        np.zeros(n, dtype=bool), [f"t{i}" for i in range(n)])
+
+
+def test_window_matches_brute_force():
+    from src.visualization import GanttLOD
+    rng = np.random.default_rng(0)
+    for n in (0, 1, 7, 300):
+        lod = GanttLOD(_random_columns(rng, n))
+        for t0, t1 in [(0, 1000), (500, 510), (950, 2000), (-5, -1), (300, 300)]:
+            expected = np.flatnonzero((lod.columns.start <= t1) & (lod.columns.end >= t0))
+            np.testing.assert_array_equal(np.sort(lod.window(t0, t1)), expected)
+
+
+def test_view_merges_short_bars_per_lane():
+    from src.visualization import GanttLOD
+    cols = _random_columns(np.random.default_rng(1), 2000)
+    cols = cols.take(np.flatnonzero(~np.isnan(cols.end)))
+    lod = GanttLOD(cols)
+    view = lod.view(0, 1000, width_px=200)
+    assert len(view) < len(lod.window(0, 1000))
+    # todas las barras visibles quedan cubiertas por una barra o bloque de su carril
+    inside = lod.columns.take(lod.window(0, 1000))
+    for s, e, lane in zip(inside.start.tolist(), inside.end.tolist(), inside.lane.tolist()):
+        same = view.lane == lane
+        assert ((view.start[same] <= s) & (view.end[same] >= e)).any()
+    assert int(view.milestone.sum()) == int(inside.milestone.sum())
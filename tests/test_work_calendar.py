@@ -0,0 +1,107 @@
+# tests/test_work_calendar.py
+# WorkCalendar: las conversiones vectorizadas coinciden con las escalares, noches,
+# fines de semana y festivos no cuentan como trabajo, y un plan programado con
+# calendario empieza y acaba dentro de horas laborables.
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.models import Person
+from src.process_manager import build_task_table
+from src.scheduler import Scheduler
+from src.synthetic import synthetic_config
+from src.work_calendar import WorkCalendar, calendar_from_config
+
+MONDAY = datetime(2025, 1, 6, 8, 0)
+SPEC = {
+    "shifts": [
+        {"days": ["mon", "tue", "wed", "thu", "fri"], "start": "09:00", "end": "14:00"},
+        {"days": ["mon", "tue", "wed", "thu", "fri"], "start": "15:00", "end": "18:00"},
+    ],
+    "holidays": ["2025-01-08"],
+}
+
+
+def _calendar():
+    return WorkCalendar.from_config(SPEC, MONDAY)
+
+
+def _working(calendar, wall, end=False):
+    # instante dentro de algún intervalo laborable ([inicio, fin), o (inicio, fin] si end)
+    k = np.searchsorted(calendar.wall_start, wall, side="left" if end else "right") - 1
+    return k >= 0 and (wall <= calendar.wall_end[k] if end else wall < calendar.wall_end[k])
+
+
+def test_known_conversions():
+    calendar = _calendar()
+    assert calendar.work(0.0) == 0.0          # lunes 8:00, antes del turno
+    assert calendar.work(1.5) == 0.5          # 9:30
+    assert calendar.wall(5.0) == 7.0          # fin de la mañana -> 15:00
+    assert calendar.wall(5.0, end=True) == 6.0
+    assert calendar.wall(8.0) == 25.0         # martes 9:00
+    assert calendar.wall(16.0) == 73.0        # miércoles festivo -> jueves 9:00
+    assert calendar.wall(32.0) == 169.0       # fin de semana -> lunes 13 a las 9:00
+
+
+def test_holidays_and_weekends_have_no_intervals():
+    calendar = _calendar()
+    days = {(MONDAY + timedelta(hours=s)).date() for s in calendar.wall_start[:20].tolist()}
+    assert date(2025, 1, 8) not in days
+    assert not any(d.weekday() >= 5 for d in days)
+    np.testing.assert_allclose(calendar.wall_end - calendar.wall_start,
+                               np.diff(np.append(calendar.work_start, calendar.work_end[-1])))
+
+
+def test_vectorized_matches_scalar():
+    calendar = _calendar()
+    rng = np.random.default_rng(0)
+    work = np.concatenate([rng.uniform(0, 400, 200), np.arange(0, 60, 0.5), [np.inf, np.nan]])
+    wall = np.concatenate([rng.uniform(0, 900, 200), calendar.wall_start[:30], calendar.wall_end[:30]])
+    for end in (False, True):
+        expected = [calendar.wall(w, end=end) for w in work.tolist()]
+        np.testing.assert_array_equal(calendar.to_wall(work, end=end), expected)
+    np.testing.assert_array_equal(calendar.to_work(wall), [calendar.work(w) for w in wall.tolist()])
+    np.testing.assert_allclose(calendar.to_work(calendar.to_wall(work[:-2])), work[:-2])
+
+
+def test_horizon_grows_on_demand():
+    calendar = WorkCalendar.from_config(SPEC, MONDAY)
+    calendar.horizon_days = 7
+    calendar._build()
+    wall = calendar.wall(2000.0)
+    assert calendar.horizon_days > 7
+    assert calendar.work(wall) == pytest.approx(2000.0)
+
+
+def test_scheduled_plan_stays_in_working_hours():
+    config = synthetic_config(clients=10, templates=4, tasks_per_template=3, depth=2, seed=3)
+    calendar = _calendar()
+    for engine in ("heap", "backfill"):
+        table = Scheduler([Person("Ana"), Person("Luis")], {"S1": 0.0, "S2": 0.0},
+                          engine=engine, work_calendar=calendar).schedule_table(build_task_table(config))
+        for i in np.flatnonzero(table.duration > 0).tolist():
+            start, end = table.start_time[i], table.end_time[i]
+            assert _working(calendar, start) and _working(calendar, end, end=True)
+            assert calendar.work(end) - calendar.work(start) == pytest.approx(table.duration[i])
+
+
+def test_calendar_from_config():
+    assert calendar_from_config({"start_day": MONDAY}) is None
+    calendar = calendar_from_config({"start_day": MONDAY.isoformat(), "calendar": SPEC})
+    assert calendar.start_day == MONDAY and calendar.holidays == [date(2025, 1, 8)]
+    assert calendar.spec()["shifts"]["mon"] == [(9.0, 14.0), (15.0, 18.0)]
+    night = WorkCalendar.from_config({"shifts": [{"days": ["mon"], "start": "22:00", "end": "06:00"}]}, MONDAY)
+    assert night.shifts == {0: [(22.0, 30.0)]}
+    assert night.wall(8.0, end=True) == 22.0
+
+
+@pytest.mark.parametrize("spec", [
+    {},
+    {"shifts": [{"days": ["lunes"], "start": "09:00", "end": "17:00"}]},
+    {"shifts": [{"days": ["mon"], "start": "9h", "end": "17:00"}]},
+    {"shifts": [{"days": ["mon"], "start": "09:00"}]},
+])
+def test_invalid_specs_raise(spec):
+    with pytest.raises(ValueError):
+        WorkCalendar.from_config(spec, MONDAY)